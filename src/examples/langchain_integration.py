@@ -6,22 +6,22 @@ from typing import List
 from langchain.schema import Document
 from langchain.schema.retriever import BaseRetriever
 
-from raglite.api import RagliteAPI, RagliteConfig
+from raglite.api import AsyncRagliteAPI, RagliteConfig
 
 
 class RagliteRetriever(BaseRetriever):
     def __init__(self, db_path: Path) -> None:
-        self.api = RagliteAPI(RagliteConfig(db_path))
+        self.async_api = AsyncRagliteAPI(RagliteConfig(db_path))
+        self.api = self.async_api.sync
         self.api.init_db()
 
     def _get_relevant_documents(self, query: str) -> List[Document]:
         results = self.api.query(query, top_k=5)
         return [Document(page_content=r.text, metadata=r.metadata) for r in results]
 
-    async def _aget_relevant_documents(
-        self, query: str
-    ) -> List[Document]:  # pragma: no cover - async wrapper
-        return self._get_relevant_documents(query)
+    async def _aget_relevant_documents(self, query: str) -> List[Document]:
+        results = await self.async_api.query(query, top_k=5)
+        return [Document(page_content=r.text, metadata=r.metadata) for r in results]
 
 
 if __name__ == "__main__":
@@ -2,7 +2,16 @@
 
 from importlib import metadata as importlib_metadata
 
-from .api import RagliteAPI, add_tags, index_corpus, init_db, query, stats
+from .api import (
+    AsyncRagliteAPI,
+    RagliteAPI,
+    add_tags,
+    index_corpus,
+    init_db,
+    query,
+    query_many,
+    stats,
+)
 from .config import RagliteConfig
 
 try:
@@ -11,12 +20,14 @@ except importlib_metadata.PackageNotFoundError:  # pragma: no cover - fallback f
     __version__ = "0.0.0"
 
 __all__ = [
+    "AsyncRagliteAPI",
     "RagliteAPI",
     "RagliteConfig",
     "add_tags",
     "index_corpus",
     "init_db",
     "query",
+    "query_many",
     "stats",
     "__version__",
 ]
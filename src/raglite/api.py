@@ -2,35 +2,119 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from dataclasses import dataclass
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
+from .cache import QueryCache
 from .config import RagliteConfig
 from .db import apply_migrations, temp_connection
+from .embed import QueryEmbeddingCache
 from .ingest import IngestResult, ingest_path
-from .search import SearchResult, hybrid_search
+from .pool import ConnectionPool
+from .rerank import RerankScoreCache
+from .search import (
+    DEFAULT_PAGE_SIZE,
+    SearchResult,
+    hybrid_search,
+    hybrid_search_many,
+    iter_search,
+    search_page,
+)
 from .vector import detect_backend
+from .vector.binary import enable_signatures, signatures_enabled
+from .vector.hnsw import (
+    DEFAULT_EF_CONSTRUCTION,
+    DEFAULT_M,
+    HNSWIndexStats,
+    build_hnsw_index,
+)
+from .vector.ivf import IVFIndexStats, build_ivf_index
+from .vector.quantize import quantization_mode
+from .vector.sqlite_ext import extension_stats, prepare_vec_index
 
 
 @dataclass
 class RagliteAPI:
     config: RagliteConfig
+    _query_cache: Optional[QueryCache] = field(default=None, init=False, repr=False)
+    _embedding_cache: Optional[QueryEmbeddingCache] = field(default=None, init=False, repr=False)
+    _pool: Optional[ConnectionPool] = field(default=None, init=False, repr=False)
+    _rerank_cache: Optional[RerankScoreCache] = field(default=None, init=False, repr=False)
 
     @property
     def db_path(self) -> Path:
         return self.config.db_path
 
     def init_db(self) -> None:
-        with temp_connection(self.db_path) as conn:
+        with self._writer() as conn:
             apply_migrations(conn)
+            if self.config.vector_backend == "binary" and not signatures_enabled(conn):
+                enable_signatures(conn)
+            prepare_vec_index(conn)
+
+    def close(self) -> None:
+        """Close pooled connections and caches; the API reopens them on next use."""
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._query_cache is not None:
+            self._query_cache.close()
+            self._query_cache = None
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        pool = self._connections()
+        if pool is None:
+            with temp_connection(self.db_path) as conn:
+                yield conn
+            return
+        with pool.reader() as conn:
+            yield conn
+
+    @contextmanager
+    def _writer(self) -> Iterator[sqlite3.Connection]:
+        pool = self._connections()
+        if pool is None:
+            with temp_connection(self.db_path) as conn:
+                yield conn
+            return
+        with pool.writer() as conn:
+            yield conn
+
+    def _connections(self) -> Optional[ConnectionPool]:
+        if self.config.pool_size <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ConnectionPool(self.db_path, size=self.config.pool_size)
+        return self._pool
 
     def index(
-        self, corpus_path: Path, *, strategy: str = "recursive", ocr: bool = False
+        self,
+        corpus_path: Path,
+        *,
+        strategy: str = "recursive",
+        ocr: bool = False,
+        bulk: bool = False,
     ) -> IngestResult:
         return ingest_path(
-            self.db_path, corpus_path, config=self.config, strategy=strategy, ocr=ocr
+            self.db_path, corpus_path, config=self.config, strategy=strategy, ocr=ocr, bulk=bulk
         )
 
     def query(
@@ -41,20 +125,202 @@ class RagliteAPI:
         alpha: Optional[float] = None,
         rerank: bool = False,
         tags: Optional[Dict[str, str]] = None,
+        nprobe: Optional[int] = None,
+        fusion: Optional[str] = None,
+        rerank_limit: Optional[int] = None,
     ) -> List[SearchResult]:
-        with temp_connection(self.db_path) as conn:
-            return hybrid_search(
+        alpha = alpha if alpha is not None else self.config.alpha
+        nprobe = nprobe if nprobe is not None else self.config.nprobe
+        fusion = fusion or self.config.fusion
+        rerank_limit = rerank_limit or self.config.rerank_limit
+        cache = self._cache()
+        key = (
+            text,
+            alpha,
+            top_k,
+            rerank,
+            tuple(sorted((tags or {}).items())),
+            self.config.embed_model,
+            nprobe,
+            self.config.vector_backend,
+            fusion,
+            self.config.rerank_model,
+            rerank_limit,
+        )
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        with self._reader() as conn:
+            results = hybrid_search(
                 conn,
                 text,
+                alpha=alpha,
+                top_k=top_k,
+                embed_model=self.config.embed_model,
+                rerank=rerank,
+                tags=tags,
+                resident_vectors=self.config.resident_vectors,
+                nprobe=nprobe,
+                ef_search=self.config.ef_search,
+                vector_backend_name=self.config.vector_backend,
+                embedding_cache=self._embeddings(),
+                fusion=fusion,
+                rerank_model=self.config.rerank_model,
+                rerank_limit=rerank_limit,
+                rerank_cache=self._rerank_scores(),
+            )
+        if cache is not None:
+            cache.put(key, results)
+        return results
+
+    def _embeddings(self) -> Optional[QueryEmbeddingCache]:
+        if self.config.query_embedding_cache_size <= 0 and not self.config.persist_query_embeddings:
+            return None
+        if self._embedding_cache is None:
+            path = None
+            if self.config.persist_query_embeddings:
+                path = self.config.ensure_cache_dir() / "query_embeddings.sqlite"
+            self._embedding_cache = QueryEmbeddingCache(
+                maxsize=self.config.query_embedding_cache_size, path=path
+            )
+        return self._embedding_cache
+
+    def _rerank_scores(self) -> Optional[RerankScoreCache]:
+        if not self.config.rerank_model or self.config.rerank_cache_size <= 0:
+            return None
+        if self._rerank_cache is None:
+            self._rerank_cache = RerankScoreCache(maxsize=self.config.rerank_cache_size)
+        return self._rerank_cache
+
+    def _cache(self) -> Optional[QueryCache]:
+        if self.config.query_cache_size <= 0:
+            return None
+        if self._query_cache is None:
+            self._query_cache = QueryCache(
+                self.db_path,
+                maxsize=self.config.query_cache_size,
+                ttl=self.config.query_cache_ttl,
+            )
+        return self._query_cache
+
+    def query_many(
+        self,
+        texts: Sequence[str],
+        *,
+        top_k: int = 10,
+        alpha: Optional[float] = None,
+        rerank: bool = False,
+        tags: Optional[Dict[str, str]] = None,
+        nprobe: Optional[int] = None,
+        fusion: Optional[str] = None,
+        rerank_limit: Optional[int] = None,
+    ) -> List[List[SearchResult]]:
+        """Answer many queries over one connection with a single embedding batch."""
+
+        with self._reader() as conn:
+            return hybrid_search_many(
+                conn,
+                texts,
                 alpha=alpha if alpha is not None else self.config.alpha,
                 top_k=top_k,
                 embed_model=self.config.embed_model,
                 rerank=rerank,
                 tags=tags,
+                resident_vectors=self.config.resident_vectors,
+                nprobe=nprobe if nprobe is not None else self.config.nprobe,
+                ef_search=self.config.ef_search,
+                vector_backend_name=self.config.vector_backend,
+                embedding_cache=self._embeddings(),
+                fusion=fusion or self.config.fusion,
+                rerank_model=self.config.rerank_model,
+                rerank_limit=rerank_limit or self.config.rerank_limit,
+                rerank_cache=self._rerank_scores(),
+            )
+
+    def iter_query(
+        self,
+        text: str,
+        *,
+        limit: int = 1000,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        alpha: Optional[float] = None,
+        tags: Optional[Dict[str, str]] = None,
+        fusion: Optional[str] = None,
+    ) -> Iterator[SearchResult]:
+        """Stream up to ``limit`` results, reading chunk rows ``page_size`` at a time.
+
+        A pooled connection is held until the generator is exhausted or closed.
+        """
+
+        with self._reader() as conn:
+            yield from iter_search(
+                conn,
+                text,
+                limit=limit,
+                page_size=page_size,
+                cursor=cursor,
+                tags=tags,
+                fusion=fusion or self.config.fusion,
+                **self._search_options(alpha),
+            )
+
+    def query_page(
+        self,
+        text: str,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        alpha: Optional[float] = None,
+        tags: Optional[Dict[str, str]] = None,
+        fusion: Optional[str] = None,
+    ) -> Tuple[List[SearchResult], Optional[str]]:
+        """Return one page of results and an opaque cursor for the next (``None`` at the end)."""
+
+        with self._reader() as conn:
+            return search_page(
+                conn,
+                text,
+                page_size=page_size,
+                cursor=cursor,
+                limit=limit,
+                tags=tags,
+                fusion=fusion or self.config.fusion,
+                **self._search_options(alpha),
             )
 
+    def _search_options(self, alpha: Optional[float]) -> Dict[str, Any]:
+        return {
+            "alpha": alpha if alpha is not None else self.config.alpha,
+            "embed_model": self.config.embed_model,
+            "resident_vectors": self.config.resident_vectors,
+            "nprobe": self.config.nprobe,
+            "ef_search": self.config.ef_search,
+            "vector_backend_name": self.config.vector_backend,
+            "embedding_cache": self._embeddings(),
+        }
+
+    def build_index(
+        self,
+        *,
+        kind: str = "ivf",
+        nlist: Optional[int] = None,
+        iterations: int = 10,
+        m: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+    ) -> IVFIndexStats | HNSWIndexStats:
+        with self._writer() as conn:
+            apply_migrations(conn)
+            if kind == "ivf":
+                return build_ivf_index(conn, nlist=nlist, iterations=iterations)
+            if kind == "hnsw":
+                return build_hnsw_index(conn, m=m, ef_construction=ef_construction)
+        raise ValueError(f"Unknown index kind: {kind}")
+
     def add_tags(self, document_id: int, tags: Dict[str, str]) -> None:
-        with temp_connection(self.db_path) as conn:
+        with self._writer() as conn, conn:
             conn.execute(
                 """
                 UPDATE chunks
@@ -65,7 +331,7 @@ class RagliteAPI:
             )
 
     def stats(self) -> Dict[str, Any]:
-        with temp_connection(self.db_path) as conn:
+        with self._reader() as conn:
             doc_count = int(conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0])
             chunk_count = int(conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0])
             embed_count = int(conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
@@ -78,14 +344,35 @@ class RagliteAPI:
                 ).fetchone()
                 is not None
             )
-            backend = detect_backend(conn)
+            backend_error: Optional[str] = None
+            try:
+                backend_name = detect_backend(
+                    conn,
+                    resident=self.config.resident_vectors,
+                    nprobe=self.config.nprobe,
+                    ef_search=self.config.ef_search,
+                    prefer=self.config.vector_backend,
+                ).name
+            except RuntimeError as exc:
+                # Queries raise; stats reports the misconfiguration instead.
+                backend_name, backend_error = "unavailable", str(exc)
+            quantization = quantization_mode(conn)
         dim = int(dim_row[0]) if dim_row else 0
         model = str(dim_row[1]) if dim_row else self.config.embed_model
         return {
             "documents": doc_count,
             "chunks": chunk_count,
             "embeddings": embed_count,
-            "vector_backend": backend.name,
+            "vector_backend": backend_name,
+            "vector_backend_error": backend_error,
+            "vector_extension": extension_stats(),
+            "quantization": quantization,
+            "query_cache": self._query_cache.stats() if self._query_cache else None,
+            "query_embedding_cache": (
+                self._embedding_cache.stats() if self._embedding_cache else None
+            ),
+            "connection_pool": self._pool.stats() if self._pool else None,
+            "rerank_cache": self._rerank_cache.stats() if self._rerank_cache else None,
             "embedding_model": model,
             "embedding_dim": dim,
             "fts_enabled": fts_exists,
@@ -93,6 +380,72 @@ class RagliteAPI:
         }
 
 
+T = TypeVar("T")
+
+
+class AsyncRagliteAPI:
+    """``asyncio`` front end that runs :class:`RagliteAPI` calls on a bounded executor.
+
+    SQLite and model inference stay blocking but run on at most ``max_workers``
+    threads (default: ``config.pool_size``), so the event loop never blocks and
+    one request can be embedding while another is reading SQLite. The wrapped
+    API's pool is sized to match, which gives every worker its own read-only
+    connection.
+    """
+
+    def __init__(self, config: RagliteConfig, *, max_workers: Optional[int] = None) -> None:
+        workers = max_workers or config.pool_size or 4
+        if config.pool_size > 0:
+            config = replace(config, pool_size=max(config.pool_size, workers))
+        self.sync = RagliteAPI(config)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="raglite")
+
+    @property
+    def config(self) -> RagliteConfig:
+        return self.sync.config
+
+    async def init_db(self) -> None:
+        await self._run(self.sync.init_db)
+
+    async def query(self, text: str, **options: Any) -> List[SearchResult]:
+        return await self._run(lambda: self.sync.query(text, **options))
+
+    async def query_many(self, texts: Sequence[str], **options: Any) -> List[List[SearchResult]]:
+        return await self._run(lambda: self.sync.query_many(texts, **options))
+
+    async def index(
+        self,
+        corpus_path: Path,
+        *,
+        strategy: str = "recursive",
+        ocr: bool = False,
+        bulk: bool = False,
+    ) -> IngestResult:
+        return await self._run(
+            lambda: self.sync.index(corpus_path, strategy=strategy, ocr=ocr, bulk=bulk)
+        )
+
+    async def add_tags(self, document_id: int, tags: Dict[str, str]) -> None:
+        await self._run(lambda: self.sync.add_tags(document_id, tags))
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self._run(self.sync.stats)
+
+    async def aclose(self) -> None:
+        await self._run(self.sync.close)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncRagliteAPI":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _run(self, func: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func)
+
+
 def init_db(db_path: Path | str) -> None:
     RagliteAPI(RagliteConfig(Path(db_path))).init_db()
 
@@ -104,13 +457,14 @@ def index_corpus(
     strategy: str = "recursive",
     ocr: bool = False,
     embed_model: Optional[str] = None,
+    bulk: bool = False,
 ) -> IngestResult:
     config = RagliteConfig(Path(db_path))
     if embed_model:
         config.embed_model = embed_model
     api = RagliteAPI(config)
     api.init_db()
-    return api.index(Path(corpus_path), strategy=strategy, ocr=ocr)
+    return api.index(Path(corpus_path), strategy=strategy, ocr=ocr, bulk=bulk)
 
 
 def query(
@@ -122,14 +476,63 @@ def query(
     rerank: bool = False,
     tags: Optional[Dict[str, str]] = None,
     embed_model: Optional[str] = None,
+    nprobe: Optional[int] = None,
+    fusion: Optional[str] = None,
+    rerank_model: Optional[str] = None,
+    rerank_limit: Optional[int] = None,
 ) -> List[SearchResult]:
     config = RagliteConfig(Path(db_path))
     if embed_model:
         config.embed_model = embed_model
+    if rerank_model:
+        config.rerank_model = rerank_model
+    if alpha is not None:
+        config.alpha = alpha
+    api = RagliteAPI(config)
+    return api.query(
+        text,
+        top_k=top_k,
+        alpha=alpha,
+        rerank=rerank,
+        tags=tags,
+        nprobe=nprobe,
+        fusion=fusion,
+        rerank_limit=rerank_limit,
+    )
+
+
+def query_many(
+    db_path: Path | str,
+    texts: Sequence[str],
+    *,
+    top_k: int = 10,
+    alpha: Optional[float] = None,
+    rerank: bool = False,
+    tags: Optional[Dict[str, str]] = None,
+    embed_model: Optional[str] = None,
+    nprobe: Optional[int] = None,
+    fusion: Optional[str] = None,
+    rerank_model: Optional[str] = None,
+    rerank_limit: Optional[int] = None,
+) -> List[List[SearchResult]]:
+    config = RagliteConfig(Path(db_path))
+    if embed_model:
+        config.embed_model = embed_model
+    if rerank_model:
+        config.rerank_model = rerank_model
     if alpha is not None:
         config.alpha = alpha
     api = RagliteAPI(config)
-    return api.query(text, top_k=top_k, alpha=alpha, rerank=rerank, tags=tags)
+    return api.query_many(
+        texts,
+        top_k=top_k,
+        alpha=alpha,
+        rerank=rerank,
+        tags=tags,
+        nprobe=nprobe,
+        fusion=fusion,
+        rerank_limit=rerank_limit,
+    )
 
 
 def add_tags(db_path: Path | str, document_id: int, tags: Dict[str, str]) -> None:
@@ -0,0 +1,98 @@
+"""In-process query result cache invalidated by database writes."""
+
+from __future__ import annotations
+
+import copy
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """LRU cache with an optional TTL whose entries expire when the database changes.
+
+    A dedicated read-only watcher connection polls ``PRAGMA data_version``, which
+    moves whenever any other connection commits. The cache is flushed as soon as
+    the version moves, so cached results never outlive a write.
+
+    A miss records the version it saw for the calling thread, and ``put`` drops
+    the value if the version has moved since: a result computed before a write
+    must not be stored after the flush that write caused.
+    """
+
+    def __init__(self, db_path: Path | str, *, maxsize: int, ttl: Optional[float] = None):
+        self.db_path = Path(db_path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._watcher: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self._seen = threading.local()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and self.ttl is not None
+                and time.monotonic() - entry[0] > self.ttl
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                self._seen.version = self._version
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            seen = getattr(self._seen, "version", None)
+            self._seen.version = None
+            self._check_version()
+            if seen is None or seen != self._version:
+                return
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+
+    def _check_version(self) -> None:
+        try:
+            if self._watcher is None:
+                self._watcher = sqlite3.connect(
+                    f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+                )
+            version = int(self._watcher.execute("PRAGMA data_version").fetchone()[0])
+        except sqlite3.Error:
+            # Without a watcher we cannot prove freshness, so never serve stale hits.
+            self._entries.clear()
+            self._watcher = None
+            self._version = None
+            return
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
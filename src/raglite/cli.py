@@ -50,9 +50,33 @@ def ingest(
     strategy: str = typer.Option("recursive"),
     embed_model: Optional[str] = typer.Option(None),
     ocr: bool = typer.Option(False, help="Enable OCR for PDFs"),
+    vector_sidecar: bool = typer.Option(
+        False, help="Maintain a memory-mapped <db>.vec sidecar shared by all readers"
+    ),
+    quantization: Optional[str] = typer.Option(
+        None, help="Store int8 codes next to float vectors: int8 or none"
+    ),
+    vector_backend: Optional[str] = typer.Option(
+        None, help="Maintain data for an opt-in vector backend: binary"
+    ),
+    workers: int = typer.Option(1, help="Processes parsing and chunking files; 0 = all cores"),
+    embed_batch_size: int = typer.Option(64, help="Chunks per embedding call, across files"),
+    bulk: bool = typer.Option(
+        False, help="Defer full-text indexing to one rebuild at the end (initial loads)"
+    ),
+    reuse_embeddings: bool = typer.Option(
+        True, help="Reuse stored vectors for chunk text that was embedded before"
+    ),
 ) -> None:
     api = get_api(db, embed_model)
-    result = api.index(path, strategy=strategy, ocr=ocr)
+    if vector_sidecar:
+        api.config.vector_sidecar = True
+    api.config.ingest_workers = workers
+    api.config.embed_batch_size = embed_batch_size
+    api.config.reuse_chunk_embeddings = reuse_embeddings
+    api.config.quantization = quantization
+    api.config.vector_backend = vector_backend
+    result = api.index(path, strategy=strategy, ocr=ocr, bulk=bulk)
     typer.echo(json.dumps(result.__dict__, indent=2))
 
 
@@ -64,23 +88,80 @@ def query(
     alpha: Optional[float] = typer.Option(None),
     rerank: bool = typer.Option(False),
     embed_model: Optional[str] = typer.Option(None),
+    nprobe: Optional[int] = typer.Option(None, help="IVF lists to probe per query"),
+    vector_backend: Optional[str] = typer.Option(None, help="Use an opt-in backend: binary"),
+    fusion: Optional[str] = typer.Option(None, help="Score fusion: weighted or rrf"),
+    rerank_model: Optional[str] = typer.Option(None, help="Cross-encoder used by --rerank"),
+    rerank_limit: Optional[int] = typer.Option(None, help="Fused results rescored by --rerank"),
 ) -> None:
     api = get_api(db, embed_model, alpha=alpha)
-    results = api.query(text, top_k=k, alpha=alpha, rerank=rerank)
+    api.config.vector_backend = vector_backend
+    api.config.rerank_model = rerank_model
+    results = api.query(
+        text,
+        top_k=k,
+        alpha=alpha,
+        rerank=rerank,
+        nprobe=nprobe,
+        fusion=fusion,
+        rerank_limit=rerank_limit,
+    )
     typer.echo(json.dumps([r.__dict__ for r in results], indent=2))
 
 
+@app.command("build-index")
+def build_index(
+    db: Path = typer.Option(Path("raglite.db")),  # noqa: B008
+    kind: str = typer.Option("ivf", help="Index type: ivf or hnsw"),
+    nlist: Optional[int] = typer.Option(None, help="Number of IVF lists (default: sqrt(N))"),
+    iterations: int = typer.Option(10, help="k-means iterations"),
+    m: int = typer.Option(16, help="HNSW links per node"),
+    ef_construction: int = typer.Option(100, help="HNSW candidate list size while building"),
+) -> None:
+    """Build (or rebuild) an approximate nearest-neighbour index."""
+
+    api = get_api(db)
+    result = api.build_index(
+        kind=kind, nlist=nlist, iterations=iterations, m=m, ef_construction=ef_construction
+    )
+    typer.echo(json.dumps(result.__dict__, indent=2))
+
+
 @app.command()
 def serve(
     db: Path = typer.Option(Path("raglite.db")),  # noqa: B008
     host: str = typer.Option("127.0.0.1"),
     port: int = typer.Option(8000),
     embed_model: Optional[str] = typer.Option(None),
+    resident_vectors: bool = typer.Option(
+        False, help="Keep embeddings in a resident NumPy matrix between queries"
+    ),
+    vector_backend: Optional[str] = typer.Option(None, help="Use an opt-in backend: binary"),
+    query_cache_size: int = typer.Option(0, help="Cache this many recent /query results"),
+    query_cache_ttl: Optional[float] = typer.Option(None, help="Expire cached results (s)"),
+    persist_query_embeddings: bool = typer.Option(
+        False, help="Share query embeddings across restarts via the cache dir"
+    ),
+    pool_size: int = typer.Option(4, help="Read-only connections kept open per worker"),
+    rerank_model: Optional[str] = typer.Option(None, help="Cross-encoder for rerank=true"),
 ) -> None:
     env = dict(os.environ)
     env["RAGLITE_DB"] = str(db)
     if embed_model:
         env["RAGLITE_EMBED_MODEL"] = embed_model
+    if resident_vectors:
+        env["RAGLITE_RESIDENT_VECTORS"] = "1"
+    if vector_backend:
+        env["RAGLITE_VECTOR_BACKEND"] = vector_backend
+    if query_cache_size:
+        env["RAGLITE_QUERY_CACHE_SIZE"] = str(query_cache_size)
+    if persist_query_embeddings:
+        env["RAGLITE_PERSIST_QUERY_EMBEDDINGS"] = "1"
+    if query_cache_ttl is not None:
+        env["RAGLITE_QUERY_CACHE_TTL"] = str(query_cache_ttl)
+    env["RAGLITE_POOL_SIZE"] = str(pool_size)
+    if rerank_model:
+        env["RAGLITE_RERANK_MODEL"] = rerank_model
     subprocess.run(
         [
             sys.executable,
@@ -9,7 +9,11 @@ from typing import Dict, Optional
 DEFAULT_EMBED_MODEL = "all-MiniLM-L6-v2"
 DEFAULT_CHUNK_TOKENS = 350
 DEFAULT_CHUNK_OVERLAP = 50
+DEFAULT_EMBED_BATCH_SIZE = 64
 DEFAULT_ALPHA = 0.6
+DEFAULT_FUSION = "weighted"
+DEFAULT_NPROBE = 8
+DEFAULT_EF_SEARCH = 64
 
 
 def _default_cache_dir() -> Path:
@@ -25,8 +29,25 @@ class RagliteConfig:
     cache_dir: Path = field(default_factory=_default_cache_dir)
     chunk_tokens: int = DEFAULT_CHUNK_TOKENS
     chunk_overlap: int = DEFAULT_CHUNK_OVERLAP
+    ingest_workers: int = 1
+    embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE
+    reuse_chunk_embeddings: bool = True
     alpha: float = DEFAULT_ALPHA
+    fusion: str = DEFAULT_FUSION
     rerank_model: Optional[str] = None
+    rerank_limit: Optional[int] = None
+    rerank_cache_size: int = 4096
+    resident_vectors: bool = False
+    vector_sidecar: bool = False
+    nprobe: int = DEFAULT_NPROBE
+    ef_search: int = DEFAULT_EF_SEARCH
+    quantization: Optional[str] = None
+    vector_backend: Optional[str] = None
+    query_cache_size: int = 0
+    query_cache_ttl: Optional[float] = None
+    query_embedding_cache_size: int = 1024
+    persist_query_embeddings: bool = False
+    pool_size: int = 4
     extra_metadata: Dict[str, str] = field(default_factory=dict)
 
     def ensure_cache_dir(self) -> Path:
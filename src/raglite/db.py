@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .embed import embedding_norm
 
 SCHEMA_PATH = Path(__file__).with_name("schema.sql")
 
@@ -18,19 +22,53 @@ PRAGMAS = {
 }
 
 
+VECTOR_EXTENSIONS = ("sqlite_vec", "vec0")
+
+# Columns added after a table first shipped; ``apply_migrations`` adds any that
+# an existing database is missing.
+COLUMN_MIGRATIONS: Dict[str, Dict[str, str]] = {
+    "documents": {
+        "size": "INTEGER",
+        "mtime_ns": "INTEGER",
+        "content_hash": "TEXT",
+    },
+    "embeddings": {
+        "qvec": "BLOB",
+        "qscale": "REAL",
+        "qoffset": "REAL",
+        "sig": "BLOB",
+        "norm": "REAL",
+        "normalized": "INTEGER NOT NULL DEFAULT 0",
+    },
+}
+
+TAGS_BACKFILL_KEY = "chunk_tags_backfilled"
+# Bumped whenever an ANN index is built or dropped so cached backend
+# selections (see ``vector.backend.detect_backend``) are re-detected.
+BACKENDS_KEY = "vector_backends_generation"
+
+# Process-wide outcome of the extension probe: unset until the first
+# connection tries, then the loadable name that worked or ``None``.
+_EXTENSION_PROBE: Dict[str, Optional[str]] = {}
+_EXTENSION_LOCK = threading.Lock()
+
+
 class RagliteDatabaseError(RuntimeError):
     """Raised for database specific errors."""
 
 
-def connect(db_path: Path | str, *, read_only: bool = False) -> sqlite3.Connection:
+def connect(
+    db_path: Path | str, *, read_only: bool = False, check_same_thread: bool = True
+) -> sqlite3.Connection:
     path = Path(db_path)
     if read_only:
         uri = f"file:{path}?mode=ro"
-        conn = sqlite3.connect(uri, uri=True)
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
     else:
-        conn = sqlite3.connect(path)
+        conn = sqlite3.connect(path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     _apply_pragmas(conn)
+    load_vector_extension(conn)
     return conn
 
 
@@ -39,11 +77,182 @@ def _apply_pragmas(conn: sqlite3.Connection) -> None:
         conn.execute(f"PRAGMA {pragma}={value}")
 
 
+def load_vector_extension(conn: sqlite3.Connection) -> Optional[str]:
+    """Load sqlite-vec into ``conn`` if possible and return the name that worked.
+
+    Writers need the extension once the ``vec_embeddings`` index exists because
+    its sync triggers touch the ``vec0`` virtual table. The candidate names are
+    probed once per process; later connections only load the one that worked,
+    or skip loading entirely when none did.
+    """
+
+    if not hasattr(conn, "enable_load_extension"):
+        return None
+    with _EXTENSION_LOCK:
+        probed = "result" in _EXTENSION_PROBE
+        known = _EXTENSION_PROBE.get("result")
+    if probed and known is None:
+        return None
+    candidates = [known] if known is not None else _extension_candidates()
+    try:
+        conn.enable_load_extension(True)
+    except sqlite3.OperationalError:
+        loaded = None
+    else:
+        try:
+            loaded = _load_first(conn, candidates)
+        finally:
+            conn.enable_load_extension(False)
+    if not probed:
+        with _EXTENSION_LOCK:
+            _EXTENSION_PROBE.setdefault("result", loaded)
+    return loaded
+
+
+def reset_extension_probe() -> None:
+    """Forget the cached extension probe, e.g. after installing sqlite-vec."""
+
+    with _EXTENSION_LOCK:
+        _EXTENSION_PROBE.clear()
+
+
+def _extension_candidates() -> List[str]:
+    candidates = list(VECTOR_EXTENSIONS)
+    try:
+        import sqlite_vec
+    except Exception:  # pragma: no cover - optional dependency
+        pass
+    else:
+        candidates.insert(0, sqlite_vec.loadable_path())
+    return candidates
+
+
+def _load_first(conn: sqlite3.Connection, candidates: List[str]) -> Optional[str]:
+    for ext in candidates:
+        try:
+            conn.load_extension(ext)
+        except sqlite3.OperationalError:
+            continue
+        return ext
+    return None
+
+
 def apply_migrations(conn: sqlite3.Connection, schema_path: Optional[Path] = None) -> None:
     path = schema_path or SCHEMA_PATH
     sql = path.read_text(encoding="utf-8")
     with conn:
         conn.executescript(sql)
+        added = _add_missing_columns(conn)
+        if ("embeddings", "norm") in added:
+            backfill_norms(conn)
+        if not read_meta(conn, TAGS_BACKFILL_KEY):
+            backfill_chunk_tags(conn)
+            write_meta(conn, TAGS_BACKFILL_KEY, "1")
+        _ensure_unique_paths(conn)
+
+
+def _ensure_unique_paths(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_documents_path_unique'"
+    ).fetchone()
+    if exists:
+        return
+    collapse_duplicate_paths(conn)
+    conn.execute("CREATE UNIQUE INDEX idx_documents_path_unique ON documents(path)")
+
+
+def collapse_duplicate_paths(conn: sqlite3.Connection) -> int:
+    """Keep the newest ``documents`` row per path and delete the rest with their chunks.
+
+    Databases written before incremental ingest may hold one row per ingest
+    of the same file. Returns the number of rows removed.
+    """
+
+    stale = [
+        int(row[0])
+        for row in conn.execute(
+            """
+            SELECT id FROM documents d
+            WHERE EXISTS (SELECT 1 FROM documents n WHERE n.path = d.path AND n.id > d.id)
+            """
+        )
+    ]
+    if not stale:
+        return 0
+    ids = json.dumps(stale)
+    conn.execute(
+        "DELETE FROM embeddings WHERE chunk_id IN (SELECT id FROM chunks"
+        " WHERE document_id IN (SELECT value FROM json_each(?)))",
+        (ids,),
+    )
+    conn.execute("DELETE FROM chunks WHERE document_id IN (SELECT value FROM json_each(?))", (ids,))
+    conn.execute("DELETE FROM documents WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+    return len(stale)
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> Set[Tuple[str, str]]:
+    added: Set[Tuple[str, str]] = set()
+    for table, columns in COLUMN_MIGRATIONS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column, decl in columns.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+                added.add((table, column))
+    return added
+
+
+def backfill_norms(conn: sqlite3.Connection) -> int:
+    """Fill ``embeddings.norm``/``normalized`` for rows written before they existed."""
+
+    rows = conn.execute("SELECT id, embedding FROM embeddings WHERE norm IS NULL").fetchall()
+    updates = []
+    for row in rows:
+        norm, normalized = embedding_norm(row[1])
+        updates.append((norm, int(normalized), int(row[0])))
+    conn.executemany("UPDATE embeddings SET norm = ?, normalized = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def backfill_chunk_tags(conn: sqlite3.Connection) -> None:
+    """Index ``tags_json`` of chunks written before ``chunk_tags`` existed."""
+
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO chunk_tags(chunk_id, key, value)
+        SELECT c.id, j.key, j.value
+        FROM chunks c, json_each(c.tags_json) j
+        WHERE c.tags_json IS NOT NULL AND c.tags_json != '{}'
+        """
+    )
+
+
+def read_meta(conn: sqlite3.Connection, key: str, default: str = "") -> str:
+    """Read a per-database setting from ``raglite_meta``."""
+
+    try:
+        row = conn.execute("SELECT value FROM raglite_meta WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return default
+    return str(row[0]) if row else default
+
+
+def write_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute("INSERT OR REPLACE INTO raglite_meta(key, value) VALUES (?, ?)", (key, value))
+
+
+def mark_backends_changed(conn: sqlite3.Connection) -> None:
+    """Record that the set of usable vector backends changed; call inside a transaction."""
+
+    write_meta(conn, BACKENDS_KEY, str(int(read_meta(conn, BACKENDS_KEY, "0")) + 1))
+
+
+def database_path(conn: sqlite3.Connection) -> Optional[str]:
+    """Return the file backing the ``main`` schema, or ``None`` for in-memory databases."""
+
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return str(row[2]) or None
+    return None
 
 
 @contextmanager
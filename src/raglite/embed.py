@@ -3,11 +3,21 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import math
+import sqlite3
+import threading
 from array import array
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import List, Sequence
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Vectors whose stored norm is this close to 1.0 are flagged ``normalized``.
+NORMALIZED_TOLERANCE = 1e-4
+# Chunk vectors kept in memory during one ingest run.
+DEFAULT_CHUNK_CACHE_SIZE = 16384
 
 
 @dataclass
@@ -86,12 +96,197 @@ def get_embedding_store(model_name: str) -> EmbeddingStore:
     return SentenceTransformerStore(model_name)
 
 
+class QueryEmbeddingCache:
+    """Content-addressed cache of query vectors keyed on (model, normalized text).
+
+    Lookups hit a bounded in-memory LRU first, then the optional SQLite file at
+    ``path`` (shared by every process that points at it), and only the misses
+    are sent to the model in one ``embed_many`` call.
+    """
+
+    def __init__(self, *, maxsize: int = 1024, path: Optional[Path] = None) -> None:
+        self.maxsize = maxsize
+        self.path = path
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def embed_many(self, store: EmbeddingStore, texts: Sequence[str]) -> List[bytes]:
+        keys = [_query_key(store.model_name, text) for text in texts]
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            for key in keys:
+                blob = self._memory.get(key)
+                if blob is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    found[key] = blob
+            pending = [key for key in dict.fromkeys(keys) if key not in found]
+            if pending:
+                from_disk = self._read(pending)
+                self.disk_hits += len(from_disk)
+                for key, blob in from_disk.items():
+                    found[key] = blob
+                    self._remember(key, blob)
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = store.embed_many(list(missing.values()))
+            fresh = list(zip(missing, vectors, strict=True))
+            with self._lock:
+                self.misses += len(fresh)
+                for key, blob in fresh:
+                    found[key] = blob
+                    self._remember(key, blob)
+                self._write([(key, store.model_name, blob) for key, blob in fresh])
+        return [found[key] for key in keys]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _read(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        conn = self._connection()
+        if conn is None:
+            return {}
+        rows = conn.execute(
+            "SELECT key, vector FROM query_embeddings "
+            "WHERE key IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(keys)),),
+        ).fetchall()
+        return {str(row[0]): bytes(row[1]) for row in rows}
+
+    def _write(self, rows: Sequence[Tuple[str, str, bytes]]) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings(key, model, vector) VALUES (?, ?, ?)",
+                rows,
+            )
+
+
+class ChunkEmbeddingCache:
+    """Content-addressed chunk vectors keyed on (model, SHA-256 of the chunk text).
+
+    Ingest consults a bounded in-memory LRU of vectors seen during the run,
+    then the index's ``embedding_cache`` table through the read-only ``conn``,
+    so boilerplate repeated across documents reaches the model once. The table
+    only points at an ``embeddings`` row, never a second copy of the vector,
+    and a trigger drops the entry when that row is deleted.
+    """
+
+    def __init__(
+        self,
+        conn: Optional[sqlite3.Connection],
+        model_name: str,
+        dimension: int,
+        *,
+        maxsize: int = DEFAULT_CHUNK_CACHE_SIZE,
+    ) -> None:
+        self.conn = conn
+        self.model_name = model_name
+        self.dimension = dimension
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def lookup(self, texts: Sequence[str]) -> List[Optional[bytes]]:
+        """Return the cached vector for each text, ``None`` where there is none."""
+
+        keys = [chunk_text_hash(text) for text in texts]
+        found: Dict[str, bytes] = {}
+        for key in keys:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                found[key] = blob
+        pending = [key for key in dict.fromkeys(keys) if key not in found]
+        if pending and self.conn is not None:
+            rows = self.conn.execute(
+                """
+                SELECT c.text_hash, e.embedding
+                FROM embedding_cache c
+                JOIN embeddings e ON e.id = c.embedding_id
+                WHERE c.model = ? AND e.dim = ?
+                  AND c.text_hash IN (SELECT value FROM json_each(?))
+                """,
+                (self.model_name, self.dimension, json.dumps(pending)),
+            ).fetchall()
+            for key, blob in rows:
+                found[str(key)] = bytes(blob)
+                self.remember(str(key), bytes(blob))
+        return [found.get(key) for key in keys]
+
+    def remember(self, key: str, blob: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+def chunk_text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 def embedding_from_bytes(blob: bytes) -> array:
     vec = array("f")
     vec.frombytes(blob)
     return vec
 
 
+def embedding_norm(blob: bytes) -> Tuple[float, bool]:
+    """Return the L2 norm of a float32 blob and whether it is unit length."""
+
+    norm = math.sqrt(sum(v * v for v in embedding_from_bytes(blob)))
+    return norm, abs(norm - 1.0) <= NORMALIZED_TOLERANCE
+
+
 def _load_sentence_transformer(model_name: str):  # pragma: no cover - heavy load
     try:
         from sentence_transformers import SentenceTransformer
@@ -100,6 +295,11 @@ def _load_sentence_transformer(model_name: str):  # pragma: no cover - heavy loa
     return SentenceTransformer(model_name)
 
 
+def _query_key(model_name: str, text: str) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
 def _character_ngrams(text: str, n: int = 3) -> List[str]:
     if len(text) < n:
         return [text]
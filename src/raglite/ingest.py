@@ -2,18 +2,48 @@
 
 from __future__ import annotations
 
+import hashlib
 import mimetypes
+import multiprocessing
 import os
+import queue
 import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from types import ModuleType
-from typing import Iterator, List, Sequence, Tuple
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from . import chunk as chunk_utils
 from .config import RagliteConfig
-from .db import apply_migrations, connect
-from .embed import get_embedding_store
+from .db import apply_migrations, connect, read_meta, write_meta
+from .embed import (
+    ChunkEmbeddingCache,
+    EmbeddingStore,
+    chunk_text_hash,
+    embedding_norm,
+    get_embedding_store,
+)
+from .vector.binary import enable_signatures, sign_bits, signatures_enabled
+from .vector.hnsw import add_embeddings, discard_graph, publish_graph
+from .vector.ivf import assign_embeddings
+from .vector.quantize import quantization_mode, quantize_int8, set_quantization
+from .vector.sidecar import sidecar_path, sync_sidecar
+from .vector.sqlite_ext import prepare_vec_index
 
 try:
     import readability as _readability
@@ -61,6 +91,39 @@ class IngestResult:
     documents: int
     chunks: int
     embeddings: int
+    skipped: int = 0
+    replaced: int = 0
+    reused: int = 0
+
+
+@dataclass
+class SourceFile:
+    """A discovered file plus the ``documents`` row it was indexed as, if any."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    document_id: Optional[int] = None
+    content_hash: Optional[str] = None
+    stale_ids: Tuple[int, ...] = ()
+
+
+@dataclass
+class ParsedDocument:
+    path: Path
+    mime: str
+    chunks: List[str]
+    source: Optional[SourceFile] = None
+    content_hash: Optional[str] = None
+    unchanged: bool = False
+
+
+# Parsed-and-embedded documents waiting for the writer thread; bounds memory
+# when parsing and embedding outpace SQLite.
+WRITE_QUEUE_SIZE = 8
+
+# Per-row FTS maintenance that bulk loads replace with one rebuild.
+FTS_INSERT_TRIGGERS = ("chunks_ai",)
 
 
 TEXT_MIME_TYPES = {
@@ -124,39 +187,347 @@ def ingest_path(
     config: RagliteConfig,
     strategy: str = "recursive",
     ocr: bool = False,
+    bulk: bool = False,
 ) -> IngestResult:
-    conn = connect(db_path)
-    apply_migrations(conn)
-    embedding_store = get_embedding_store(config.embed_model)
-    total_docs = 0
-    total_chunks = 0
-    total_embeddings = 0
-
-    with conn:
-        for file_path in discover_files(corpus_path):
-            try:
-                doc_text, mime = load_file(file_path, ocr=ocr)
-            except UnsupportedDocument:
-                continue
-            if not doc_text.strip():
-                continue
-            total_docs += 1
-            doc_id = insert_document(conn, file_path, mime)
-            chunk_texts = chunk_utils.chunk_text(
-                doc_text,
+    """Ingest every supported file under ``corpus_path`` in one transaction.
+
+    The work is pipelined: ``config.ingest_workers`` processes parse and chunk
+    files, this thread embeds chunks in batches of ``config.embed_batch_size``
+    drawn across documents, and a single writer thread owns the SQLite
+    connection. Bounded queues between the stages provide
+    backpressure, and documents are written in discovery order.
+
+    ``bulk`` drops the per-row ``chunk_fts`` trigger for the load and rebuilds
+    the index once at the end, which pays off for large initial loads.
+
+    Re-ingest is incremental: a file whose size and mtime match its
+    ``documents`` row is skipped without being read, one whose content hash
+    still matches only has its stat refreshed, and a changed one has its
+    chunks, embeddings and FTS rows replaced under the same document id.
+
+    With ``config.reuse_chunk_embeddings`` chunk vectors are looked up by
+    (model, text hash) in the ``embedding_cache`` table first, so repeated
+    boilerplate is only embedded once.
+    """
+
+    conn = connect(db_path, check_same_thread=False)
+    reader: Optional[sqlite3.Connection] = None
+    try:
+        apply_migrations(conn)
+        if config.vector_sidecar and (config.quantization or quantization_mode(conn)) == "int8":
+            raise ValueError("The vector sidecar holds float32 only; it cannot be used with int8")
+        if config.quantization and config.quantization != quantization_mode(conn):
+            set_quantization(conn, config.quantization)
+        if config.vector_backend == "binary" and not signatures_enabled(conn):
+            enable_signatures(conn)
+        embedding_store = get_embedding_store(config.embed_model)
+        writer = _IngestWriter(
+            conn,
+            embedding_store.model_name,
+            embedding_store.dimension,
+            bulk=bulk,
+            cache_vectors=config.reuse_chunk_embeddings,
+        )
+        cache = None
+        if config.reuse_chunk_embeddings:
+            reader = connect(db_path, read_only=True)
+            cache = ChunkEmbeddingCache(
+                reader, embedding_store.model_name, embedding_store.dimension
+            )
+        known = known_documents(conn)
+        skipped = 0
+        writer.start()
+        try:
+            sources: List[SourceFile] = []
+            queued: Set[Path] = set()
+            for file_path in discover_files(corpus_path):
+                source = _source_file(file_path, known)
+                if source.path in queued:
+                    # A symlink or second spelling of a file already seen this run.
+                    continue
+                queued.add(source.path)
+                if source.document_id is not None and _stat_matches(source, known):
+                    skipped += 1
+                    continue
+                sources.append(source)
+            parsed_documents = parse_documents(
+                sources,
+                workers=_worker_count(config.ingest_workers),
+                ocr=ocr,
                 strategy=strategy,
                 max_tokens=config.chunk_tokens,
                 overlap=config.chunk_overlap,
             )
-            chunks = insert_chunks(conn, doc_id, chunk_texts)
-            total_chunks += len(chunks)
-            embeddings = embedding_store.embed_many([c.text for c in chunks])
-            total_embeddings += len(embeddings)
-            insert_embeddings(
-                conn, chunks, embeddings, embedding_store.model_name, embedding_store.dimension
+            batcher = _EmbedBatcher(embedding_store, config.embed_batch_size, writer.put, cache)
+            for parsed in parsed_documents:
+                if parsed is not None:
+                    batcher.add(parsed)
+            batcher.flush()
+        except BaseException:
+            writer.abort()
+            raise
+        result = writer.finish()
+        result.skipped += skipped
+        result.reused = batcher.reused
+        if config.vector_sidecar or sidecar_path(db_path).exists():
+            sync_sidecar(conn, db_path, embedding_store.dimension)
+        prepare_vec_index(conn)
+    finally:
+        if reader is not None:
+            reader.close()
+        conn.close()
+    return result
+
+
+def parse_document(
+    source: SourceFile, *, ocr: bool, strategy: str, max_tokens: int, overlap: int
+) -> Optional[ParsedDocument]:
+    """Load and chunk one file; ``None`` when a new file is unsupported or empty.
+
+    A file that was indexed before is hashed first and comes back ``unchanged``
+    (without being parsed) when its content hash still matches. If it is now
+    unsupported or empty it comes back with no chunks, so the writer drops its
+    old chunks and records the new stat and hash.
+    """
+
+    path = source.path
+    content_hash = None
+    if source.document_id is not None:
+        content_hash = file_hash(path)
+        if content_hash == source.content_hash and not source.stale_ids:
+            return ParsedDocument(path, "", [], source, content_hash, unchanged=True)
+    try:
+        doc_text, mime = load_file(path, ocr=ocr)
+    except UnsupportedDocument:
+        doc_text, mime = "", ""
+    if not doc_text.strip():
+        if content_hash is None:
+            return None
+        return ParsedDocument(path, "", [], source, content_hash)
+    chunk_texts = chunk_utils.chunk_text(
+        doc_text, strategy=strategy, max_tokens=max_tokens, overlap=overlap
+    )
+    return ParsedDocument(path, mime, chunk_texts, source, content_hash or file_hash(path))
+
+
+def parse_documents(
+    paths: Iterable[SourceFile], *, workers: int, **options: Any
+) -> Iterator[Optional[ParsedDocument]]:
+    """Yield :func:`parse_document` for ``paths`` in order, using ``workers`` processes.
+
+    At most ``2 * workers`` files are in flight, so a slow consumer stalls the
+    pool instead of buffering the whole corpus.
+    """
+
+    if workers <= 1:
+        for path in paths:
+            yield parse_document(path, **options)
+        return
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending: Deque[Future] = deque()
+        try:
+            for path in paths:
+                pending.append(pool.submit(parse_document, path, **options))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class _EmbedBatcher:
+    """Embed chunks in fixed-size batches that span document boundaries.
+
+    A document is handed to ``emit`` (in arrival order) as soon as the batch
+    holding its last chunk has been embedded. Tiny documents share a batch,
+    and a huge one is split across several. With a ``cache``, chunks whose
+    text was embedded before never enter a batch, and repeats within a batch
+    are embedded once.
+    """
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        batch_size: int,
+        emit: Callable[[Tuple[ParsedDocument, List[bytes]]], None],
+        cache: Optional[ChunkEmbeddingCache] = None,
+    ) -> None:
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.emit = emit
+        self.cache = cache
+        self.reused = 0
+        self._documents: Deque[Tuple[ParsedDocument, List[Optional[bytes]]]] = deque()
+        self._pending: Deque[Tuple[str, List[Optional[bytes]], int]] = deque()
+
+    def add(self, parsed: ParsedDocument) -> None:
+        vectors: List[Optional[bytes]]
+        if self.cache is not None and parsed.chunks:
+            vectors = self.cache.lookup(parsed.chunks)
+            self.reused += sum(1 for vector in vectors if vector is not None)
+        else:
+            vectors = [None] * len(parsed.chunks)
+        self._documents.append((parsed, vectors))
+        self._pending.extend(
+            (text, vectors, idx)
+            for idx, (text, vector) in enumerate(zip(parsed.chunks, vectors, strict=True))
+            if vector is None
+        )
+        while len(self._pending) >= self.batch_size:
+            self._embed(self.batch_size)
+        self._emit_ready()
+
+    def flush(self) -> None:
+        while self._pending:
+            self._embed(min(self.batch_size, len(self._pending)))
+        self._emit_ready()
+
+    def _embed(self, size: int) -> None:
+        batch = [self._pending.popleft() for _ in range(size)]
+        if self.cache is None:
+            vectors = self.store.embed_many([text for text, _, _ in batch])
+            for (_, target, idx), vector in zip(batch, vectors, strict=True):
+                target[idx] = vector
+            return
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        embedded = dict(zip(texts, self.store.embed_many(texts), strict=True))
+        self.reused += len(batch) - len(texts)
+        for text, target, idx in batch:
+            target[idx] = embedded[text]
+        for text, vector in embedded.items():
+            self.cache.remember(chunk_text_hash(text), vector)
+
+    def _emit_ready(self) -> None:
+        while self._documents:
+            parsed, vectors = self._documents[0]
+            if any(vector is None for vector in vectors):
+                return
+            self._documents.popleft()
+            self.emit((parsed, [vector for vector in vectors if vector is not None]))
+
+
+class _IngestWriter:
+    """Single thread that owns the connection and writes documents in one transaction."""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        model: str,
+        dim: int,
+        *,
+        bulk: bool = False,
+        cache_vectors: bool = False,
+    ) -> None:
+        self.conn = conn
+        self.model = model
+        self.dim = dim
+        self.bulk = bulk
+        self.cache_vectors = cache_vectors
+        self.totals: Dict[str, int] = {
+            "documents": 0,
+            "chunks": 0,
+            "embeddings": 0,
+            "skipped": 0,
+            "replaced": 0,
+        }
+        self.error: Optional[BaseException] = None
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._aborted = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="raglite-ingest-writer")
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def put(self, item: Optional[Tuple[ParsedDocument, List[bytes]]]) -> None:
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def abort(self) -> None:
+        self._aborted.set()
+        self._thread.join()
+
+    def finish(self) -> IngestResult:
+        self.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return IngestResult(**self.totals)
+
+    def _run(self) -> None:
+        try:
+            with self.conn:
+                triggers: List[str] = []
+                if self.bulk:
+                    # DDL does not open a transaction implicitly; the trigger
+                    # drop must share the load's transaction to roll back with it.
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    triggers = suspend_fts_triggers(self.conn)
+                while True:
+                    try:
+                        item = self._queue.get(timeout=0.1)
+                    except queue.Empty:
+                        if self._aborted.is_set():
+                            raise RuntimeError("Ingest aborted") from None
+                        continue
+                    if item is None:
+                        break
+                    self._write(*item)
+                if self.bulk:
+                    rebuild_fts(self.conn, triggers)
+        except BaseException as exc:  # re-raised on the producer side
+            self.error = exc
+            discard_graph(self.conn)
+        else:
+            publish_graph(self.conn)
+
+    def _write(self, parsed: ParsedDocument, vectors: List[bytes]) -> None:
+        source = parsed.source
+        if parsed.unchanged:
+            assert source is not None and source.document_id is not None
+            update_document(self.conn, source.document_id, source)
+            self.totals["skipped"] += 1
+            return
+        if source is not None and source.document_id is not None:
+            doc_id = source.document_id
+            for stale_id in source.stale_ids:
+                delete_document_chunks(self.conn, stale_id)
+                self.conn.execute("DELETE FROM documents WHERE id = ?", (stale_id,))
+            delete_document_chunks(self.conn, doc_id)
+            update_document(
+                self.conn,
+                doc_id,
+                source,
+                mime=parsed.mime or None,
+                content_hash=parsed.content_hash,
+            )
+            self.totals["replaced"] += 1
+            if not parsed.chunks:
+                # Emptied or now unsupported: keep the row so the next run skips it by stat.
+                return
+        else:
+            doc_id = insert_document(
+                self.conn, parsed.path, parsed.mime, source=source, content_hash=parsed.content_hash
             )
-    conn.close()
-    return IngestResult(total_docs, total_chunks, total_embeddings)
+        chunks = insert_chunks(self.conn, doc_id, parsed.chunks)
+        embedding_ids = insert_embeddings(self.conn, chunks, vectors, self.model, self.dim)
+        if self.cache_vectors:
+            cache_chunk_embeddings(self.conn, parsed.chunks, embedding_ids, self.model)
+        self.totals["documents"] += 1
+        self.totals["chunks"] += len(chunks)
+        self.totals["embeddings"] += len(vectors)
+
+
+def _worker_count(configured: int) -> int:
+    return configured if configured > 0 else os.cpu_count() or 1
 
 
 def load_file(path: Path, *, ocr: bool = False) -> Tuple[str, str]:
@@ -174,30 +545,137 @@ def load_file(path: Path, *, ocr: bool = False) -> Tuple[str, str]:
     raise UnsupportedDocument(f"Unsupported file: {path}")
 
 
-def insert_document(conn: sqlite3.Connection, path: Path, mime: str) -> int:
+def insert_document(
+    conn: sqlite3.Connection,
+    path: Path,
+    mime: str,
+    *,
+    source: Optional[SourceFile] = None,
+    content_hash: Optional[str] = None,
+) -> int:
     cur = conn.execute(
-        "INSERT INTO documents(path, title, mime) VALUES (?, ?, ?)",
-        (str(path), path.stem, mime),
+        """
+        INSERT INTO documents(path, title, mime, size, mtime_ns, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (
+            str(path),
+            path.stem,
+            mime,
+            source.size if source else None,
+            source.mtime_ns if source else None,
+            content_hash,
+        ),
     )
     row_id = cur.lastrowid
     assert row_id is not None
     return int(row_id)
 
 
+def update_document(
+    conn: sqlite3.Connection,
+    document_id: int,
+    source: SourceFile,
+    *,
+    mime: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> None:
+    """Record a file's new stat, and its new mime and hash when the content changed."""
+
+    conn.execute(
+        """
+        UPDATE documents
+        SET path = ?, size = ?, mtime_ns = ?, mime = COALESCE(?, mime),
+            content_hash = COALESCE(?, content_hash)
+        WHERE id = ?
+        """,
+        (str(source.path), source.size, source.mtime_ns, mime, content_hash, document_id),
+    )
+
+
+def delete_document_chunks(conn: sqlite3.Connection, document_id: int) -> None:
+    """Remove a document's embeddings and chunks; triggers clean FTS, tags and ANN rows."""
+
+    conn.execute(
+        "DELETE FROM embeddings WHERE chunk_id IN (SELECT id FROM chunks WHERE document_id = ?)",
+        (document_id,),
+    )
+    conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+
+
+def known_documents(conn: sqlite3.Connection) -> Dict[str, SourceFile]:
+    """Map each indexed path to its latest ``documents`` row.
+
+    Older databases may hold relative paths and several rows per file; those
+    are keyed on the resolved path and the extra ids are kept as ``stale_ids``
+    so the next change to the file collapses them.
+    """
+
+    known: Dict[str, SourceFile] = {}
+    rows = conn.execute(
+        "SELECT id, path, size, mtime_ns, content_hash FROM documents ORDER BY id DESC"
+    )
+    for doc_id, path, size, mtime_ns, content_hash in rows:
+        resolved = Path(path).resolve()
+        entry = known.get(str(resolved))
+        if entry is None:
+            known[str(resolved)] = SourceFile(resolved, size, mtime_ns, int(doc_id), content_hash)
+        else:
+            entry.stale_ids += (int(doc_id),)
+    return known
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_file(path: Path, known: Dict[str, SourceFile]) -> SourceFile:
+    resolved = path.resolve()
+    stat = resolved.stat()
+    entry = known.get(str(resolved))
+    if entry is None:
+        return SourceFile(resolved, stat.st_size, stat.st_mtime_ns)
+    return SourceFile(
+        resolved,
+        stat.st_size,
+        stat.st_mtime_ns,
+        entry.document_id,
+        entry.content_hash,
+        entry.stale_ids,
+    )
+
+
+def _stat_matches(source: SourceFile, known: Dict[str, SourceFile]) -> bool:
+    entry = known[str(source.path)]
+    return (
+        entry.content_hash is not None
+        and not entry.stale_ids
+        and (entry.size, entry.mtime_ns) == (source.size, source.mtime_ns)
+    )
+
+
 def insert_chunks(
     conn: sqlite3.Connection, document_id: int, chunk_texts: Sequence[str]
 ) -> List[IngestedChunk]:
-    chunks: List[IngestedChunk] = []
-    for idx, text in enumerate(chunk_texts):
-        tokens = chunk_utils.estimate_tokens(text)
-        cur = conn.execute(
-            "INSERT INTO chunks(document_id, chunk_idx, text, tokens) VALUES (?, ?, ?, ?)",
-            (document_id, idx, text, tokens),
-        )
-        chunk_row_id = cur.lastrowid
-        assert chunk_row_id is not None
-        chunk_id = int(chunk_row_id)
-        chunks.append(IngestedChunk(chunk_id, document_id, idx, text, tokens))
+    """Insert ``chunk_texts`` with one ``executemany``; call inside a write transaction.
+
+    Ids are reserved up front from :func:`_next_id`, so callers still learn
+    every id.
+    """
+
+    first_id = _next_id(conn, "chunks", len(chunk_texts))
+    chunks = [
+        IngestedChunk(first_id + idx, document_id, idx, text, chunk_utils.estimate_tokens(text))
+        for idx, text in enumerate(chunk_texts)
+    ]
+    conn.executemany(
+        "INSERT INTO chunks(id, document_id, chunk_idx, text, tokens) VALUES (?, ?, ?, ?, ?)",
+        [(c.id, c.document_id, c.chunk_idx, c.text, c.tokens) for c in chunks],
+    )
     return chunks
 
 
@@ -207,9 +685,87 @@ def insert_embeddings(
     vectors: Sequence[bytes],
     model: str,
     dim: int,
-) -> None:
-    for chunk, vector in zip(chunks, vectors, strict=False):
-        conn.execute(
-            "INSERT INTO embeddings(chunk_id, model, dim, embedding) VALUES (?, ?, ?, ?)",
-            (chunk.id, model, dim, vector),
+) -> List[int]:
+    quantize = quantization_mode(conn) == "int8"
+    signatures = signatures_enabled(conn)
+    first_id = _next_id(conn, "embeddings", len(vectors))
+    rows = []
+    inserted: List[Tuple[int, int, bytes]] = []
+    for offset, (chunk, vector) in enumerate(zip(chunks, vectors, strict=False)):
+        codes = quantize_int8(vector) if quantize else (None, None, None)
+        sig = sign_bits(vector) if signatures else None
+        norm, normalized = embedding_norm(vector)
+        rows.append(
+            (first_id + offset, chunk.id, model, dim, vector, *codes, sig, norm, int(normalized))
         )
+        inserted.append((first_id + offset, chunk.id, vector))
+    conn.executemany(
+        """
+        INSERT INTO embeddings(
+            id, chunk_id, model, dim, embedding, qvec, qscale, qoffset, sig, norm, normalized
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    assign_embeddings(conn, inserted)
+    add_embeddings(conn, inserted)
+    return [row[0] for row in inserted]
+
+
+def cache_chunk_embeddings(
+    conn: sqlite3.Connection,
+    texts: Sequence[str],
+    embedding_ids: Sequence[int],
+    model: str,
+) -> None:
+    """Point each text's cache entry at its newest embedding row."""
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO embedding_cache(model, text_hash, embedding_id) VALUES (?, ?, ?)",
+        [
+            (model, chunk_text_hash(text), embedding_id)
+            for text, embedding_id in zip(texts, embedding_ids, strict=True)
+        ],
+    )
+
+
+def suspend_fts_triggers(conn: sqlite3.Connection) -> List[str]:
+    """Drop the per-row ``chunk_fts`` insert trigger and return its SQL for restoring.
+
+    Run inside the load's transaction so a failure also restores the trigger.
+    """
+
+    saved = []
+    for name in FTS_INSERT_TRIGGERS:
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)
+        ).fetchone()
+        if row is not None:
+            saved.append(str(row[0]))
+            conn.execute(f"DROP TRIGGER {name}")
+    return saved
+
+
+def rebuild_fts(conn: sqlite3.Connection, triggers: Sequence[str]) -> None:
+    """Rebuild and optimize ``chunk_fts`` from ``chunks``, then restore ``triggers``."""
+
+    conn.execute("INSERT INTO chunk_fts(chunk_fts) VALUES('rebuild')")
+    conn.execute("INSERT INTO chunk_fts(chunk_fts) VALUES('optimize')")
+    for sql in triggers:
+        conn.execute(sql)
+
+
+def _next_id(conn: sqlite3.Connection, table: str, count: int) -> int:
+    """Reserve ``count`` ids in ``table`` and return the first one.
+
+    A high-water mark in ``raglite_meta`` keeps ids monotonic: ids freed by
+    replacing or deleting the newest document are never handed out again.
+    The resident matrix, the sidecar and the HNSW graph all assume that
+    ``MAX(rowid)`` only grows and that an id always names the same vector.
+    """
+
+    key = f"{table}_next_id"
+    table_next = conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+    first = max(int(read_meta(conn, key, "0") or 0), int(table_next))
+    write_meta(conn, key, str(first + count))
+    return first
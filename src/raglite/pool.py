@@ -0,0 +1,134 @@
+"""Thread-safe pool of long-lived SQLite connections."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .db import connect
+
+
+class ConnectionPool:
+    """Up to ``size`` read-only connections plus one serialized writer.
+
+    Connections stay open between calls, so their page cache, prepared
+    statements and loaded extension survive across queries. Every checkout
+    runs a cheap health check and replaces a connection that fails it; a
+    connection returned mid-transaction is rolled back before reuse.
+    """
+
+    def __init__(self, db_path: Path | str, *, size: int = 4):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.db_path = Path(db_path)
+        self.size = size
+        self.replaced = 0
+        self._idle: List[sqlite3.Connection] = []
+        self._open = 0
+        self._available = threading.Condition()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._writer_lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._writer is None or not self._healthy(self._writer):
+                self._writer = self._connect(read_only=False)
+            try:
+                yield self._writer
+            finally:
+                _reset(self._writer)
+
+    def stats(self) -> Dict[str, int]:
+        with self._available:
+            return {
+                "size": self.size,
+                "open_readers": self._open,
+                "idle_readers": len(self._idle),
+                "replaced": self.replaced,
+            }
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._open -= len(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _checkout(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = None
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                self._available.wait()
+        if conn is not None and self._healthy(conn):
+            return conn
+        if conn is not None:
+            with self._available:
+                self.replaced += 1
+        try:
+            return self._connect(read_only=True)
+        except BaseException:
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        _reset(conn)
+        with self._available:
+            if self._closed:
+                conn.close()
+                self._open -= 1
+            else:
+                self._idle.append(conn)
+            self._available.notify()
+
+    def _connect(self, *, read_only: bool) -> sqlite3.Connection:
+        return connect(self.db_path, read_only=read_only, check_same_thread=False)
+
+    def _healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            return False
+        return True
+
+
+def _reset(conn: sqlite3.Connection) -> None:
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,152 @@
+"""Second-stage cross-encoder reranking."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Protocol, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .search import SearchResult
+
+DEFAULT_RERANK_BATCH_SIZE = 32
+
+
+class Reranker(Protocol):
+    model_name: str
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]]) -> List[float]: ...
+
+
+@dataclass
+class DebugReranker:
+    """Deterministic token-overlap scorer for air-gapped demos and tests."""
+
+    model_name: str = "debug"
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        scores: List[float] = []
+        for query, text in pairs:
+            terms = {token.lower() for token in query.split()}
+            tokens = [token.lower().strip(".,;:!?") for token in text.split()]
+            if not terms or not tokens:
+                scores.append(0.0)
+                continue
+            hits = sum(1 for token in tokens if token in terms)
+            scores.append(len({t for t in tokens if t in terms}) / len(terms) + hits / len(tokens))
+        return scores
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_name: str, *, batch_size: int = DEFAULT_RERANK_BATCH_SIZE) -> None:
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = _load_cross_encoder(model_name)
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        if not pairs:
+            return []
+        scores = self._model.predict(
+            [list(pair) for pair in pairs], batch_size=self.batch_size, show_progress_bar=False
+        )
+        return [float(score) for score in scores]
+
+
+@lru_cache(maxsize=4)
+def get_reranker(model_name: str) -> Reranker:
+    """Load ``model_name`` once per process."""
+
+    if model_name.lower() in {"debug", "hash"}:
+        return DebugReranker()
+    return CrossEncoderReranker(model_name)
+
+
+class RerankScoreCache:
+    """LRU of cross-encoder scores keyed on (model, normalized query, chunk).
+
+    The chunk text digest is part of the key, so a chunk id reused by a
+    re-ingest never serves a score computed for the old text.
+    """
+
+    def __init__(self, *, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, int, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, int, str]) -> Optional[float]:
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: Tuple[str, str, int, str], score: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def rerank_many(
+    queries: Sequence[str],
+    windows: Sequence[List["SearchResult"]],
+    *,
+    model_name: str,
+    cache: Optional[RerankScoreCache] = None,
+) -> None:
+    """Rescore every window with the cross-encoder and sort it, in place.
+
+    Pairs from all queries that miss ``cache`` go to the model in one
+    ``score_pairs`` call. The cross-encoder score replaces the fused score.
+    """
+
+    reranker = get_reranker(model_name)
+    keys: List[List[Tuple[str, str, int, str]]] = []
+    pending: Dict[Tuple[str, str, int, str], Tuple[str, str]] = {}
+    scores: Dict[Tuple[str, str, int, str], float] = {}
+    for query, window in zip(queries, windows, strict=True):
+        normalized = " ".join(query.split())
+        window_keys = []
+        for item in window:
+            digest = hashlib.sha1(item.text.encode("utf-8")).hexdigest()
+            key = (reranker.model_name, normalized, item.chunk_id, digest)
+            window_keys.append(key)
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                scores[key] = cached
+            else:
+                pending.setdefault(key, (query, item.text))
+        keys.append(window_keys)
+    if pending:
+        fresh = reranker.score_pairs(list(pending.values()))
+        for key, score in zip(pending, fresh, strict=True):
+            scores[key] = score
+            if cache is not None:
+                cache.put(key, score)
+    for window, window_keys in zip(windows, keys, strict=True):
+        for item, key in zip(window, window_keys, strict=True):
+            item.score = scores[key]
+        window.sort(key=lambda item: item.score, reverse=True)
+
+
+def _load_cross_encoder(model_name: str):  # pragma: no cover - heavy load
+    try:
+        from sentence_transformers import CrossEncoder
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError("Install raglite-sqlite[rerank] to use a rerank_model") from exc
+    return CrossEncoder(model_name)
@@ -6,7 +6,10 @@ CREATE TABLE IF NOT EXISTS documents (
     title TEXT,
     mime TEXT,
     created_at TEXT DEFAULT (datetime('now')),
-    meta_json TEXT DEFAULT '{}'
+    meta_json TEXT DEFAULT '{}',
+    size INTEGER,
+    mtime_ns INTEGER,
+    content_hash TEXT
 );
 
 CREATE TABLE IF NOT EXISTS chunks (
@@ -23,9 +26,61 @@ CREATE TABLE IF NOT EXISTS embeddings (
     chunk_id INTEGER NOT NULL REFERENCES chunks(id) ON DELETE CASCADE,
     model TEXT NOT NULL,
     dim INTEGER NOT NULL,
-    embedding BLOB NOT NULL
+    embedding BLOB NOT NULL,
+    qvec BLOB,
+    qscale REAL,
+    qoffset REAL,
+    sig BLOB,
+    norm REAL,
+    normalized INTEGER NOT NULL DEFAULT 0
 );
 
+CREATE TABLE IF NOT EXISTS chunk_tags (
+    chunk_id INTEGER NOT NULL REFERENCES chunks(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (chunk_id, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    embedding_id INTEGER NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS raglite_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ivf_centroids (
+    list_id INTEGER PRIMARY KEY,
+    dim INTEGER NOT NULL,
+    centroid BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ivf_postings (
+    embedding_id INTEGER PRIMARY KEY,
+    list_id INTEGER NOT NULL,
+    chunk_id INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS hnsw_nodes (
+    embedding_id INTEGER PRIMARY KEY,
+    chunk_id INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    vector BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS hnsw_edges (
+    embedding_id INTEGER NOT NULL,
+    layer INTEGER NOT NULL,
+    neighbors BLOB NOT NULL,
+    PRIMARY KEY (embedding_id, layer)
+) WITHOUT ROWID;
+
 CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5(
     text,
     content='chunks',
@@ -33,7 +88,11 @@ CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5(
 );
 
 CREATE INDEX IF NOT EXISTS idx_chunks_document_id ON chunks(document_id);
+CREATE INDEX IF NOT EXISTS idx_documents_path ON documents(path);
 CREATE INDEX IF NOT EXISTS idx_embeddings_chunk_model ON embeddings(chunk_id, model);
+CREATE INDEX IF NOT EXISTS idx_ivf_postings_list ON ivf_postings(list_id);
+CREATE INDEX IF NOT EXISTS idx_chunk_tags_key_value ON chunk_tags(key, value, chunk_id);
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_embedding ON embedding_cache(embedding_id);
 
 CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
     INSERT INTO chunk_fts(rowid, text) VALUES (new.id, new.text);
@@ -47,3 +106,34 @@ CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
     INSERT INTO chunk_fts(chunk_fts, rowid, text) VALUES('delete', old.id, old.text);
     INSERT INTO chunk_fts(rowid, text) VALUES(new.id, new.text);
 END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_ai_tags AFTER INSERT ON chunks
+WHEN new.tags_json IS NOT NULL AND new.tags_json != '{}' BEGIN
+    INSERT OR REPLACE INTO chunk_tags(chunk_id, key, value)
+    SELECT new.id, key, value FROM json_each(new.tags_json);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_au_tags AFTER UPDATE OF tags_json ON chunks BEGIN
+    DELETE FROM chunk_tags WHERE chunk_id = old.id;
+    INSERT OR REPLACE INTO chunk_tags(chunk_id, key, value)
+    SELECT new.id, key, value FROM json_each(COALESCE(new.tags_json, '{}'));
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_ad_tags AFTER DELETE ON chunks BEGIN
+    DELETE FROM chunk_tags WHERE chunk_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS embeddings_ad_ivf AFTER DELETE ON embeddings BEGIN
+    DELETE FROM ivf_postings WHERE embedding_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS embeddings_ad_cache AFTER DELETE ON embeddings BEGIN
+    DELETE FROM embedding_cache WHERE embedding_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS embeddings_ad_hnsw AFTER DELETE ON embeddings
+WHEN EXISTS (SELECT 1 FROM hnsw_nodes WHERE embedding_id = old.id) BEGIN
+    UPDATE hnsw_nodes SET deleted = 1 WHERE embedding_id = old.id;
+    INSERT OR REPLACE INTO raglite_meta(key, value)
+    VALUES ('hnsw_tombstones', lower(hex(randomblob(8))));
+END;
@@ -2,16 +2,29 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import heapq
 import json
 import math
 import re
 import sqlite3
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 from .config import clamp_alpha
-from .embed import embedding_from_bytes, get_embedding_store
+from .embed import QueryEmbeddingCache, embedding_from_bytes, get_embedding_store
+from .rerank import RerankScoreCache, rerank_many
 from .vector import detect_backend
+from .vector.types import Candidate
+
+FUSION_METHODS = ("weighted", "rrf")
+RRF_K = 60
+VECTOR_ONLY_BONUS = 0.05
+DEFAULT_BM25_K = 200
+DEFAULT_PAGE_SIZE = 50
 
 
 @dataclass
@@ -29,21 +42,37 @@ class RankedChunk:
     score: float
 
 
-def bm25(conn: sqlite3.Connection, query: str, *, k: int = 200) -> List[RankedChunk]:
+def bm25(
+    conn: sqlite3.Connection,
+    query: str,
+    *,
+    k: int = DEFAULT_BM25_K,
+    tags: Optional[Dict[str, str]] = None,
+) -> List[RankedChunk]:
     normalized = _normalize_fts_query(query)
+    tag_sql, tag_params = _tag_filter(tags)
     cur = conn.execute(
-        """
+        f"""
         SELECT rowid, bm25(chunk_fts) AS score
         FROM chunk_fts
-        WHERE chunk_fts MATCH ?
+        WHERE chunk_fts MATCH ?{f" AND rowid IN ({tag_sql})" if tag_sql else ""}
         ORDER BY score
         LIMIT ?
         """,
-        (normalized, k),
+        (normalized, *tag_params, k),
     )
     return [RankedChunk(int(row[0]), float(row[1])) for row in cur.fetchall()]
 
 
+def tagged_chunk_ids(conn: sqlite3.Connection, tags: Dict[str, str]) -> List[int]:
+    """Ids of chunks carrying every ``key=value`` pair, read from ``chunk_tags``."""
+
+    tag_sql, tag_params = _tag_filter(tags)
+    if not tag_sql:
+        return []
+    return [int(row[0]) for row in conn.execute(tag_sql, tag_params).fetchall()]
+
+
 def normalize_scores(scores: List[RankedChunk]) -> Dict[int, float]:
     if not scores:
         return {}
@@ -64,93 +93,532 @@ def hybrid_search(
     embed_model: str,
     rerank: bool = False,
     tags: Optional[Dict[str, str]] = None,
+    resident_vectors: bool = False,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    vector_backend_name: Optional[str] = None,
+    embedding_cache: Optional[QueryEmbeddingCache] = None,
+    fusion: str = "weighted",
+    rerank_model: Optional[str] = None,
+    rerank_limit: Optional[int] = None,
+    rerank_cache: Optional[RerankScoreCache] = None,
 ) -> List[SearchResult]:
+    return hybrid_search_many(
+        conn,
+        [query],
+        alpha=alpha,
+        top_k=top_k,
+        embed_model=embed_model,
+        rerank=rerank,
+        tags=tags,
+        resident_vectors=resident_vectors,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        vector_backend_name=vector_backend_name,
+        embedding_cache=embedding_cache,
+        fusion=fusion,
+        rerank_model=rerank_model,
+        rerank_limit=rerank_limit,
+        rerank_cache=rerank_cache,
+    )[0]
+
+
+def hybrid_search_many(
+    conn: sqlite3.Connection,
+    queries: Sequence[str],
+    *,
+    alpha: float = 0.6,
+    top_k: int = 10,
+    embed_model: str,
+    rerank: bool = False,
+    tags: Optional[Dict[str, str]] = None,
+    resident_vectors: bool = False,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    vector_backend_name: Optional[str] = None,
+    embedding_cache: Optional[QueryEmbeddingCache] = None,
+    fusion: str = "weighted",
+    rerank_model: Optional[str] = None,
+    rerank_limit: Optional[int] = None,
+    rerank_cache: Optional[RerankScoreCache] = None,
+) -> List[List[SearchResult]]:
+    """Run :func:`hybrid_search` for every query, sharing the expensive steps.
+
+    The backend is detected once, all queries are embedded in one ``embed_many``
+    call, and vector scoring goes through ``search_many`` so matrix backends
+    score the whole batch with matrix-matrix products. With ``rerank`` and a
+    ``rerank_model``, the top ``rerank_limit`` fused results of every query are
+    rescored by the cross-encoder in one batch.
+    """
+
+    if not queries:
+        return []
     alpha = clamp_alpha(alpha)
-    candidates = bm25(conn, query)
-    bm25_norm = normalize_scores(candidates)
+    candidate_lists, vector_lists, query_vecs = _retrieve(
+        conn,
+        queries,
+        top_k=top_k,
+        bm25_k=DEFAULT_BM25_K,
+        embed_model=embed_model,
+        tags=tags,
+        resident_vectors=resident_vectors,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        vector_backend_name=vector_backend_name,
+        embedding_cache=embedding_cache,
+    )
+    cross_encoder = rerank and bool(rerank_model)
+    combined = [
+        _combine(
+            conn,
+            candidates,
+            vector_results,
+            query_vec,
+            alpha=alpha,
+            top_k=top_k,
+            rerank=rerank,
+            rerank_limit=rerank_limit,
+            cross_encoder=cross_encoder,
+            tags=tags,
+            fusion=fusion,
+        )
+        for candidates, vector_results, query_vec in zip(
+            candidate_lists, vector_lists, query_vecs, strict=True
+        )
+    ]
+    if cross_encoder:
+        assert rerank_model is not None
+        rerank_many(queries, combined, model_name=rerank_model, cache=rerank_cache)
+    return [results[:top_k] for results in combined]
+
+
+def iter_search(
+    conn: sqlite3.Connection,
+    query: str,
+    *,
+    embed_model: str,
+    alpha: float = 0.6,
+    limit: int = 1000,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    tags: Optional[Dict[str, str]] = None,
+    resident_vectors: bool = False,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    vector_backend_name: Optional[str] = None,
+    embedding_cache: Optional[QueryEmbeddingCache] = None,
+    fusion: str = "weighted",
+) -> Iterator[SearchResult]:
+    """Yield up to ``limit`` hybrid results lazily, in score order.
+
+    Candidates are scored as ids only. Chunk text and metadata are read
+    ``page_size`` rows at a time as the caller advances, so memory follows the
+    page size rather than ``limit``. ``cursor`` (from :func:`search_page`)
+    resumes after the last result of an earlier page.
+    """
+
+    for _, _, result in _iter_ranked(
+        conn,
+        query,
+        embed_model=embed_model,
+        alpha=alpha,
+        limit=limit,
+        page_size=page_size,
+        cursor=cursor,
+        tags=tags,
+        resident_vectors=resident_vectors,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        vector_backend_name=vector_backend_name,
+        embedding_cache=embedding_cache,
+        fusion=fusion,
+    ):
+        yield result
+
+
+def search_page(
+    conn: sqlite3.Connection,
+    query: str,
+    *,
+    embed_model: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    alpha: float = 0.6,
+    limit: int = 1000,
+    **options,
+) -> Tuple[List[SearchResult], Optional[str]]:
+    """Return one page of :func:`iter_search` and the cursor for the next, if any.
+
+    Each call re-ranks the query and skips to the cursor position, so pages stay
+    consistent as long as the database is unchanged between calls.
+    """
+
+    ranked = _iter_ranked(
+        conn,
+        query,
+        embed_model=embed_model,
+        alpha=alpha,
+        limit=limit,
+        page_size=page_size,
+        cursor=cursor,
+        **options,
+    )
+    page = list(islice(ranked, page_size + 1))
+    results = [result for _, _, result in page[:page_size]]
+    if len(page) <= page_size:
+        return results, None
+    position, emitted, _ = page[page_size]
+    fingerprint = _query_fingerprint(
+        query, alpha, limit, options.get("fusion", "weighted"), options.get("tags")
+    )
+    return results, _encode_cursor(position, emitted, fingerprint)
+
+
+def _iter_ranked(
+    conn: sqlite3.Connection,
+    query: str,
+    *,
+    embed_model: str,
+    alpha: float,
+    limit: int,
+    page_size: int,
+    cursor: Optional[str],
+    tags: Optional[Dict[str, str]] = None,
+    resident_vectors: bool = False,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    vector_backend_name: Optional[str] = None,
+    embedding_cache: Optional[QueryEmbeddingCache] = None,
+    fusion: str = "weighted",
+) -> Iterator[Tuple[int, int, SearchResult]]:
+    """Yield ``(position in the fused ids, results emitted before, result)``."""
+
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    start = emitted = 0
+    if cursor is not None:
+        fingerprint = _query_fingerprint(query, alpha, limit, fusion, tags)
+        start, emitted = _decode_cursor(cursor, fingerprint)
+    candidate_lists, vector_lists, _ = _retrieve(
+        conn,
+        [query],
+        top_k=limit,
+        bm25_k=max(limit, DEFAULT_BM25_K),
+        embed_model=embed_model,
+        tags=tags,
+        resident_vectors=resident_vectors,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        vector_backend_name=vector_backend_name,
+        embedding_cache=embedding_cache,
+    )
+    candidates, vector_results = candidate_lists[0], vector_lists[0]
+    total = len({c.chunk_id for c in candidates} | {c.chunk_id for c in vector_results})
+    ranked, _ = fuse(
+        candidates, vector_results, alpha=clamp_alpha(alpha), limit=max(total, 1), method=fusion
+    )
+    # Positions index the fused id list; stop once ``limit`` results were emitted
+    # overall, counting the ones earlier pages already returned.
+    for position, result in _iter_rows(conn, ranked, batch_size=page_size, tags=tags, start=start):
+        if emitted >= limit:
+            return
+        yield position, emitted, result
+        emitted += 1
+
+
+def _query_fingerprint(
+    query: str, alpha: float, limit: int, fusion: str, tags: Optional[Dict[str, str]]
+) -> str:
+    # Cursors are bound to the arguments that define the ranking.
+    payload = json.dumps([query, alpha, limit, fusion, sorted((tags or {}).items())])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_cursor(position: int, emitted: int, fingerprint: str) -> str:
+    raw = json.dumps({"p": position, "n": emitted, "q": fingerprint}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> Tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+        position, emitted = int(state["p"]), int(state["n"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Malformed search cursor") from exc
+    if state.get("q") != fingerprint or position < 0 or emitted < 0:
+        raise ValueError("Search cursor does not belong to this query")
+    return position, emitted
 
-    vector_backend = detect_backend(conn)
+
+def _retrieve(
+    conn: sqlite3.Connection,
+    queries: Sequence[str],
+    *,
+    top_k: int,
+    bm25_k: int,
+    embed_model: str,
+    tags: Optional[Dict[str, str]],
+    resident_vectors: bool,
+    nprobe: Optional[int],
+    ef_search: Optional[int],
+    vector_backend_name: Optional[str],
+    embedding_cache: Optional[QueryEmbeddingCache],
+) -> Tuple[List[List[RankedChunk]], List[List[Candidate]], List[array]]:
+    """BM25 candidates, vector candidates and query vectors for every query."""
+
+    candidate_lists = [bm25(conn, query, k=bm25_k, tags=tags) for query in queries]
+    # With tags, vector search is restricted to matching chunks up front.
+    allowed = tagged_chunk_ids(conn, tags) if tags else None
+
+    vector_backend = detect_backend(
+        conn,
+        resident=resident_vectors,
+        nprobe=nprobe,
+        ef_search=ef_search,
+        prefer=vector_backend_name,
+    )
     embedding_store = get_embedding_store(embed_model)
-    query_vec = embedding_from_bytes(embedding_store.embed_many([query])[0])
-    query_norm = _norm(query_vec)
-    vector_results = vector_backend.search(
+    if embedding_cache is not None:
+        blobs = embedding_cache.embed_many(embedding_store, queries)
+    else:
+        blobs = embedding_store.embed_many(queries)
+    query_vecs = [embedding_from_bytes(blob) for blob in blobs]
+    vector_lists = vector_backend.search_many(
         conn,
-        query_vec,
-        top_n=max(top_k, len(candidates)) or top_k,
-        prefilter_ids=[c.chunk_id for c in candidates] if candidates else None,
+        query_vecs,
+        top_n=max([top_k, *(len(c) for c in candidate_lists)]),
+        prefilter_ids=[
+            [c.chunk_id for c in cands] if cands else allowed for cands in candidate_lists
+        ],
     )
-    if len(vector_results) < top_k and vector_backend.available:
-        extra = vector_backend.search(conn, query_vec, top_n=top_k, prefilter_ids=None)
-        seen_ids = {c.chunk_id for c in vector_results}
-        for candidate in extra:
-            if candidate.chunk_id in seen_ids:
-                continue
-            vector_results.append(candidate)
-            seen_ids.add(candidate.chunk_id)
-            if len(vector_results) >= top_k:
-                break
+    vector_lists = [
+        results[: max(top_k, len(cands)) or top_k]
+        for results, cands in zip(vector_lists, candidate_lists, strict=True)
+    ]
+    short = [i for i, results in enumerate(vector_lists) if len(results) < top_k]
+    if short and vector_backend.available:
+        extras = vector_backend.search_many(
+            conn,
+            [query_vecs[i] for i in short],
+            top_n=top_k,
+            prefilter_ids=[allowed] * len(short),
+        )
+        for i, extra in zip(short, extras, strict=True):
+            _append_unseen(vector_lists[i], extra, limit=top_k)
+
+    return candidate_lists, vector_lists, query_vecs
+
+
+def _append_unseen(results: List[Candidate], extra: List[Candidate], *, limit: int) -> None:
+    seen_ids = {c.chunk_id for c in results}
+    for candidate in extra:
+        if candidate.chunk_id in seen_ids:
+            continue
+        results.append(candidate)
+        seen_ids.add(candidate.chunk_id)
+        if len(results) >= limit:
+            break
+
+
+def fuse(
+    candidates: Sequence[RankedChunk],
+    vector_results: Sequence[Candidate],
+    *,
+    alpha: float,
+    limit: int,
+    method: str = "weighted",
+) -> Tuple[List[Tuple[int, float]], bool]:
+    """Return the best ``limit`` ``(chunk_id, score)`` pairs and whether every candidate was seen.
+
+    ``weighted`` is ``alpha * minmax(bm25) + (1 - alpha) * cosine`` (plus a small
+    bonus for vector-only hits); ``rrf`` is reciprocal rank fusion weighted by
+    ``alpha``. Both lists are walked in score order while a bounded heap keeps the
+    leaders (Fagin's threshold algorithm), so the walk stops as soon as no unseen
+    candidate can beat the heap floor.
+    """
+
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method: {method}")
+    semantic_order = sorted(vector_results, key=lambda c: c.score, reverse=True)
     vector_scores = {c.chunk_id: c.score for c in vector_results}
+    bonus = 0.0
+    if method == "rrf":
+        lexical = [(c.chunk_id, alpha / (RRF_K + rank)) for rank, c in enumerate(candidates, 1)]
+        semantic = [
+            (c.chunk_id, (1 - alpha) / (RRF_K + rank)) for rank, c in enumerate(semantic_order, 1)
+        ]
+        bm25_norm: Dict[int, float] = {}
+    else:
+        bm25_norm = normalize_scores(list(candidates))
+        lexical = [(c.chunk_id, alpha * bm25_norm[c.chunk_id]) for c in candidates]
+        semantic = [(c.chunk_id, (1 - alpha) * c.score) for c in semantic_order]
+        bonus = VECTOR_ONLY_BONUS
+    lexical_scores = dict(lexical)
+    semantic_scores = dict(semantic)
+    # Ties keep the old insertion order: BM25 rank first, then vector arrival order.
+    positions: Dict[int, int] = {}
+    for chunk_id in [c.chunk_id for c in candidates] + [c.chunk_id for c in vector_results]:
+        positions.setdefault(chunk_id, len(positions))
+
+    heap: List[Tuple[float, int, int]] = []
+    seen: set = set()
 
-    combined: List[SearchResult] = []
-    ordered_ids = [c.chunk_id for c in candidates]
-    for candidate in vector_results:
-        if candidate.chunk_id not in ordered_ids:
-            ordered_ids.append(candidate.chunk_id)
-    seen = set()
-    for chunk_id in ordered_ids:
+    def offer(chunk_id: int) -> None:
         if chunk_id in seen:
-            continue
+            return
         seen.add(chunk_id)
-        bm_score = bm25_norm.get(chunk_id, 0.0)
-        vec_score = vector_scores.get(chunk_id, 0.0)
-        score = alpha * bm_score + (1 - alpha) * vec_score
-        if bm_score == 0.0 and vec_score > 0.0:
-            score += 0.05
-        chunk_row = conn.execute(
-            """
-            SELECT c.id, c.document_id, c.text, c.tags_json, d.meta_json, d.title
-            FROM chunks c
-            JOIN documents d ON d.id = c.document_id
-            WHERE c.id = ?
-            """,
-            (chunk_id,),
-        ).fetchone()
-        if not chunk_row:
-            continue
-        tags_json = json.loads(chunk_row[3] or "{}")
-        if tags and not _tags_match(tags, tags_json):
-            continue
-        metadata = json.loads(chunk_row[4] or "{}")
-        metadata.setdefault("title", chunk_row[5] or "")
-        combined.append(
-            SearchResult(
-                chunk_id=int(chunk_row[0]),
-                document_id=int(chunk_row[1]),
-                score=score,
-                text=str(chunk_row[2]),
-                metadata=metadata | {"tags": tags_json},
-            )
+        score = lexical_scores.get(chunk_id, 0.0) + semantic_scores.get(chunk_id, 0.0)
+        if bonus and bm25_norm.get(chunk_id, 0.0) == 0.0 and vector_scores.get(chunk_id, 0.0) > 0:
+            score += bonus
+        entry = (score, -positions[chunk_id], chunk_id)
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    i = j = 0
+    while i < len(lexical) or j < len(semantic):
+        if i < len(lexical):
+            offer(lexical[i][0])
+            i += 1
+        if j < len(semantic):
+            offer(semantic[j][0])
+            j += 1
+        if len(heap) >= limit:
+            threshold = max(lexical[i][1], 0.0) if i < len(lexical) else 0.0
+            if j < len(semantic):
+                threshold += max(semantic[j][1], 0.0) + bonus
+            if heap[0][0] > threshold:
+                break
+    complete = i >= len(lexical) and j >= len(semantic) and len(seen) <= limit
+    ranked = sorted(heap, reverse=True)
+    return [(chunk_id, score) for score, _, chunk_id in ranked], complete
+
+
+def _combine(
+    conn: sqlite3.Connection,
+    candidates: List[RankedChunk],
+    vector_results: List[Candidate],
+    query_vec,
+    *,
+    alpha: float,
+    top_k: int,
+    rerank: bool,
+    rerank_limit: Optional[int],
+    cross_encoder: bool,
+    tags: Optional[Dict[str, str]],
+    fusion: str,
+) -> List[SearchResult]:
+    query_norm = _norm(query_vec)
+    limit = top_k
+    if rerank:
+        limit = max(rerank_limit or max(top_k * 2, 20), top_k)
+    fuse_limit = limit
+    while True:
+        ranked, complete = fuse(
+            candidates, vector_results, alpha=alpha, limit=fuse_limit, method=fusion
         )
+        combined = _materialize(conn, ranked, limit=limit, tags=tags)
+        if len(combined) >= limit or complete:
+            break
+        # Rows were missing or filtered out; widen the fused window and retry.
+        fuse_limit *= 2
+    if cross_encoder:
+        # The caller rescores every query's window in one cross-encoder batch.
+        return combined
     if rerank and combined:
-        rerank_limit = min(len(combined), max(top_k * 2, 20))
-        rerank_ids = [item.chunk_id for item in combined[:rerank_limit]]
+        rerank_ids = [item.chunk_id for item in combined]
         if rerank_ids:
-            placeholders = ",".join("?" for _ in rerank_ids)
             cur = conn.execute(
-                f"SELECT chunk_id, embedding FROM embeddings WHERE chunk_id IN ({placeholders})",
-                rerank_ids,
+                "SELECT chunk_id, embedding, norm FROM embeddings "
+                "WHERE chunk_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(rerank_ids),),
             )
-            embed_map = {int(row[0]): embedding_from_bytes(row[1]) for row in cur.fetchall()}
+            embed_map = {
+                int(row[0]): (embedding_from_bytes(row[1]), row[2]) for row in cur.fetchall()
+            }
             for item in combined:
-                chunk_vec = embed_map.get(item.chunk_id)
-                if chunk_vec is None:
+                entry = embed_map.get(item.chunk_id)
+                if entry is None:
                     continue
-                rerank_score = _cosine_similarity(query_vec, chunk_vec, query_norm)
+                chunk_vec, chunk_norm = entry
+                rerank_score = _cosine_similarity(query_vec, chunk_vec, query_norm, chunk_norm)
                 item.score = (item.score + rerank_score) / 2
     combined.sort(key=lambda item: item.score, reverse=True)
     return combined[:top_k]
 
 
+def _materialize(
+    conn: sqlite3.Connection,
+    ranked: Sequence[Tuple[int, float]],
+    *,
+    limit: int,
+    tags: Optional[Dict[str, str]] = None,
+) -> List[SearchResult]:
+    """Load chunk rows for the best ``limit`` ranked ids that exist and match ``tags``.
+
+    Scoring only needs ids, so rows are fetched last and in batches of
+    ``limit``. Another batch is read only when rows are missing or filtered out.
+    """
+
+    rows = _iter_rows(conn, ranked, batch_size=limit, tags=tags)
+    return [result for _, result in islice(rows, limit)]
+
+
+def _iter_rows(
+    conn: sqlite3.Connection,
+    ranked: Sequence[Tuple[int, float]],
+    *,
+    batch_size: int,
+    tags: Optional[Dict[str, str]] = None,
+    start: int = 0,
+) -> Iterator[Tuple[int, SearchResult]]:
+    """Yield ``(position, result)`` for ranked ids from ``start``, one batch of rows at a time."""
+
+    while start < len(ranked):
+        batch = ranked[start : start + batch_size]
+        rows = {
+            int(row[0]): row
+            for row in conn.execute(
+                """
+                SELECT c.id, c.document_id, c.text, c.tags_json, d.meta_json, d.title
+                FROM chunks c
+                JOIN documents d ON d.id = c.document_id
+                WHERE c.id IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps([chunk_id for chunk_id, _ in batch]),),
+            ).fetchall()
+        }
+        for offset, (chunk_id, score) in enumerate(batch):
+            chunk_row = rows.pop(chunk_id, None)
+            if not chunk_row:
+                continue
+            tags_json = json.loads(chunk_row[3] or "{}")
+            if tags and not _tags_match(tags, tags_json):
+                continue
+            metadata = json.loads(chunk_row[4] or "{}")
+            metadata.setdefault("title", chunk_row[5] or "")
+            yield start + offset, SearchResult(
+                chunk_id=int(chunk_row[0]),
+                document_id=int(chunk_row[1]),
+                score=score,
+                text=str(chunk_row[2]),
+                metadata=metadata | {"tags": tags_json},
+            )
+        start += len(batch)
+
+
+def _tag_filter(tags: Optional[Dict[str, str]]) -> Tuple[str, List[str]]:
+    if not tags:
+        return "", []
+    clauses = ["SELECT chunk_id FROM chunk_tags WHERE key = ? AND value = ?"] * len(tags)
+    params: List[str] = []
+    for key, value in tags.items():
+        params.extend((key, value))
+    return " INTERSECT ".join(clauses), params
+
+
 def _tags_match(required: Dict[str, str], existing: Dict[str, str]) -> bool:
     for key, value in required.items():
         if existing.get(key) != value:
@@ -166,8 +634,11 @@ def _norm(vec) -> float:
     return float(math.sqrt(sum(component * component for component in vec)))
 
 
-def _cosine_similarity(query_vec, chunk_vec, query_norm: float) -> float:
-    chunk_norm = _norm(chunk_vec)
+def _cosine_similarity(
+    query_vec, chunk_vec, query_norm: float, chunk_norm: Optional[float] = None
+) -> float:
+    if chunk_norm is None:
+        chunk_norm = _norm(chunk_vec)
     if not query_norm or not chunk_norm:
         return 0.0
     length = min(len(query_vec), len(chunk_vec))
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 try:
     from fastapi import FastAPI, HTTPException
@@ -12,7 +13,7 @@ try:
 except Exception as exc:  # pragma: no cover - optional dependency
     raise RuntimeError("Install raglite-sqlite[server] to use the FastAPI app") from exc
 
-from ..api import RagliteAPI
+from ..api import AsyncRagliteAPI
 from ..config import RagliteConfig
 
 
@@ -22,12 +23,16 @@ class QueryRequest(BaseModel):
     alpha: Optional[float] = None
     rerank: bool = False
     tags: Optional[Dict[str, str]] = None
+    nprobe: Optional[int] = None
+    fusion: Optional[str] = None
+    rerank_limit: Optional[int] = None
 
 
 class IngestRequest(BaseModel):
     path: str
     strategy: str = "recursive"
     ocr: bool = False
+    bulk: bool = False
 
 
 def create_app(db_path: str | Path) -> FastAPI:
@@ -35,27 +40,51 @@ def create_app(db_path: str | Path) -> FastAPI:
     embed_override = os.getenv("RAGLITE_EMBED_MODEL")
     if embed_override:
         config.embed_model = embed_override
-    api = RagliteAPI(config)
-    api.init_db()
-
-    app = FastAPI(title="raglite", version="0.2.0")
+    if os.getenv("RAGLITE_RESIDENT_VECTORS") == "1":
+        config.resident_vectors = True
+    config.vector_backend = os.getenv("RAGLITE_VECTOR_BACKEND") or None
+    config.query_cache_size = int(os.getenv("RAGLITE_QUERY_CACHE_SIZE") or 0)
+    if os.getenv("RAGLITE_PERSIST_QUERY_EMBEDDINGS") == "1":
+        config.persist_query_embeddings = True
+    cache_ttl = os.getenv("RAGLITE_QUERY_CACHE_TTL")
+    if cache_ttl:
+        config.query_cache_ttl = float(cache_ttl)
+    config.rerank_model = os.getenv("RAGLITE_RERANK_MODEL") or None
+    pool_size = os.getenv("RAGLITE_POOL_SIZE")
+    if pool_size:
+        config.pool_size = int(pool_size)
+    api = AsyncRagliteAPI(config)
+    api.sync.init_db()
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            # Release the executor threads and pooled connections on shutdown.
+            await api.aclose()
+
+    app = FastAPI(title="raglite", version="0.2.0", lifespan=lifespan)
 
     @app.get("/health")
-    def health() -> Dict[str, str]:
+    async def health() -> Dict[str, str]:
         return {"status": "ok"}
 
     @app.get("/stats")
-    def stats() -> Dict[str, int]:
-        return api.stats()
+    async def stats() -> Dict[str, Any]:
+        return await api.stats()
 
     @app.post("/query")
-    def query(request: QueryRequest):
-        results = api.query(
+    async def query(request: QueryRequest):
+        results = await api.query(
             request.text,
             top_k=request.k,
             alpha=request.alpha,
             rerank=request.rerank,
             tags=request.tags,
+            nprobe=request.nprobe,
+            fusion=request.fusion,
+            rerank_limit=request.rerank_limit,
         )
         return {
             "results": [
@@ -71,15 +100,20 @@ def create_app(db_path: str | Path) -> FastAPI:
         }
 
     @app.post("/ingest")
-    def ingest(request: IngestRequest):
+    async def ingest(request: IngestRequest):
         corpus_path = Path(request.path)
         if not corpus_path.exists():
             raise HTTPException(status_code=404, detail="Path not found")
-        result = api.index(corpus_path, strategy=request.strategy, ocr=request.ocr)
+        result = await api.index(
+            corpus_path, strategy=request.strategy, ocr=request.ocr, bulk=request.bulk
+        )
         return {
             "documents": result.documents,
             "chunks": result.chunks,
             "embeddings": result.embeddings,
+            "skipped": result.skipped,
+            "replaced": result.replaced,
+            "reused": result.reused,
         }
 
     return app
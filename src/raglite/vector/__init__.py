@@ -1,5 +1,11 @@
 """Vector backend selection."""
 
-from .backend import Backend, VectorBackend, detect_backend, get_backend
+from .backend import (
+    Backend,
+    VectorBackend,
+    detect_backend,
+    forget_backends,
+    get_backend,
+)
 
-__all__ = ["Backend", "VectorBackend", "detect_backend", "get_backend"]
+__all__ = ["Backend", "VectorBackend", "detect_backend", "forget_backends", "get_backend"]
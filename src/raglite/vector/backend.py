@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 from array import array
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Protocol
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
 
+from ..db import BACKENDS_KEY, database_path, read_meta, reset_extension_probe
+from .binary import BinaryBackend
+from .hnsw import HNSWBackend
+from .ivf import IVFBackend
 from .python_fallback import PythonFallbackBackend
 from .sqlite_ext import SQLiteExtensionBackend
 from .types import Candidate
@@ -49,20 +54,112 @@ class VectorBackend:
             prefilter_ids=prefilter_ids,
         )
 
+    def search_many(
+        self,
+        conn: sqlite3.Connection,
+        query_vectors: Sequence[array],
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Sequence[Optional[Iterable[int]]]] = None,
+    ) -> List[List[Candidate]]:
+        """Search several queries, batched when the backend implements ``search_many``."""
+
+        if self.backend is None:
+            return [[] for _ in query_vectors]
+        filters = list(prefilter_ids) if prefilter_ids is not None else [None] * len(query_vectors)
+        batched = getattr(self.backend, "search_many", None)
+        if batched is not None:
+            return batched(conn, query_vectors, top_n=top_n, prefilter_ids=filters)
+        return [
+            self.backend.search(conn, query, top_n=top_n, prefilter_ids=ids)
+            for query, ids in zip(query_vectors, filters, strict=True)
+        ]
+
     @property
     def available(self) -> bool:
         return self.backend is not None
 
 
-def detect_backend(conn: sqlite3.Connection) -> VectorBackend:
-    """Detect the best available vector backend."""
-
+_REGISTRY: Dict[Tuple, Tuple[Tuple[int, str], VectorBackend]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def detect_backend(
+    conn: sqlite3.Connection,
+    *,
+    resident: bool = False,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    prefer: Optional[str] = None,
+) -> VectorBackend:
+    """Detect the best available vector backend.
+
+    Built ANN indexes win over the extension and fallback backends: an HNSW
+    graph first (searched with ``ef_search``), then an IVF index (probing
+    ``nprobe`` lists). ``resident`` keeps the Python fallback's vectors in a
+    cached NumPy matrix. ``prefer="binary"`` opts into the sign-bit Hamming
+    prefilter ahead of everything else.
+
+    The selection is cached per database file and options. It is re-detected
+    when ``PRAGMA schema_version`` moves or an index build bumps the backends
+    generation in ``raglite_meta``.
+    """
+
+    path = database_path(conn)
+    if path is None:
+        return _detect(conn, resident=resident, nprobe=nprobe, ef_search=ef_search, prefer=prefer)
+    key = (path, resident, nprobe, ef_search, prefer)
+    with _REGISTRY_LOCK:
+        cached = _REGISTRY.get(key)
+    if cached is not None and cached[0] == _stamp(conn):
+        detected = cached[1]
+        if isinstance(detected.backend, SQLiteExtensionBackend):
+            detected.backend.ensure_loaded(conn)
+        return detected
+    detected = _detect(conn, resident=resident, nprobe=nprobe, ef_search=ef_search, prefer=prefer)
+    stamp = _stamp(conn)
+    with _REGISTRY_LOCK:
+        _REGISTRY[key] = (stamp, detected)
+    return detected
+
+
+def forget_backends() -> None:
+    """Drop every cached selection and the extension probe so the next query re-detects."""
+
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+    reset_extension_probe()
+
+
+def _detect(
+    conn: sqlite3.Connection,
+    *,
+    resident: bool,
+    nprobe: Optional[int],
+    ef_search: Optional[int],
+    prefer: Optional[str],
+) -> VectorBackend:
     if not _has_embeddings_table(conn):
         return VectorBackend(name="none", backend=None)
+    if prefer == "binary":
+        binary = BinaryBackend.create(conn, resident=resident)
+        if binary is not None:
+            return VectorBackend(name=binary.name, backend=binary)
+    hnsw = HNSWBackend.create(conn, ef_search=ef_search, resident=resident)
+    if hnsw is not None:
+        return VectorBackend(name=hnsw.name, backend=hnsw)
+    ivf = IVFBackend.create(conn, nprobe=nprobe, resident=resident)
+    if ivf is not None:
+        return VectorBackend(name=ivf.name, backend=ivf)
     backend = SQLiteExtensionBackend.create(conn)
     if backend is not None:
         return VectorBackend(name=backend.name, backend=backend)
-    return VectorBackend(name="python-fallback", backend=PythonFallbackBackend())
+    return VectorBackend(name="python-fallback", backend=PythonFallbackBackend(resident=resident))
+
+
+def _stamp(conn: sqlite3.Connection) -> Tuple[int, str]:
+    schema_version = int(conn.execute("PRAGMA schema_version").fetchone()[0])
+    return schema_version, read_meta(conn, BACKENDS_KEY, "0")
 
 
 def get_backend(conn: sqlite3.Connection) -> Backend:
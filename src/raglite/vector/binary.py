@@ -0,0 +1,181 @@
+"""Sign-bit signatures with a Hamming-distance prefilter.
+
+Every embedding gets a ``sig`` blob holding one bit per dimension (set when the
+component is positive), so a 384-dim vector costs 48 bytes. Queries XOR the
+query signature against a resident array of all signatures, keep the
+``candidates`` rows with the smallest popcount and rescore only those with
+exact cosine over the float32 blobs.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional, Tuple
+
+from ..db import read_meta, write_meta
+from .matrix import ResidentMatrix, _resident, np
+from .python_fallback import PythonFallbackBackend
+from .quantize import rescore
+from .types import Candidate
+
+SIGNATURES_KEY = "binary_signatures"
+DEFAULT_BINARY_CANDIDATES = 2000
+_BLOCK_ROWS = 65536
+
+
+def sign_bits(blob: bytes) -> bytes:
+    """Pack the sign of each float32 component, most significant bit first."""
+
+    values = array("f")
+    values.frombytes(blob)
+    out = bytearray((len(values) + 7) // 8)
+    for idx, value in enumerate(values):
+        if value > 0:
+            out[idx >> 3] |= 0x80 >> (idx & 7)
+    return bytes(out)
+
+
+def signatures_enabled(conn: sqlite3.Connection) -> bool:
+    return read_meta(conn, SIGNATURES_KEY) == "1"
+
+
+def enable_signatures(conn: sqlite3.Connection) -> int:
+    """Turn on signature maintenance and backfill rows that lack one."""
+
+    with conn:
+        write_meta(conn, SIGNATURES_KEY, "1")
+        rows = conn.execute("SELECT id, embedding FROM embeddings WHERE sig IS NULL").fetchall()
+        conn.executemany(
+            "UPDATE embeddings SET sig = ? WHERE id = ?",
+            [(sign_bits(row[1]), int(row[0])) for row in rows],
+        )
+    return len(rows)
+
+
+@dataclass
+class SignatureMatrix:
+    """Packed sign bits, one ``uint8`` row per embedding."""
+
+    dim: int
+    ids: Any
+    bits: Any
+
+    @classmethod
+    def from_rows(cls, dim: int, rows: Iterable[Tuple[int, Optional[bytes]]]) -> "SignatureMatrix":
+        assert np is not None
+        width = (dim + 7) // 8
+        ids: List[int] = []
+        blobs: List[bytes] = []
+        for chunk_id, sig in rows:
+            if sig is None or len(sig) != width:
+                continue
+            ids.append(int(chunk_id))
+            blobs.append(sig)
+        return cls(
+            dim=dim,
+            ids=np.asarray(ids, dtype=np.int64),
+            bits=np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(ids), width),
+        )
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def extend(self, other: "SignatureMatrix") -> "SignatureMatrix":
+        assert np is not None
+        if not len(other):
+            return self
+        return SignatureMatrix(
+            dim=self.dim,
+            ids=np.concatenate([self.ids, other.ids]),
+            bits=np.concatenate([self.bits, other.bits]),
+        )
+
+    def nearest(self, query_vector, count: int) -> List[int]:
+        """Chunk ids of the ``count`` signatures closest to the query in Hamming distance."""
+
+        assert np is not None
+        if count <= 0 or not len(self):
+            return []
+        query = np.packbits(np.asarray(query_vector, dtype=np.float32) > 0)
+        distances = np.empty(len(self), dtype=np.uint16)
+        for start in range(0, len(self), _BLOCK_ROWS):
+            block = self.bits[start : start + _BLOCK_ROWS] ^ query
+            distances[start : start + block.shape[0]] = _popcount(block).sum(
+                axis=1, dtype=np.uint16
+            )
+        if count < distances.shape[0]:
+            picked = np.argpartition(distances, count - 1)[:count]
+        else:
+            picked = np.arange(distances.shape[0])
+        return [int(i) for i in self.ids[picked]]
+
+
+@dataclass
+class BinaryBackend:
+    name: str = "binary"
+    candidates: int = DEFAULT_BINARY_CANDIDATES
+    _fallback: PythonFallbackBackend = field(default_factory=PythonFallbackBackend)
+
+    @classmethod
+    def create(
+        cls, conn: sqlite3.Connection, *, resident: bool = False
+    ) -> Optional["BinaryBackend"]:
+        """Select the backend on a database whose signatures are already maintained.
+
+        Signatures are enabled by ingest or ``init_db`` with
+        ``vector_backend="binary"``, never on the query path, so asking for
+        this backend on a database without them raises instead of silently
+        falling back.
+        """
+
+        if np is None:
+            return None
+        if not signatures_enabled(conn):
+            raise RuntimeError(
+                "The binary backend needs sign-bit signatures; ingest with "
+                "--vector-backend binary or call enable_signatures() first"
+            )
+        return cls(_fallback=PythonFallbackBackend(resident=resident))
+
+    def search(
+        self,
+        conn: sqlite3.Connection,
+        query_vector,
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Iterable[int]] = None,
+    ) -> List[Candidate]:
+        if prefilter_ids is not None:
+            return self._fallback.search(
+                conn, query_vector, top_n=top_n, prefilter_ids=prefilter_ids
+            )
+        dim = len(query_vector)
+        signatures = _resident(
+            conn,
+            dim,
+            "binary",
+            lambda: ResidentMatrix(
+                dim,
+                SignatureMatrix.from_rows(dim, []),
+                columns="chunk_id, sig",
+                build=SignatureMatrix.from_rows,
+            ),
+        )
+        if signatures is None or not len(signatures):
+            return self._fallback.search(conn, query_vector, top_n=top_n)
+        shortlist = signatures.nearest(query_vector, max(self.candidates, top_n))
+        return rescore(conn, query_vector, [Candidate(i, 0.0) for i in shortlist], top_n=top_n)
+
+
+def _popcount(block):
+    assert np is not None
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(block)
+    return _POPCOUNT_TABLE[block]
+
+
+_POPCOUNT_TABLE = (
+    np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8) if np is not None else None
+)
@@ -0,0 +1,542 @@
+"""Hierarchical navigable small world (HNSW) graph backend.
+
+The graph is persisted in SQLite: ``hnsw_nodes`` holds each node's level,
+tombstone flag and unit-normalised vector, and ``hnsw_edges`` holds one
+neighbour list per ``(node, layer)``. The graph is loaded lazily into memory
+the first time a process searches it and is reloaded only when another
+connection changes it. Ingest adds nodes incrementally to a private copy
+held for the writing connection, which is published to searchers only after
+the transaction commits. Deleting an embedding tombstones its node so it is
+still traversed but never returned, and an embedding id that is written
+again revives its node.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import random
+import secrets
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from ..config import DEFAULT_EF_SEARCH
+from ..db import database_path, mark_backends_changed, read_meta, write_meta
+from .matrix import np
+from .python_fallback import PythonFallbackBackend
+from .quantize import quantization_mode
+from .types import Candidate
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 100
+GENERATION_KEY = "hnsw_generation"
+TOMBSTONE_KEY = "hnsw_tombstones"
+
+
+@dataclass
+class HNSWIndexStats:
+    nodes: int
+    max_level: int
+    dim: int
+
+
+class HNSWGraph:
+    """In-memory HNSW graph over unit-normalised float32 vectors."""
+
+    def __init__(self, dim: int, *, m: int = DEFAULT_M, ef_construction: int = 0) -> None:
+        assert np is not None
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction or DEFAULT_EF_CONSTRUCTION
+        self.level_mult = 1.0 / math.log(max(m, 2))
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.size = 0
+        self.embedding_ids: List[int] = []
+        self.chunk_ids: List[int] = []
+        self.levels: List[int] = []
+        self.deleted: List[bool] = []
+        self.links: List[List[List[int]]] = []
+        self.positions: Dict[int, int] = {}
+        self.entry = -1
+        self.max_level = -1
+        self.generation = ""
+        self.tombstones = ""
+        self._rng = random.Random(0)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def copy(self) -> "HNSWGraph":
+        """Independent copy that can be extended while searches use the original."""
+
+        clone = HNSWGraph(self.dim, m=self.m, ef_construction=self.ef_construction)
+        clone.vectors = self.vectors[: self.size].copy()
+        clone.size = self.size
+        clone.embedding_ids = list(self.embedding_ids)
+        clone.chunk_ids = list(self.chunk_ids)
+        clone.levels = list(self.levels)
+        clone.deleted = list(self.deleted)
+        clone.links = [[list(layer) for layer in node] for node in self.links]
+        clone.positions = dict(self.positions)
+        clone.entry = self.entry
+        clone.max_level = self.max_level
+        clone.generation = self.generation
+        clone.tombstones = self.tombstones
+        clone._rng.setstate(self._rng.getstate())
+        return clone
+
+    def max_links(self, layer: int) -> int:
+        return self.m * 2 if layer == 0 else self.m
+
+    def add_node(
+        self, embedding_id: int, chunk_id: int, vector, level: int, *, deleted: bool = False
+    ) -> int:
+        assert np is not None
+        if self.size == self.vectors.shape[0]:
+            grown = np.empty((max(16, self.size * 2), self.dim), dtype=np.float32)
+            grown[: self.size] = self.vectors[: self.size]
+            self.vectors = grown
+        pos = self.size
+        self.vectors[pos] = vector
+        self.size += 1
+        self.embedding_ids.append(embedding_id)
+        self.chunk_ids.append(chunk_id)
+        self.levels.append(level)
+        self.deleted.append(deleted)
+        self.links.append([[] for _ in range(level + 1)])
+        self.positions[embedding_id] = pos
+        return pos
+
+    def insert(self, embedding_id: int, chunk_id: int, vector) -> Set[Tuple[int, int]]:
+        """Insert a node and return the ``(position, layer)`` lists that changed."""
+
+        level = int(-math.log(1.0 - self._rng.random()) * self.level_mult)
+        pos = self.add_node(embedding_id, chunk_id, vector, level)
+        return self._link(pos, level)
+
+    def revive(self, embedding_id: int, chunk_id: int, vector) -> Set[Tuple[int, int]]:
+        """Reuse the tombstoned node of ``embedding_id`` for a new vector.
+
+        The node keeps its level and is relinked from its new position. Lists
+        elsewhere that still point at it only cost a little traversal work.
+        """
+
+        pos = self.positions[embedding_id]
+        self.vectors[pos] = vector
+        self.chunk_ids[pos] = chunk_id
+        self.deleted[pos] = False
+        return self._link(pos, self.levels[pos])
+
+    def _link(self, pos: int, level: int) -> Set[Tuple[int, int]]:
+        assert np is not None
+        changed: Set[Tuple[int, int]] = {(pos, layer) for layer in range(level + 1)}
+        if self.entry < 0:
+            self.entry, self.max_level = pos, level
+            return changed
+        query = self.vectors[pos]
+        entry = self.entry
+        for layer in range(self.max_level, level, -1):
+            entry = self._search_layer(query, [entry], 1, layer)[0][1]
+        entries = [entry]
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = [
+                hit
+                for hit in self._search_layer(query, entries, self.ef_construction, layer)
+                if hit[1] != pos
+            ]
+            limit = self.max_links(layer)
+            neighbours = self._select_neighbours(found, limit)
+            self.links[pos][layer] = neighbours
+            for other in neighbours:
+                other_links = self.links[other][layer]
+                if pos in other_links:
+                    continue
+                other_links.append(pos)
+                if len(other_links) > limit:
+                    sims = (self.vectors[other_links] @ self.vectors[other]).tolist()
+                    ranked = sorted(zip(sims, other_links, strict=True), reverse=True)
+                    self.links[other][layer] = self._select_neighbours(ranked, limit)
+                changed.add((other, layer))
+            entries = [p for _, p in found] or entries
+        if level > self.max_level:
+            self.entry, self.max_level = pos, level
+        return changed
+
+    def _select_neighbours(self, ranked: Sequence[Tuple[float, int]], limit: int) -> List[int]:
+        """Pick diverse neighbours from ``ranked`` (best first) using the HNSW heuristic.
+
+        A candidate is kept only if it is closer to the base node than to every
+        neighbour already kept, which preserves links into sparse regions.
+        """
+
+        selected: List[int] = []
+        for sim, candidate in ranked:
+            if selected:
+                closest = float((self.vectors[selected] @ self.vectors[candidate]).max())
+                if closest > sim:
+                    continue
+            selected.append(candidate)
+            if len(selected) >= limit:
+                break
+        return selected
+
+    def search(self, query, *, top_n: int, ef: int) -> List[Candidate]:
+        assert np is not None
+        if self.entry < 0 or top_n <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if not norm:
+            return []
+        query = query / norm
+        entry = self.entry
+        for layer in range(self.max_level, 0, -1):
+            entry = self._search_layer(query, [entry], 1, layer)[0][1]
+        found = self._search_layer(query, [entry], max(ef, top_n), 0)
+        results: List[Candidate] = []
+        for sim, pos in found:
+            if self.deleted[pos]:
+                continue
+            results.append(Candidate(self.chunk_ids[pos], float(sim)))
+            if len(results) >= top_n:
+                break
+        return results
+
+    def _search_layer(
+        self, query, entries: Sequence[int], ef: int, layer: int
+    ) -> List[Tuple[float, int]]:
+        visited = set(entries)
+        sims = (self.vectors[list(entries)] @ query).tolist()
+        candidates = [(-sim, pos) for sim, pos in zip(sims, entries, strict=True)]
+        heapq.heapify(candidates)
+        best = [(sim, pos) for sim, pos in zip(sims, entries, strict=True)]
+        heapq.heapify(best)
+        while len(best) > ef:
+            heapq.heappop(best)
+        while candidates:
+            neg_sim, pos = heapq.heappop(candidates)
+            if len(best) >= ef and -neg_sim < best[0][0]:
+                break
+            links = self.links[pos]
+            if layer >= len(links):
+                continue
+            fresh = [n for n in links[layer] if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for sim, other in zip((self.vectors[fresh] @ query).tolist(), fresh, strict=True):
+                if len(best) < ef or sim > best[0][0]:
+                    heapq.heappush(candidates, (-sim, other))
+                    heapq.heappush(best, (sim, other))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return sorted(best, reverse=True)
+
+
+@dataclass
+class HNSWBackend:
+    name: str = "hnsw"
+    ef_search: int = DEFAULT_EF_SEARCH
+    _fallback: PythonFallbackBackend = field(default_factory=PythonFallbackBackend)
+
+    @classmethod
+    def create(
+        cls,
+        conn: sqlite3.Connection,
+        *,
+        ef_search: Optional[int] = None,
+        resident: bool = False,
+    ) -> Optional["HNSWBackend"]:
+        if np is None or not has_hnsw_index(conn):
+            return None
+        return cls(
+            ef_search=ef_search or DEFAULT_EF_SEARCH,
+            _fallback=PythonFallbackBackend(resident=resident),
+        )
+
+    def search(
+        self,
+        conn: sqlite3.Connection,
+        query_vector,
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Iterable[int]] = None,
+    ) -> List[Candidate]:
+        if prefilter_ids is not None:
+            return self._fallback.search(
+                conn, query_vector, top_n=top_n, prefilter_ids=prefilter_ids
+            )
+        graph = load_graph(conn)
+        if graph is None or graph.dim != len(query_vector):
+            return self._fallback.search(conn, query_vector, top_n=top_n)
+        return graph.search(query_vector, top_n=top_n, ef=self.ef_search)
+
+
+def has_hnsw_index(conn: sqlite3.Connection) -> bool:
+    try:
+        row = conn.execute("SELECT 1 FROM hnsw_nodes LIMIT 1").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return row is not None
+
+
+def build_hnsw_index(
+    conn: sqlite3.Connection,
+    *,
+    m: int = DEFAULT_M,
+    ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+) -> HNSWIndexStats:
+    """Build the graph from every embedding, replacing (and compacting) any existing one."""
+
+    if np is None:
+        raise RuntimeError("numpy is required to build an HNSW index")
+    if quantization_mode(conn) == "int8":
+        raise ValueError(
+            "HNSW scores float32 vectors and ignores int8 codes; set quantization to none first"
+        )
+    rows = conn.execute("SELECT id, chunk_id, embedding FROM embeddings ORDER BY id").fetchall()
+    if not rows:
+        raise ValueError("No embeddings to index")
+    dim = len(rows[0][2]) // 4
+    graph = HNSWGraph(dim, m=m, ef_construction=ef_construction)
+    for emb_id, chunk_id, blob in rows:
+        if len(blob) == dim * 4:
+            graph.insert(int(emb_id), int(chunk_id), _unit(blob))
+    with conn:
+        conn.execute("DELETE FROM hnsw_nodes")
+        conn.execute("DELETE FROM hnsw_edges")
+        write_meta(conn, "hnsw_m", str(m))
+        write_meta(conn, "hnsw_ef_construction", str(ef_construction))
+        _persist(conn, graph, range(len(graph)), _all_lists(graph))
+        mark_backends_changed(conn)
+    discard_graph(conn)
+    _cache(conn, graph)
+    return HNSWIndexStats(nodes=len(graph), max_level=graph.max_level, dim=dim)
+
+
+def add_embeddings(conn: sqlite3.Connection, rows: Sequence[Tuple[int, int, bytes]]) -> None:
+    """Insert freshly written ``(embedding_id, chunk_id, blob)`` rows into an existing graph.
+
+    The rows go into ``conn``'s private graph; call :func:`publish_graph`
+    after committing so searches pick it up without reloading.
+    """
+
+    if not rows or np is None or not has_hnsw_index(conn):
+        return
+    graph = _writer_graph(conn)
+    if graph is None:
+        return
+    first = len(graph)
+    revived: List[int] = []
+    changed: Set[Tuple[int, int]] = set()
+    for emb_id, chunk_id, blob in rows:
+        if len(blob) != graph.dim * 4:
+            continue
+        pos = graph.positions.get(int(emb_id))
+        if pos is None:
+            changed |= graph.insert(int(emb_id), int(chunk_id), _unit(blob))
+        elif graph.deleted[pos]:
+            # A deleted embedding's id was handed out again.
+            changed |= graph.revive(int(emb_id), int(chunk_id), _unit(blob))
+            revived.append(pos)
+    if changed:
+        _persist(conn, graph, [*revived, *range(first, len(graph))], changed)
+    path = database_path(conn)
+    if path is not None:
+        with _GRAPHS_LOCK:
+            _PENDING[path] = (conn, graph)
+
+
+def publish_graph(conn: sqlite3.Connection) -> None:
+    """Hand the graph extended by ``conn`` to searchers once its transaction committed."""
+
+    path = database_path(conn)
+    if path is None:
+        return
+    generation = read_meta(conn, GENERATION_KEY)
+    with _GRAPHS_LOCK:
+        pending = _PENDING.get(path)
+        if pending is None or pending[0] is not conn:
+            return
+        del _PENDING[path]
+        if pending[1].generation == generation:
+            _GRAPHS[path] = pending[1]
+
+
+def discard_graph(conn: sqlite3.Connection) -> None:
+    """Forget the private graph of ``conn``, e.g. after its transaction rolled back."""
+
+    path = database_path(conn)
+    if path is None:
+        return
+    with _GRAPHS_LOCK:
+        pending = _PENDING.get(path)
+        if pending is not None and pending[0] is conn:
+            del _PENDING[path]
+
+
+def drop_hnsw_index(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("DELETE FROM hnsw_nodes")
+        conn.execute("DELETE FROM hnsw_edges")
+        mark_backends_changed(conn)
+
+
+_GRAPHS: Dict[str, HNSWGraph] = {}
+# Graphs extended inside a writer's open transaction, keyed like ``_GRAPHS``.
+_PENDING: Dict[str, Tuple[sqlite3.Connection, HNSWGraph]] = {}
+_GRAPHS_LOCK = threading.Lock()
+
+
+def load_graph(conn: sqlite3.Connection) -> Optional[HNSWGraph]:
+    """Return the in-memory graph for ``conn``, (re)loading it only when it changed."""
+
+    assert np is not None
+    generation = read_meta(conn, GENERATION_KEY)
+    tombstones = read_meta(conn, TOMBSTONE_KEY)
+    path = database_path(conn)
+    with _GRAPHS_LOCK:
+        graph = _GRAPHS.get(path) if path is not None else None
+        if graph is None or graph.generation != generation:
+            graph = _read_graph(conn)
+            if graph is None:
+                return None
+            graph.generation = generation
+            graph.tombstones = tombstones
+        elif graph.tombstones != tombstones:
+            _refresh_deleted(conn, graph, tombstones)
+        if path is not None:
+            _GRAPHS[path] = graph
+    return graph
+
+
+def _writer_graph(conn: sqlite3.Connection) -> Optional[HNSWGraph]:
+    # The writer never mutates the published graph: it continues its own
+    # pending graph, or starts from a copy of the published one.
+    assert np is not None
+    generation = read_meta(conn, GENERATION_KEY)
+    tombstones = read_meta(conn, TOMBSTONE_KEY)
+    path = database_path(conn)
+    graph: Optional[HNSWGraph] = None
+    if path is not None:
+        with _GRAPHS_LOCK:
+            pending = _PENDING.pop(path, None)
+            published = _GRAPHS.get(path)
+            if pending is not None and pending[0] is conn and pending[1].generation == generation:
+                graph = pending[1]
+            elif published is not None and published.generation == generation:
+                graph = published.copy()
+    if graph is None:
+        graph = _read_graph(conn)
+        if graph is None:
+            return None
+        graph.generation = generation
+        graph.tombstones = tombstones
+    elif graph.tombstones != tombstones:
+        _refresh_deleted(conn, graph, tombstones)
+    return graph
+
+
+def _refresh_deleted(conn: sqlite3.Connection, graph: HNSWGraph, tombstones: str) -> None:
+    deleted = {
+        int(row[0]) for row in conn.execute("SELECT embedding_id FROM hnsw_nodes WHERE deleted = 1")
+    }
+    graph.deleted = [emb_id in deleted for emb_id in graph.embedding_ids]
+    graph.tombstones = tombstones
+
+
+def _read_graph(conn: sqlite3.Connection) -> Optional[HNSWGraph]:
+    assert np is not None
+    nodes = conn.execute(
+        """
+        SELECT embedding_id, chunk_id, level, deleted, vector
+        FROM hnsw_nodes
+        ORDER BY embedding_id
+        """
+    ).fetchall()
+    if not nodes:
+        return None
+    m = int(read_meta(conn, "hnsw_m") or DEFAULT_M)
+    ef_construction = int(read_meta(conn, "hnsw_ef_construction") or DEFAULT_EF_CONSTRUCTION)
+    dim = len(nodes[0][4]) // 4
+    graph = HNSWGraph(dim, m=m, ef_construction=ef_construction)
+    for emb_id, chunk_id, level, deleted, blob in nodes:
+        vector = np.frombuffer(blob, dtype=np.float32)
+        graph.add_node(int(emb_id), int(chunk_id), vector, int(level), deleted=bool(deleted))
+    for emb_id, layer, blob in conn.execute(
+        "SELECT embedding_id, layer, neighbors FROM hnsw_edges"
+    ):
+        pos = graph.positions.get(int(emb_id))
+        if pos is None or layer >= len(graph.links[pos]):
+            continue
+        graph.links[pos][layer] = [
+            graph.positions[n]
+            for n in np.frombuffer(blob, dtype=np.int64).tolist()
+            if n in graph.positions
+        ]
+    entry = int(read_meta(conn, "hnsw_entry") or -1)
+    graph.entry = graph.positions.get(entry, -1)
+    graph.max_level = graph.levels[graph.entry] if graph.entry >= 0 else -1
+    return graph
+
+
+def _persist(
+    conn: sqlite3.Connection,
+    graph: HNSWGraph,
+    new_positions: Iterable[int],
+    changed: Iterable[Tuple[int, int]],
+) -> None:
+    assert np is not None
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO hnsw_nodes(embedding_id, chunk_id, level, deleted, vector)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                graph.embedding_ids[pos],
+                graph.chunk_ids[pos],
+                graph.levels[pos],
+                int(graph.deleted[pos]),
+                graph.vectors[pos].tobytes(),
+            )
+            for pos in new_positions
+        ],
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO hnsw_edges(embedding_id, layer, neighbors) VALUES (?, ?, ?)",
+        [
+            (
+                graph.embedding_ids[pos],
+                layer,
+                np.asarray(
+                    [graph.embedding_ids[n] for n in graph.links[pos][layer]], dtype=np.int64
+                ).tobytes(),
+            )
+            for pos, layer in changed
+        ],
+    )
+    write_meta(conn, "hnsw_entry", str(graph.embedding_ids[graph.entry]))
+    graph.generation = secrets.token_hex(8)
+    write_meta(conn, GENERATION_KEY, graph.generation)
+    graph.tombstones = read_meta(conn, TOMBSTONE_KEY)
+
+
+def _cache(conn: sqlite3.Connection, graph: HNSWGraph) -> None:
+    path = database_path(conn)
+    if path is not None:
+        with _GRAPHS_LOCK:
+            _GRAPHS[path] = graph
+
+
+def _all_lists(graph: HNSWGraph) -> List[Tuple[int, int]]:
+    return [(pos, layer) for pos in range(len(graph)) for layer in range(graph.levels[pos] + 1)]
+
+
+def _unit(blob: bytes):
+    assert np is not None
+    vector = np.frombuffer(blob, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
@@ -0,0 +1,251 @@
+"""Inverted-file (IVF) approximate nearest-neighbour backend.
+
+Centroids live in ``ivf_centroids`` and every embedding is assigned to its
+closest list in ``ivf_postings``. Queries score the centroids, probe the
+``nprobe`` closest lists and run exact cosine over their members only. With
+int8 quantization the probed lists are scored on their codes and the
+shortlist is rescored in float32.
+"""
+
+from __future__ import annotations
+
+import math
+import secrets
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import DEFAULT_NPROBE
+from ..db import database_path, mark_backends_changed, read_meta, write_meta
+from .matrix import VectorMatrix, np
+from .python_fallback import PythonFallbackBackend
+from .quantize import QuantizedMatrix, quantization_mode, rescore, rescore_size
+from .types import Candidate
+
+GENERATION_KEY = "ivf_generation"
+_ASSIGN_BATCH = 4096
+
+
+@dataclass
+class IVFIndexStats:
+    lists: int
+    vectors: int
+    dim: int
+
+
+@dataclass
+class IVFBackend:
+    name: str = "ivf"
+    nprobe: int = DEFAULT_NPROBE
+    _fallback: PythonFallbackBackend = field(default_factory=PythonFallbackBackend)
+
+    @classmethod
+    def create(
+        cls,
+        conn: sqlite3.Connection,
+        *,
+        nprobe: Optional[int] = None,
+        resident: bool = False,
+    ) -> Optional["IVFBackend"]:
+        if np is None or not has_ivf_index(conn):
+            return None
+        return cls(
+            nprobe=nprobe or DEFAULT_NPROBE,
+            _fallback=PythonFallbackBackend(resident=resident),
+        )
+
+    def search(
+        self,
+        conn: sqlite3.Connection,
+        query_vector,
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Iterable[int]] = None,
+    ) -> List[Candidate]:
+        if prefilter_ids is not None:
+            # Prefilters are already a small candidate set; score them exactly.
+            return self._fallback.search(
+                conn, query_vector, top_n=top_n, prefilter_ids=prefilter_ids
+            )
+        assert np is not None
+        centroids = _load_centroids(conn)
+        if centroids is None or centroids.shape[1] != len(query_vector):
+            return self._fallback.search(conn, query_vector, top_n=top_n)
+        query = np.asarray(query_vector, dtype=np.float32)
+        lists = [int(i) for i in _top_lists(centroids, query, self.nprobe)]
+        if quantization_mode(conn) == "int8":
+            codes = QuantizedMatrix.from_rows(
+                centroids.shape[1], _probe(conn, lists, "e.qvec, e.qscale, e.qoffset")
+            )
+            shortlist = codes.search(query, top_n=rescore_size(top_n))
+            return rescore(conn, query, shortlist, top_n=top_n)
+        matrix = VectorMatrix.from_rows(centroids.shape[1], _probe(conn, lists, "e.embedding"))
+        return matrix.search(query, top_n=top_n)
+
+
+def _probe(conn: sqlite3.Connection, lists: Sequence[int], columns: str) -> List[Tuple]:
+    placeholders = ",".join("?" for _ in lists)
+    return conn.execute(
+        f"""
+        SELECT e.chunk_id, {columns}
+        FROM ivf_postings p
+        JOIN embeddings e ON e.id = p.embedding_id
+        WHERE p.list_id IN ({placeholders})
+        """,
+        list(lists),
+    ).fetchall()
+
+
+def has_ivf_index(conn: sqlite3.Connection) -> bool:
+    try:
+        row = conn.execute("SELECT 1 FROM ivf_centroids LIMIT 1").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return row is not None
+
+
+def build_ivf_index(
+    conn: sqlite3.Connection,
+    *,
+    nlist: Optional[int] = None,
+    iterations: int = 10,
+    seed: int = 0,
+) -> IVFIndexStats:
+    """Train spherical k-means centroids and (re)assign every embedding to a list."""
+
+    if np is None:
+        raise RuntimeError("numpy is required to build an IVF index")
+    rows = conn.execute("SELECT id, chunk_id, embedding FROM embeddings ORDER BY id").fetchall()
+    if not rows:
+        raise ValueError("No embeddings to index")
+    dim = len(rows[0][2]) // 4
+    rows = [row for row in rows if len(row[2]) == dim * 4]
+    vectors = _normalize(
+        np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(len(rows), dim)
+    )
+    count = len(rows)
+    lists = max(1, min(count, nlist or int(round(math.sqrt(count)))))
+    rng = np.random.default_rng(seed)
+    sample_size = min(count, lists * 64)
+    train = vectors[rng.choice(count, size=sample_size, replace=False)]
+    centroids = _kmeans(train, lists, iterations, rng)
+    assignments = _assign(vectors, centroids)
+    with conn:
+        conn.execute("DELETE FROM ivf_centroids")
+        conn.execute("DELETE FROM ivf_postings")
+        conn.executemany(
+            "INSERT INTO ivf_centroids(list_id, dim, centroid) VALUES (?, ?, ?)",
+            [(idx, dim, centroids[idx].tobytes()) for idx in range(lists)],
+        )
+        conn.executemany(
+            "INSERT INTO ivf_postings(embedding_id, list_id, chunk_id) VALUES (?, ?, ?)",
+            [
+                (int(row[0]), int(list_id), int(row[1]))
+                for row, list_id in zip(rows, assignments, strict=True)
+            ],
+        )
+        write_meta(conn, GENERATION_KEY, secrets.token_hex(8))
+        mark_backends_changed(conn)
+    return IVFIndexStats(lists=lists, vectors=count, dim=dim)
+
+
+def assign_embeddings(conn: sqlite3.Connection, rows: Sequence[Tuple[int, int, bytes]]) -> None:
+    """Add freshly inserted ``(embedding_id, chunk_id, blob)`` rows to an existing index."""
+
+    if not rows or np is None or not has_ivf_index(conn):
+        return
+    centroids = _load_centroids(conn)
+    if centroids is None:
+        return
+    dim = centroids.shape[1]
+    usable = [row for row in rows if len(row[2]) == dim * 4]
+    if not usable:
+        return
+    vectors = _normalize(
+        np.frombuffer(b"".join(row[2] for row in usable), dtype=np.float32).reshape(
+            len(usable), dim
+        )
+    )
+    assignments = _assign(vectors, centroids)
+    conn.executemany(
+        "INSERT OR REPLACE INTO ivf_postings(embedding_id, list_id, chunk_id) VALUES (?, ?, ?)",
+        [
+            (int(row[0]), int(list_id), int(row[1]))
+            for row, list_id in zip(usable, assignments, strict=True)
+        ],
+    )
+
+
+def drop_ivf_index(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("DELETE FROM ivf_centroids")
+        conn.execute("DELETE FROM ivf_postings")
+        mark_backends_changed(conn)
+
+
+_CENTROIDS: Dict[str, Tuple[str, Any]] = {}
+_CENTROIDS_LOCK = threading.Lock()
+
+
+def _load_centroids(conn: sqlite3.Connection):
+    assert np is not None
+    generation = read_meta(conn, GENERATION_KEY)
+    path = database_path(conn)
+    if path is not None:
+        with _CENTROIDS_LOCK:
+            cached = _CENTROIDS.get(path)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+    rows = conn.execute("SELECT dim, centroid FROM ivf_centroids ORDER BY list_id").fetchall()
+    if not rows:
+        return None
+    dim = int(rows[0][0])
+    centroids = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(
+        len(rows), dim
+    )
+    if path is not None:
+        with _CENTROIDS_LOCK:
+            _CENTROIDS[path] = (generation, centroids)
+    return centroids
+
+
+def _normalize(vectors):
+    assert np is not None
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _assign(vectors, centroids):
+    assert np is not None
+    out = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], _ASSIGN_BATCH):
+        block = vectors[start : start + _ASSIGN_BATCH]
+        out[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def _kmeans(train, lists: int, iterations: int, rng):
+    assert np is not None
+    centroids = train[rng.choice(train.shape[0], size=lists, replace=False)].copy()
+    for _ in range(max(1, iterations)):
+        assignments = _assign(train, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, train)
+        counts = np.bincount(assignments, minlength=lists)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = train[rng.choice(train.shape[0], size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32, copy=False)
+
+
+def _top_lists(centroids, query, nprobe: int) -> List[int]:
+    assert np is not None
+    scores = centroids @ query
+    probe = max(1, min(nprobe, scores.shape[0]))
+    if probe < scores.shape[0]:
+        picked = np.argpartition(-scores, probe - 1)[:probe]
+    else:
+        picked = np.arange(scores.shape[0])
+    return [int(i) for i in picked]
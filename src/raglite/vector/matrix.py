@@ -0,0 +1,336 @@
+"""Resident NumPy vector matrices for the Python backend."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..db import database_path
+from .types import Candidate
+
+try:
+    import numpy as _np
+except Exception:  # pragma: no cover - optional dependency
+    np: ModuleType | None = None
+else:
+    np = _np
+
+# Queries scored per matrix-matrix product in ``VectorMatrix.search_many``.
+_QUERY_BLOCK = 64
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+@dataclass
+class VectorMatrix:
+    """Contiguous float32 rows with the chunk ids they belong to."""
+
+    dim: int
+    ids: Any
+    vectors: Any
+    inv_norms: Any
+    _sorted: Any = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def empty(cls, dim: int) -> "VectorMatrix":
+        assert np is not None
+        return cls(
+            dim=dim,
+            ids=np.empty(0, dtype=np.int64),
+            vectors=np.empty((0, dim), dtype=np.float32),
+            inv_norms=np.empty(0, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_rows(cls, dim: int, rows: Iterable[Tuple[int, bytes]]) -> "VectorMatrix":
+        assert np is not None
+        ids: List[int] = []
+        blobs: List[bytes] = []
+        stride = dim * 4
+        for chunk_id, blob in rows:
+            if len(blob) != stride:
+                continue
+            ids.append(int(chunk_id))
+            blobs.append(blob)
+        if not ids:
+            return cls.empty(dim)
+        vectors = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(ids), dim)
+        return cls(
+            dim=dim,
+            ids=np.asarray(ids, dtype=np.int64),
+            vectors=vectors,
+            inv_norms=_inverse_norms(vectors),
+        )
+
+    @classmethod
+    def from_arrays(cls, dim: int, ids, vectors) -> "VectorMatrix":
+        return cls(dim=dim, ids=ids, vectors=vectors, inv_norms=_inverse_norms(vectors))
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def extend(self, other: "VectorMatrix") -> "VectorMatrix":
+        assert np is not None
+        if not len(other):
+            return self
+        return VectorMatrix(
+            dim=self.dim,
+            ids=np.concatenate([self.ids, other.ids]),
+            vectors=np.concatenate([self.vectors, other.vectors]),
+            inv_norms=np.concatenate([self.inv_norms, other.inv_norms]),
+        )
+
+    def search(
+        self,
+        query_vector,
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Iterable[int]] = None,
+    ) -> List[Candidate]:
+        assert np is not None
+        if top_n <= 0 or not len(self):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if not query_norm:
+            return []
+        if prefilter_ids is not None:
+            if self._sorted is None:
+                self._sorted = sorted_ids(self.ids)
+            rows = select_rows(self._sorted, prefilter_ids)
+            if not rows.size:
+                return []
+            scores = (self.vectors[rows] @ query) * self.inv_norms[rows] / query_norm
+            valid = self.inv_norms[rows] > 0
+            return _top_candidates(self.ids[rows][valid], scores[valid], top_n)
+        scores = (self.vectors @ query) * self.inv_norms / query_norm
+        valid = self.inv_norms > 0
+        if bool(valid.all()):
+            return _top_candidates(self.ids, scores, top_n)
+        return _top_candidates(self.ids[valid], scores[valid], top_n)
+
+    def search_many(
+        self,
+        query_vectors: Sequence[Any],
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Sequence[Optional[Iterable[int]]]] = None,
+    ) -> List[List[Candidate]]:
+        """Score several queries with matrix-matrix products instead of one pass each.
+
+        Unfiltered queries share blocks of ``vectors @ Q.T``. Prefiltered queries
+        share one product over the union of their allow-lists.
+        """
+
+        assert np is not None
+        count = len(query_vectors)
+        results: List[List[Candidate]] = [[] for _ in range(count)]
+        if top_n <= 0 or not count or not len(self):
+            return results
+        filters = list(prefilter_ids) if prefilter_ids is not None else [None] * count
+        queries = np.stack([np.asarray(q, dtype=np.float32) for q in query_vectors])
+        norms = np.linalg.norm(queries, axis=1)
+        unfiltered = [j for j in range(count) if filters[j] is None and norms[j]]
+        valid = self.inv_norms > 0
+        for start in range(0, len(unfiltered), _QUERY_BLOCK):
+            block = unfiltered[start : start + _QUERY_BLOCK]
+            scores = (self.vectors @ queries[block].T) * self.inv_norms[:, None] / norms[block]
+            for col, j in enumerate(block):
+                results[j] = _top_candidates(self.ids[valid], scores[valid, col], top_n)
+        filtered = [j for j in range(count) if filters[j] is not None and norms[j]]
+        if not filtered:
+            return results
+        if self._sorted is None:
+            self._sorted = sorted_ids(self.ids)
+        rows_per_query = {j: select_rows(self._sorted, filters[j] or ()) for j in filtered}
+        union = np.unique(np.concatenate([rows_per_query[j] for j in filtered]))
+        if not union.size:
+            return results
+        product = self.vectors[union] @ queries[filtered].T
+        for col, j in enumerate(filtered):
+            rows = rows_per_query[j]
+            if not rows.size:
+                continue
+            keep = self.inv_norms[rows] > 0
+            rows = rows[keep]
+            scores = product[np.searchsorted(union, rows), col] * self.inv_norms[rows] / norms[j]
+            results[j] = _top_candidates(self.ids[rows], scores, top_n)
+        return results
+
+
+@dataclass
+class ResidentMatrix:
+    """``VectorMatrix`` cached across queries and refreshed from the embeddings table.
+
+    ``columns``/``build`` pick which embedding columns are loaded and how rows
+    become a matrix, so quantized codes can share the same refresh logic.
+
+    Freshness is checked with a dedicated read-only watcher connection: its
+    ``PRAGMA data_version`` moves whenever any other connection commits, so
+    the ``embeddings`` table is only re-examined after a write to the database.
+    """
+
+    dim: int
+    matrix: Any
+    columns: str = "chunk_id, embedding"
+    build: Callable[[int, Iterable[Tuple[Any, ...]]], Any] = VectorMatrix.from_rows
+    last_rowid: int = 0
+    row_count: int = 0
+    _version: Optional[int] = None
+    _watcher: Optional[sqlite3.Connection] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def refresh(self, conn: sqlite3.Connection) -> Any:
+        with self._lock:
+            version = self._data_version(conn)
+            if version is not None and version == self._version:
+                return self.matrix
+            count, max_rowid = conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM embeddings"
+            ).fetchone()
+            count, max_rowid = int(count), int(max_rowid)
+            if count == self.row_count and max_rowid == self.last_rowid:
+                self._version = version
+                return self.matrix
+            rows = conn.execute(
+                f"SELECT rowid, {self.columns} FROM embeddings WHERE rowid > ? ORDER BY rowid",
+                (self.last_rowid,),
+            ).fetchall()
+            if self.row_count + len(rows) == count:
+                appended = self.build(self.dim, (tuple(r[1:]) for r in rows))
+                self.matrix = self.matrix.extend(appended)
+            else:
+                # Rows were deleted or rewritten underneath us; rebuild from scratch.
+                rows = conn.execute(
+                    f"SELECT rowid, {self.columns} FROM embeddings ORDER BY rowid"
+                ).fetchall()
+                self.matrix = self.build(self.dim, (tuple(r[1:]) for r in rows))
+            self.row_count = count
+            self.last_rowid = max_rowid
+            self._version = version
+            return self.matrix
+
+    def close(self) -> None:
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+
+    def _data_version(self, conn: sqlite3.Connection) -> Optional[int]:
+        # ``None`` means freshness cannot be proven, so the table is re-examined.
+        try:
+            if self._watcher is None:
+                path = database_path(conn)
+                if path is None:
+                    return None
+                self._watcher = sqlite3.connect(
+                    f"file:{path}?mode=ro", uri=True, check_same_thread=False
+                )
+            return int(self._watcher.execute("PRAGMA data_version").fetchone()[0])
+        except sqlite3.Error:
+            return None
+
+
+_RESIDENT: Dict[Tuple[str, int, str], ResidentMatrix] = {}
+_RESIDENT_LOCK = threading.Lock()
+
+
+def resident_matrix(conn: sqlite3.Connection, dim: int) -> Optional[VectorMatrix]:
+    """Return the up-to-date resident matrix for ``conn``'s database, or ``None``."""
+
+    return _resident(conn, dim, "float32", lambda: ResidentMatrix(dim, VectorMatrix.empty(dim)))
+
+
+def _resident(
+    conn: sqlite3.Connection, dim: int, kind: str, factory: Callable[[], ResidentMatrix]
+) -> Any:
+    if np is None:
+        return None
+    path = database_path(conn)
+    if path is None:
+        return None
+    key = (path, dim, kind)
+    with _RESIDENT_LOCK:
+        cached = _RESIDENT.get(key)
+        if cached is None:
+            cached = factory()
+            _RESIDENT[key] = cached
+    return cached.refresh(conn)
+
+
+def clear_resident_cache() -> None:
+    with _RESIDENT_LOCK:
+        cached = list(_RESIDENT.values())
+        _RESIDENT.clear()
+    for resident in cached:
+        resident.close()
+
+
+def id_array(ids: Iterable[int]):
+    """``ids`` as an ``int64`` array, without a Python loop when it already is one."""
+
+    assert np is not None
+    if isinstance(ids, np.ndarray):
+        return ids.astype(np.int64, copy=False)
+    if not isinstance(ids, (list, tuple)):
+        ids = list(ids)
+    return np.asarray(ids, dtype=np.int64)
+
+
+def sorted_ids(ids) -> Tuple[Any, Any]:
+    """``(order, ids[order])`` for :func:`select_rows`; cache it alongside ``ids``."""
+
+    assert np is not None
+    order = np.argsort(ids, kind="stable")
+    return order, ids[order]
+
+
+def select_rows(index: Tuple[Any, Any], wanted: Iterable[int]):
+    """Row positions whose id is in ``wanted``, found by binary search.
+
+    ``index`` comes from :func:`sorted_ids`. The lookup costs
+    ``O(len(wanted) * log(len(ids)))``, so large allow-lists never trigger a
+    full pass over the matrix ids.
+    """
+
+    assert np is not None
+    order, ordered = index
+    targets = id_array(wanted)
+    if not targets.size or not ordered.size:
+        return np.empty(0, dtype=np.int64)
+    lo = np.searchsorted(ordered, targets, side="left")
+    hi = np.searchsorted(ordered, targets, side="right")
+    counts = hi - lo
+    if not counts.any():
+        return np.empty(0, dtype=np.int64)
+    if int(counts.max()) == 1:
+        positions = lo[counts == 1]
+    else:
+        # A chunk can own several embeddings (multiple models); expand every match.
+        positions = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi, strict=True) if b > a])
+    return np.unique(order[positions])
+
+
+def _inverse_norms(vectors):
+    assert np is not None
+    norms = np.linalg.norm(vectors, axis=1)
+    inv = np.zeros_like(norms)
+    np.divide(1.0, norms, out=inv, where=norms > 0)
+    return inv.astype(np.float32, copy=False)
+
+
+def _top_candidates(ids, scores, top_n: int) -> List[Candidate]:
+    assert np is not None
+    if not scores.size:
+        return []
+    if top_n < scores.size:
+        picked = np.argpartition(-scores, top_n - 1)[:top_n]
+    else:
+        picked = np.arange(scores.size)
+    order = picked[np.argsort(-scores[picked], kind="stable")]
+    return [Candidate(int(ids[i]), float(scores[i])) for i in order]
@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+import json
 import sqlite3
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
 
 from ..embed import embedding_from_bytes
+from .matrix import VectorMatrix, numpy_available, resident_matrix
+from .quantize import (
+    QuantizedMatrix,
+    quantization_mode,
+    rescore,
+    rescore_size,
+    resident_quantized_matrix,
+)
+from .sidecar import sidecar_matrix
 from .types import Candidate
 
+# Embedding rows decoded per block when ``search_many`` scans the table.
+_SCAN_ROWS = 16384
+
 
 @dataclass
 class PythonFallbackBackend:
     name: str = "python"
+    resident: bool = False
 
     def search(
         self,
@@ -22,32 +36,140 @@ class PythonFallbackBackend:
         top_n: int,
         prefilter_ids: Optional[Iterable[int]] = None,
     ) -> List[Candidate]:
-        ids = list(prefilter_ids) if prefilter_ids is not None else self._all_chunk_ids(conn)
-        if not ids:
+        int8 = quantization_mode(conn) == "int8"
+        if self.resident and int8:
+            quantized = resident_quantized_matrix(conn, len(query_vector))
+            if quantized is not None:
+                shortlist = quantized.search(
+                    query_vector, top_n=rescore_size(top_n), prefilter_ids=prefilter_ids
+                )
+                return rescore(conn, query_vector, shortlist, top_n=top_n)
+        matrix = self._matrix(conn, len(query_vector))
+        if matrix is not None:
+            return matrix.search(query_vector, top_n=top_n, prefilter_ids=prefilter_ids)
+        ids = [int(i) for i in prefilter_ids] if prefilter_ids is not None else None
+        if ids is not None and not ids:
             return []
-        placeholders = ",".join("?" for _ in ids)
-        cur = conn.execute(
-            f"SELECT chunk_id, embedding FROM embeddings WHERE chunk_id IN ({placeholders})",
-            ids,
-        )
+        if int8 and numpy_available():
+            shortlist = self._scan_quantized(conn, query_vector, top_n=rescore_size(top_n), ids=ids)
+            return rescore(conn, query_vector, shortlist, top_n=top_n)
         query_vec = query_vector
         query_norm = self._norm(query_vec)
         if not query_norm:
             return []
         scored: List[Candidate] = []
-        for row in cur.fetchall():
-            vector = embedding_from_bytes(row[1])
-            norm = self._norm(vector)
-            if not norm:
-                continue
-            score = float(self._dot(query_vec, vector) / (query_norm * norm))
-            scored.append(Candidate(int(row[0]), score))
+        for chunk_id, blob, stored_norm, normalized in self._rows(conn, ids):
+            vector = embedding_from_bytes(blob)
+            if normalized:
+                score = float(self._dot(query_vec, vector) / query_norm)
+            else:
+                norm = stored_norm if stored_norm is not None else self._norm(vector)
+                if not norm:
+                    continue
+                score = float(self._dot(query_vec, vector) / (query_norm * norm))
+            scored.append(Candidate(int(chunk_id), score))
         scored.sort(key=lambda c: c.score, reverse=True)
         return scored[:top_n]
 
-    def _all_chunk_ids(self, conn: sqlite3.Connection) -> List[int]:
-        cur = conn.execute("SELECT DISTINCT chunk_id FROM embeddings")
-        return [int(row[0]) for row in cur.fetchall()]
+    def search_many(
+        self,
+        conn: sqlite3.Connection,
+        query_vectors: Sequence[Any],
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Sequence[Optional[Iterable[int]]]] = None,
+    ) -> List[List[Candidate]]:
+        filters = list(prefilter_ids) if prefilter_ids is not None else [None] * len(query_vectors)
+        quantized = quantization_mode(conn) == "int8"
+        matrix = self._matrix(conn, len(query_vectors[0])) if query_vectors else None
+        if matrix is not None and not quantized:
+            return matrix.search_many(query_vectors, top_n=top_n, prefilter_ids=filters)
+        if query_vectors and not quantized and numpy_available():
+            return self._scan_many(conn, query_vectors, top_n=top_n, filters=filters)
+        return [
+            self.search(conn, query, top_n=top_n, prefilter_ids=ids)
+            for query, ids in zip(query_vectors, filters, strict=True)
+        ]
+
+    def _scan_many(
+        self,
+        conn: sqlite3.Connection,
+        query_vectors: Sequence[Any],
+        *,
+        top_n: int,
+        filters: Sequence[Optional[Iterable[int]]],
+    ) -> List[List[Candidate]]:
+        # Unfiltered queries share one pass over the table: each block of rows
+        # is decoded once and scored against every query with a matrix product.
+        results: List[List[Candidate]] = [[] for _ in query_vectors]
+        shared = [j for j, ids in enumerate(filters) if ids is None]
+        for j, ids in enumerate(filters):
+            if ids is not None:
+                results[j] = self.search(conn, query_vectors[j], top_n=top_n, prefilter_ids=ids)
+        if not shared or top_n <= 0:
+            return results
+        queries = [query_vectors[j] for j in shared]
+        dim = len(queries[0])
+        cur = conn.execute("SELECT chunk_id, embedding FROM embeddings")
+        while True:
+            rows = cur.fetchmany(_SCAN_ROWS)
+            if not rows:
+                break
+            block = VectorMatrix.from_rows(dim, rows).search_many(queries, top_n=top_n)
+            for j, found in zip(shared, block, strict=True):
+                merged = results[j] + found
+                merged.sort(key=lambda c: c.score, reverse=True)
+                results[j] = merged[:top_n]
+        return results
+
+    def _scan_quantized(
+        self,
+        conn: sqlite3.Connection,
+        query_vector,
+        *,
+        top_n: int,
+        ids: Optional[List[int]],
+    ) -> List[Candidate]:
+        # Non-resident int8 first stage: score the codes block by block so only
+        # the shortlist's float32 blobs are ever read.
+        where, params = self._where(ids)
+        cur = conn.execute("SELECT chunk_id, qvec, qscale, qoffset FROM embeddings" + where, params)
+        best: List[Candidate] = []
+        while True:
+            rows = cur.fetchmany(_SCAN_ROWS)
+            if not rows:
+                break
+            found = QuantizedMatrix.from_rows(len(query_vector), rows).search(
+                query_vector, top_n=top_n
+            )
+            best = sorted(best + found, key=lambda c: c.score, reverse=True)[:top_n]
+        return best
+
+    def _matrix(self, conn: sqlite3.Connection, dim: int) -> Optional[VectorMatrix]:
+        matrix = sidecar_matrix(conn, dim)
+        if matrix is None and self.resident:
+            matrix = resident_matrix(conn, dim)
+        return matrix
+
+    def _rows(self, conn: sqlite3.Connection, ids: Optional[List[int]]) -> List[Tuple]:
+        where, params = self._where(ids)
+        try:
+            cur = conn.execute(
+                "SELECT chunk_id, embedding, norm, normalized FROM embeddings" + where, params
+            )
+        except sqlite3.OperationalError:
+            # Bare embeddings tables without the precomputed norm columns.
+            cur = conn.execute(
+                "SELECT chunk_id, embedding, NULL, 0 FROM embeddings" + where, params
+            )
+        return cur.fetchall()
+
+    def _where(self, ids: Optional[List[int]]) -> Tuple[str, Tuple]:
+        # The allow-list is bound as one JSON array, so its size never touches
+        # SQLite's variable limit or the statement cache.
+        if ids is None:
+            return "", ()
+        return " WHERE chunk_id IN (SELECT value FROM json_each(?))", (json.dumps(ids),)
 
     def _dot(self, a, b) -> float:
         length = min(len(a), len(b))
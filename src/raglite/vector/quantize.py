@@ -0,0 +1,260 @@
+"""Int8 scalar quantization of stored embeddings.
+
+Each vector is mapped to 256 evenly spaced levels between its own minimum
+(``offset``) and maximum, so ``v ~= (code + 128) * scale + offset``. The codes
+are stored in ``embeddings.qvec`` next to the float32 blob, which is kept for
+rescoring the shortlist produced by the quantized first stage.
+
+Quantization adds storage rather than reducing it: each row grows by ``dim``
+bytes plus two floats. What shrinks is the memory and I/O of the first
+stage. The Python backend (resident or scanning) and the IVF backend score
+the codes. HNSW, the vector sidecar and the sqlite-vec table only hold
+float32, so int8 is refused while any of them exists.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from ..db import database_path, read_meta, write_meta
+from .matrix import (
+    ResidentMatrix,
+    VectorMatrix,
+    _resident,
+    _top_candidates,
+    clear_resident_cache,
+    np,
+    select_rows,
+    sorted_ids,
+)
+from .sidecar import sidecar_path
+from .types import Candidate
+
+QUANTIZATION_KEY = "quantization"
+QUANTIZATION_MODES = ("none", "int8")
+# How many quantized candidates are rescored in float32 per requested result.
+RESCORE_FACTOR = 4
+RESCORE_MIN = 50
+_BLOCK_ROWS = 65536
+
+
+def quantization_mode(conn: sqlite3.Connection) -> str:
+    return read_meta(conn, QUANTIZATION_KEY, "none")
+
+
+def rescore_size(top_n: int) -> int:
+    return max(top_n * RESCORE_FACTOR, RESCORE_MIN)
+
+
+def quantize_int8(blob: bytes) -> Tuple[bytes, float, float]:
+    """Quantize a float32 blob and return ``(codes, scale, offset)``."""
+
+    values = array("f")
+    values.frombytes(blob)
+    if not values:
+        return b"", 0.0, 0.0
+    low = min(values)
+    high = max(values)
+    scale = (high - low) / 255.0
+    if not scale:
+        return bytes(len(values)), 0.0, float(low)
+    codes = array("b", (int(round((v - low) / scale)) - 128 for v in values))
+    return codes.tobytes(), float(scale), float(low)
+
+
+def float_only_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Vector structures that only score float32 and would ignore int8 codes."""
+
+    found: List[str] = []
+    try:
+        if conn.execute("SELECT 1 FROM hnsw_nodes LIMIT 1").fetchone() is not None:
+            found.append("hnsw")
+    except sqlite3.OperationalError:
+        pass
+    path = database_path(conn)
+    if path is not None and sidecar_path(path).exists():
+        found.append("vector sidecar")
+    vec_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='vec_embeddings'"
+    ).fetchone()
+    if vec_table is not None:
+        found.append("sqlite-vec table")
+    return found
+
+
+def set_quantization(conn: sqlite3.Connection, mode: str) -> int:
+    """Persist the database's quantization mode and backfill existing rows.
+
+    ``int8`` keeps the float32 blobs for rescoring, so the database grows.
+    It is refused while an HNSW index, vector sidecar or sqlite-vec table
+    exists, because none of them can use the codes.
+
+    Returns the number of embeddings that were (re)quantized.
+    """
+
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode}")
+    conflicts = float_only_indexes(conn) if mode == "int8" else []
+    if conflicts:
+        raise ValueError(
+            f"int8 quantization is not used by the {' and '.join(conflicts)}; "
+            "remove it before enabling int8"
+        )
+    with conn:
+        write_meta(conn, QUANTIZATION_KEY, mode)
+        if mode == "none":
+            conn.execute("UPDATE embeddings SET qvec = NULL, qscale = NULL, qoffset = NULL")
+            return 0
+        rows = conn.execute("SELECT id, embedding FROM embeddings WHERE qvec IS NULL").fetchall()
+        conn.executemany(
+            "UPDATE embeddings SET qvec = ?, qscale = ?, qoffset = ? WHERE id = ?",
+            [(*quantize_int8(row[1]), int(row[0])) for row in rows],
+        )
+    clear_resident_cache()
+    return len(rows)
+
+
+def resident_quantized_matrix(conn: sqlite3.Connection, dim: int) -> Optional["QuantizedMatrix"]:
+    """Int8 counterpart of :func:`~raglite.vector.matrix.resident_matrix`."""
+
+    return _resident(
+        conn,
+        dim,
+        "int8",
+        lambda: ResidentMatrix(
+            dim,
+            QuantizedMatrix.from_rows(dim, []),
+            columns="chunk_id, qvec, qscale, qoffset",
+            build=QuantizedMatrix.from_rows,
+        ),
+    )
+
+
+def rescore(
+    conn: sqlite3.Connection, query_vector, shortlist: Sequence[Candidate], *, top_n: int
+) -> List[Candidate]:
+    """Re-rank a quantized shortlist with exact cosine over the stored float32 blobs."""
+
+    if not shortlist:
+        return []
+    rows = conn.execute(
+        "SELECT chunk_id, embedding FROM embeddings "
+        "WHERE chunk_id IN (SELECT value FROM json_each(?))",
+        (json.dumps([c.chunk_id for c in shortlist]),),
+    ).fetchall()
+    matrix = VectorMatrix.from_rows(len(query_vector), ((r[0], r[1]) for r in rows))
+    return matrix.search(query_vector, top_n=top_n)
+
+
+@dataclass
+class QuantizedMatrix:
+    """Int8 codes with per-row scale/offset, scored without dequantizing the whole matrix."""
+
+    dim: int
+    ids: Any
+    codes: Any
+    scales: Any
+    offsets: Any
+    inv_norms: Any
+    _sorted: Any = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_rows(
+        cls, dim: int, rows: Iterable[Tuple[int, Optional[bytes], float, float]]
+    ) -> "QuantizedMatrix":
+        assert np is not None
+        ids: List[int] = []
+        blobs: List[bytes] = []
+        scales: List[float] = []
+        offsets: List[float] = []
+        for chunk_id, codes, scale, offset in rows:
+            if codes is None or len(codes) != dim:
+                continue
+            ids.append(int(chunk_id))
+            blobs.append(codes)
+            scales.append(float(scale))
+            offsets.append(float(offset))
+        code_matrix = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(ids), dim)
+        matrix = cls(
+            dim=dim,
+            ids=np.asarray(ids, dtype=np.int64),
+            codes=code_matrix,
+            scales=np.asarray(scales, dtype=np.float32),
+            offsets=np.asarray(offsets, dtype=np.float32),
+            inv_norms=np.empty(len(ids), dtype=np.float32),
+        )
+        matrix.inv_norms = matrix._inverse_norms()
+        return matrix
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def extend(self, other: "QuantizedMatrix") -> "QuantizedMatrix":
+        assert np is not None
+        if not len(other):
+            return self
+        return QuantizedMatrix(
+            dim=self.dim,
+            ids=np.concatenate([self.ids, other.ids]),
+            codes=np.concatenate([self.codes, other.codes]),
+            scales=np.concatenate([self.scales, other.scales]),
+            offsets=np.concatenate([self.offsets, other.offsets]),
+            inv_norms=np.concatenate([self.inv_norms, other.inv_norms]),
+        )
+
+    def search(
+        self,
+        query_vector,
+        *,
+        top_n: int,
+        prefilter_ids: Optional[Iterable[int]] = None,
+    ) -> List[Candidate]:
+        assert np is not None
+        if top_n <= 0 or not len(self):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if not query_norm:
+            return []
+        rows: Optional[Sequence[int]] = None
+        if prefilter_ids is not None:
+            if self._sorted is None:
+                self._sorted = sorted_ids(self.ids)
+            rows = select_rows(self._sorted, prefilter_ids)
+            if not len(rows):
+                return []
+        scores = self._dots(query, rows) * self._take(self.inv_norms, rows) / query_norm
+        ids = self._take(self.ids, rows)
+        valid = self._take(self.inv_norms, rows) > 0
+        return _top_candidates(ids[valid], scores[valid], top_n)
+
+    def _take(self, values, rows):
+        return values if rows is None else values[rows]
+
+    def _dots(self, query, rows):
+        assert np is not None
+        codes = self._take(self.codes, rows)
+        shifted_sum = float(query.sum())
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], _BLOCK_ROWS):
+            block = codes[start : start + _BLOCK_ROWS].astype(np.float32)
+            out[start : start + block.shape[0]] = (block + 128.0) @ query
+        scales = self._take(self.scales, rows)
+        offsets = self._take(self.offsets, rows)
+        return out * scales + offsets * shifted_sum
+
+    def _inverse_norms(self):
+        assert np is not None
+        inv = np.zeros(len(self), dtype=np.float32)
+        for start in range(0, len(self), _BLOCK_ROWS):
+            stop = start + _BLOCK_ROWS
+            block = (self.codes[start:stop].astype(np.float32) + 128.0) * self.scales[
+                start:stop, None
+            ] + self.offsets[start:stop, None]
+            norms = np.linalg.norm(block, axis=1)
+            np.divide(1.0, norms, out=inv[start:stop], where=norms > 0)
+        return inv
@@ -0,0 +1,203 @@
+"""Memory-mapped vector sidecar stored next to the SQLite database.
+
+The sidecar lives at ``<db>.vec`` and holds a fixed header followed by
+contiguous float32 rows. A companion ``<db>.vec.ids`` file records the
+``embeddings`` rowid and chunk id of every row. Readers map both files with
+``np.memmap`` so every process shares a single page-cached copy.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ..db import database_path
+from .matrix import VectorMatrix, np
+
+SIDECAR_SUFFIX = ".vec"
+IDS_SUFFIX = ".vec.ids"
+MAGIC = b"RLVEC001"
+HEADER = struct.Struct("<8sIqq")
+HEADER_SIZE = 64
+ID_RECORD = struct.Struct("<qq")
+
+
+@dataclass
+class SidecarHeader:
+    dim: int
+    last_rowid: int
+    rows_seen: int
+
+
+def sidecar_path(db_path: Path | str) -> Path:
+    return Path(f"{db_path}{SIDECAR_SUFFIX}")
+
+
+def ids_path(db_path: Path | str) -> Path:
+    return Path(f"{db_path}{IDS_SUFFIX}")
+
+
+def read_header(path: Path) -> Optional[SidecarHeader]:
+    try:
+        with path.open("rb") as handle:
+            raw = handle.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw) < HEADER.size:
+        return None
+    magic, dim, last_rowid, rows_seen = HEADER.unpack(raw)
+    if magic != MAGIC:
+        return None
+    return SidecarHeader(dim=dim, last_rowid=last_rowid, rows_seen=rows_seen)
+
+
+def _write_header(handle, header: SidecarHeader) -> None:
+    handle.seek(0)
+    payload = HEADER.pack(MAGIC, header.dim, header.last_rowid, header.rows_seen)
+    handle.write(payload.ljust(HEADER_SIZE, b"\0"))
+
+
+def sync_sidecar(conn: sqlite3.Connection, db_path: Path | str, dim: int) -> int:
+    """Bring the sidecar up to date with committed ``embeddings`` rows.
+
+    New rows are appended; if rows were deleted, or the dimension changed, the
+    sidecar is rewritten. Returns the number of vector rows written.
+    """
+
+    vec_file = sidecar_path(db_path)
+    header = read_header(vec_file)
+    count, max_rowid = _embedding_state(conn)
+    if header is not None and header.dim == dim:
+        if (header.rows_seen, header.last_rowid) == (count, max_rowid):
+            return 0
+        pending = int(
+            conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE rowid > ?", (header.last_rowid,)
+            ).fetchone()[0]
+        )
+        if header.rows_seen + pending == count:
+            return _append(conn, db_path, header, dim)
+    return _rebuild(conn, db_path, dim)
+
+
+def _append(conn: sqlite3.Connection, db_path: Path | str, header: SidecarHeader, dim: int) -> int:
+    rows = conn.execute(
+        "SELECT rowid, chunk_id, embedding FROM embeddings WHERE rowid > ? ORDER BY rowid",
+        (header.last_rowid,),
+    ).fetchall()
+    written = 0
+    stride = dim * 4
+    with sidecar_path(db_path).open("r+b") as vec_handle, ids_path(db_path).open("ab") as id_handle:
+        vec_handle.seek(0, os.SEEK_END)
+        for rowid, chunk_id, blob in rows:
+            header.rows_seen += 1
+            header.last_rowid = int(rowid)
+            if len(blob) != stride:
+                continue
+            vec_handle.write(blob)
+            id_handle.write(ID_RECORD.pack(int(rowid), int(chunk_id)))
+            written += 1
+        vec_handle.flush()
+        id_handle.flush()
+        _write_header(vec_handle, header)
+    return written
+
+
+def _rebuild(conn: sqlite3.Connection, db_path: Path | str, dim: int) -> int:
+    vec_file = sidecar_path(db_path)
+    id_file = ids_path(db_path)
+    vec_tmp = vec_file.with_name(vec_file.name + ".tmp")
+    id_tmp = id_file.with_name(id_file.name + ".tmp")
+    header = SidecarHeader(dim=dim, last_rowid=0, rows_seen=0)
+    with vec_tmp.open("wb") as vec_handle:
+        _write_header(vec_handle, header)
+    id_tmp.write_bytes(b"")
+    # Swap the ids file in first: readers trust the ids file for the row count.
+    os.replace(id_tmp, id_file)
+    os.replace(vec_tmp, vec_file)
+    return _append(conn, db_path, header, dim)
+
+
+def _embedding_state(conn: sqlite3.Connection) -> Tuple[int, int]:
+    count, max_rowid = conn.execute(
+        "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM embeddings"
+    ).fetchone()
+    return int(count), int(max_rowid)
+
+
+@dataclass
+class _MappedSidecar:
+    stat_key: Tuple[int, int, int, int]
+    header: SidecarHeader
+    matrix: VectorMatrix
+
+
+_MAPPED: Dict[str, _MappedSidecar] = {}
+_MAPPED_LOCK = threading.Lock()
+
+
+def sidecar_matrix(conn: sqlite3.Connection, dim: int) -> Optional[VectorMatrix]:
+    """Return a memory-mapped matrix for ``conn``'s sidecar if it is present and current."""
+
+    if np is None:
+        return None
+    db_file = database_path(conn)
+    if db_file is None:
+        return None
+    vec_file = sidecar_path(db_file)
+    id_file = ids_path(db_file)
+    try:
+        vec_stat = vec_file.stat()
+        id_stat = id_file.stat()
+    except FileNotFoundError:
+        return None
+    stat_key = (vec_stat.st_ino, vec_stat.st_mtime_ns, id_stat.st_ino, id_stat.st_size)
+    with _MAPPED_LOCK:
+        mapped = _MAPPED.get(str(vec_file))
+        if mapped is None or mapped.stat_key != stat_key:
+            mapped = _map(vec_file, id_file, stat_key)
+            if mapped is None:
+                _MAPPED.pop(str(vec_file), None)
+                return None
+            _MAPPED[str(vec_file)] = mapped
+    if mapped.header.dim != dim:
+        return None
+    if _embedding_state(conn) != (mapped.header.rows_seen, mapped.header.last_rowid):
+        return None
+    return mapped.matrix
+
+
+def _map(
+    vec_file: Path, id_file: Path, stat_key: Tuple[int, int, int, int]
+) -> Optional[_MappedSidecar]:
+    assert np is not None
+    header = read_header(vec_file)
+    if header is None:
+        return None
+    stride = header.dim * 4
+    rows = min(
+        id_file.stat().st_size // ID_RECORD.size,
+        (vec_file.stat().st_size - HEADER_SIZE) // stride if stride else 0,
+    )
+    if rows <= 0:
+        matrix = VectorMatrix.empty(header.dim)
+    else:
+        index = np.memmap(id_file, dtype=np.int64, mode="r", shape=(rows, 2))
+        vectors = np.memmap(
+            vec_file, dtype=np.float32, mode="r", offset=HEADER_SIZE, shape=(rows, header.dim)
+        )
+        matrix = VectorMatrix.from_arrays(header.dim, index[:, 1], vectors)
+    return _MappedSidecar(stat_key=stat_key, header=header, matrix=matrix)
+
+
+def remove_sidecar(db_path: Path | str) -> None:
+    for path in (sidecar_path(db_path), ids_path(db_path)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
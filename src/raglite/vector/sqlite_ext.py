@@ -1,41 +1,58 @@
-"""Backend powered by sqlite extensions."""
+"""Backend powered by the sqlite-vec extension.
+
+Embeddings are mirrored into a ``vec_embeddings`` ``vec0`` virtual table
+(rowid = ``embeddings.id``) kept in sync by triggers, and KNN queries run
+inside SQLite via ``MATCH ... AND k = ?``.
+"""
 
 from __future__ import annotations
 
+import json
 import sqlite3
+import threading
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from ..db import VECTOR_EXTENSIONS, load_vector_extension
 from .python_fallback import PythonFallbackBackend
+from .quantize import quantization_mode
 from .types import Candidate
 
-EXTENSION_NAMES = ["sqlite_vec", "vec0", "sqlite_vss"]
+EXTENSION_NAMES = list(VECTOR_EXTENSIONS)
+VEC_TABLE = "vec_embeddings"
+
+_COUNTERS: Dict[str, Any] = {"loaded": None, "served": 0, "fallback": 0, "last_error": None}
+_COUNTERS_LOCK = threading.Lock()
 
 
 @dataclass
 class SQLiteExtensionBackend:
     name: str = "sqlite-extension"
+    extension: Optional[str] = None
     _fallback: PythonFallbackBackend = field(default_factory=PythonFallbackBackend)
 
     @classmethod
     def create(cls, conn: sqlite3.Connection) -> Optional["SQLiteExtensionBackend"]:
-        if not hasattr(conn, "enable_load_extension"):
+        """Use the extension when it loads and the ``vec_embeddings`` mirror exists.
+
+        The mirror is built on the write path (:func:`prepare_vec_index`), so
+        detection never writes and works on read-only connections.
+        """
+
+        extension = load_vector_extension(conn)
+        if extension is None:
             return None
-        for ext in EXTENSION_NAMES:
-            try:
-                conn.enable_load_extension(True)
-                conn.load_extension(ext)
-                conn.enable_load_extension(False)
-                return cls()
-            except sqlite3.OperationalError:
-                continue
-            finally:
-                if hasattr(conn, "enable_load_extension"):
-                    try:
-                        conn.enable_load_extension(False)
-                    except sqlite3.OperationalError:
-                        pass
-        return None
+        with _COUNTERS_LOCK:
+            _COUNTERS["loaded"] = extension
+        if not has_vec_index(conn):
+            return None
+        return cls(extension=extension)
+
+    def ensure_loaded(self, conn: sqlite3.Connection) -> None:
+        """Load the extension into ``conn`` when a cached selection is reused on it."""
+
+        if not extension_loaded(conn):
+            load_vector_extension(conn)
 
     def search(
         self,
@@ -45,23 +62,130 @@ class SQLiteExtensionBackend:
         top_n: int,
         prefilter_ids: Optional[Iterable[int]] = None,
     ) -> List[Candidate]:
+        query_blob = getattr(query_vector, "tobytes", lambda: bytes(query_vector))()
+        sql = f"SELECT rowid, distance FROM {VEC_TABLE} WHERE embedding MATCH ? AND k = ?"
+        params: List[Any] = [query_blob, top_n]
+        if prefilter_ids is not None:
+            sql += (
+                " AND rowid IN (SELECT id FROM embeddings"
+                " WHERE chunk_id IN (SELECT value FROM json_each(?)))"
+            )
+            params.append(json.dumps([int(i) for i in prefilter_ids]))
         try:
-            cur = conn.execute(
-                "SELECT chunk_id, score FROM embedding_search(?, ?) ORDER BY score DESC LIMIT ?",
-                (
-                    getattr(query_vector, "tobytes", lambda: bytes(query_vector))(),
-                    len(query_vector),
-                    top_n,
-                ),
+            rows = conn.execute(
+                f"""
+                WITH knn AS ({sql})
+                SELECT e.chunk_id, knn.distance
+                FROM knn
+                JOIN embeddings e ON e.id = knn.rowid
+                ORDER BY knn.distance
+                """,
+                params,
+            ).fetchall()
+        except sqlite3.OperationalError as exc:
+            _record("fallback", error=str(exc))
+            return self._fallback.search(
+                conn,
+                query_vector,
+                top_n=top_n,
+                prefilter_ids=prefilter_ids,
             )
-            rows = cur.fetchall()
-            if rows:
-                return [Candidate(int(row[0]), float(row[1])) for row in rows]
-        except sqlite3.OperationalError:
-            pass
-        return self._fallback.search(
-            conn,
-            query_vector,
-            top_n=top_n,
-            prefilter_ids=prefilter_ids,
+        _record("served")
+        return [Candidate(int(row[0]), 1.0 - float(row[1])) for row in rows]
+
+
+def extension_loaded(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT vec_version()").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def has_vec_index(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (VEC_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def prepare_vec_index(conn: sqlite3.Connection) -> bool:
+    """Build the ``vec_embeddings`` mirror on a writable connection that has sqlite-vec.
+
+    Ingest and ``init_db`` call this once embeddings exist to size the table.
+    Failures are recorded in :func:`extension_stats` and queries keep using
+    the Python backend. An int8 database gets no mirror, since sqlite-vec
+    would score float32 and bypass the codes.
+    """
+
+    if not extension_loaded(conn) or quantization_mode(conn) == "int8":
+        return False
+    try:
+        return ensure_vec_index(conn)
+    except sqlite3.OperationalError as exc:
+        _record(None, error=str(exc))
+        return False
+
+
+def ensure_vec_index(conn: sqlite3.Connection) -> bool:
+    """Create and backfill ``vec_embeddings`` plus its sync triggers if missing.
+
+    Returns ``False`` when there are no embeddings yet to size the table from.
+    """
+
+    if has_vec_index(conn):
+        return True
+    row = conn.execute("SELECT length(embedding) FROM embeddings ORDER BY rowid DESC LIMIT 1")
+    sample = row.fetchone()
+    if sample is None or not sample[0]:
+        return False
+    stride = int(sample[0])
+    dim = stride // 4
+    with conn:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {VEC_TABLE} "
+            f"USING vec0(embedding float[{dim}] distance_metric=cosine)"
+        )
+        conn.execute(
+            f"INSERT INTO {VEC_TABLE}(rowid, embedding) "
+            "SELECT rowid, embedding FROM embeddings WHERE length(embedding) = ?",
+            (stride,),
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS embeddings_ai_vec AFTER INSERT ON embeddings
+            WHEN length(new.embedding) = {stride} BEGIN
+                INSERT INTO {VEC_TABLE}(rowid, embedding) VALUES (new.rowid, new.embedding);
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS embeddings_ad_vec AFTER DELETE ON embeddings BEGIN
+                DELETE FROM {VEC_TABLE} WHERE rowid = old.rowid;
+            END
+            """
         )
+    return True
+
+
+def drop_vec_index(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("DROP TRIGGER IF EXISTS embeddings_ai_vec")
+        conn.execute("DROP TRIGGER IF EXISTS embeddings_ad_vec")
+        conn.execute(f"DROP TABLE IF EXISTS {VEC_TABLE}")
+
+
+def extension_stats() -> Dict[str, Any]:
+    """Per-process counts of extension-served and fallback queries."""
+
+    with _COUNTERS_LOCK:
+        return dict(_COUNTERS)
+
+
+def _record(outcome: Optional[str], *, error: Optional[str] = None) -> None:
+    with _COUNTERS_LOCK:
+        if outcome is not None:
+            _COUNTERS[outcome] += 1
+        if error is not None:
+            _COUNTERS["last_error"] = error
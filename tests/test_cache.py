@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from raglite.api import RagliteAPI, RagliteConfig
+
+
+def test_query_cache_hits_until_database_changes(tmp_path: Path) -> None:
+    db = tmp_path / "cache.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", query_cache_size=8))
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    api.index(corpus)
+
+    first = api.query("backup", top_k=3)
+    first[0].score = -1.0
+    second = api.query("backup", top_k=3)
+    assert second[0].score != -1.0
+    assert api.stats()["query_cache"] == {"size": 1, "hits": 1, "misses": 1}
+
+    (corpus / "b.txt").write_text("weekly backup rotation", encoding="utf-8")
+    api.index(corpus / "b.txt")
+    third = api.query("backup", top_k=3)
+    assert len(third) == 2
+    assert api.stats()["query_cache"]["misses"] == 2
+
+
+def test_query_cache_drops_results_computed_before_a_write(tmp_path: Path) -> None:
+    import sqlite3
+    import threading
+
+    from raglite.cache import QueryCache
+
+    db = tmp_path / "race.db"
+    writer = sqlite3.connect(db)
+    writer.execute("CREATE TABLE t(x INTEGER)")
+    writer.commit()
+    cache = QueryCache(db, maxsize=4)
+
+    assert cache.get("q") is None
+    writer.execute("INSERT INTO t VALUES (1)")
+    writer.commit()
+    other = threading.Thread(target=cache.get, args=("other",))
+    other.start()
+    other.join()
+    cache.put("q", "computed before the write")
+    assert cache.get("q") is None
+
+    cache.put("q", "fresh")
+    assert cache.get("q") == "fresh"
+    cache.close()
+    writer.close()
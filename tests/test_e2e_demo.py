@@ -1,6 +1,8 @@
 from pathlib import Path
 
 from raglite.api import RagliteAPI, RagliteConfig
+from raglite.db import temp_connection
+from raglite.search import bm25
 
 
 def test_demo_corpus_query(tmp_path: Path):
@@ -12,3 +14,390 @@ def test_demo_corpus_query(tmp_path: Path):
     results = api.query("quick start guide", top_k=5)
     assert results
     assert any("quick start" in r.text.lower() for r in results)
+
+
+def test_query_many_matches_single_queries(tmp_path: Path):
+    db = tmp_path / "demo.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", resident_vectors=True))
+    api.init_db()
+    demo_dir = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+    api.index(demo_dir, strategy="fixed")
+    texts = ["quick start guide", "backup schedule", "zzzz unmatched"]
+    batched = api.query_many(texts, top_k=5)
+    assert len(batched) == len(texts)
+    for text, results in zip(texts, batched, strict=True):
+        single = api.query(text, top_k=5)
+        assert [r.chunk_id for r in results] == [r.chunk_id for r in single]
+
+
+def test_tag_filter_reads_past_first_batch(tmp_path: Path):
+    db = tmp_path / "demo.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    demo_dir = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+    api.index(demo_dir, strategy="fixed")
+    best = api.query("backup", top_k=1)[0]
+    with temp_connection(db) as conn:
+        hits = [c.chunk_id for c in bm25(conn, "backup")]
+        runner_up = next(i for i in hits if i != best.chunk_id)
+        tagged_doc = conn.execute(
+            "SELECT document_id FROM chunks WHERE id = ?", (runner_up,)
+        ).fetchone()[0]
+    api.add_tags(tagged_doc, {"team": "ops"})
+    results = api.query("backup", top_k=1, tags={"team": "ops"})
+    assert [r.document_id for r in results] == [tagged_doc]
+
+
+def test_tag_filter_pushed_into_candidate_search(tmp_path: Path):
+    from raglite.db import TAGS_BACKFILL_KEY, apply_migrations
+
+    db = tmp_path / "demo.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    demo_dir = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+    api.index(demo_dir, strategy="fixed")
+    with temp_connection(db) as conn:
+        hits = {c.chunk_id for c in bm25(conn, "backup")}
+        outsider = conn.execute(
+            "SELECT document_id FROM chunks WHERE id NOT IN (%s) LIMIT 1"
+            % ",".join(str(i) for i in hits)
+        ).fetchone()[0]
+    api.add_tags(outsider, {"team": "ops"})
+    results = api.query("backup", top_k=3, tags={"team": "ops"})
+    assert results and {r.document_id for r in results} == {outsider}
+
+    with temp_connection(db) as conn:
+        tagged = conn.execute("SELECT COUNT(*) FROM chunk_tags").fetchone()[0]
+        assert tagged > 0
+        with conn:
+            conn.execute("DELETE FROM chunk_tags")
+            conn.execute("DELETE FROM raglite_meta WHERE key = ?", (TAGS_BACKFILL_KEY,))
+        apply_migrations(conn)
+        assert conn.execute("SELECT COUNT(*) FROM chunk_tags").fetchone()[0] == tagged
+
+
+def test_parallel_ingest_matches_sequential(tmp_path: Path):
+    demo_dir = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+    rows = []
+    for workers in (1, 2):
+        db = tmp_path / f"ingest{workers}.db"
+        api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", ingest_workers=workers))
+        api.init_db()
+        result = api.index(demo_dir)
+        assert result.documents == 12 and result.embeddings == result.chunks
+        with temp_connection(db) as conn:
+            rows.append(
+                conn.execute(
+                    "SELECT d.path, c.chunk_idx, c.text, e.embedding FROM chunks c"
+                    " JOIN documents d ON d.id = c.document_id"
+                    " JOIN embeddings e ON e.chunk_id = c.id ORDER BY c.id"
+                ).fetchall()
+            )
+    assert [tuple(r) for r in rows[0]] == [tuple(r) for r in rows[1]]
+
+
+def test_embed_batches_span_documents(tmp_path: Path):
+    from raglite.ingest import ParsedDocument, _EmbedBatcher
+
+    class CountingStore:
+        model_name = "count"
+        dimension = 1
+
+        def __init__(self):
+            self.batches = []
+
+        def embed_many(self, texts):
+            self.batches.append(len(texts))
+            return [text.encode("utf-8") for text in texts]
+
+    store = CountingStore()
+    written = []
+    batcher = _EmbedBatcher(store, 4, written.append)
+    sizes = [1, 2, 0, 9, 1]
+    for idx, size in enumerate(sizes):
+        batcher.add(
+            ParsedDocument(
+                tmp_path / f"{idx}.txt", "text/plain", [f"{idx}-{n}" for n in range(size)]
+            )
+        )
+    batcher.flush()
+    assert store.batches == [4, 4, 4, 1]
+    assert [doc.path.name for doc, _ in written] == [f"{idx}.txt" for idx in range(len(sizes))]
+    assert all([v.decode() for v in vectors] == doc.chunks for doc, vectors in written)
+
+
+def test_bulk_ingest_rebuilds_fts_and_restores_trigger(tmp_path: Path):
+    demo_dir = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+    hits = []
+    for bulk in (False, True):
+        db = tmp_path / f"bulk{int(bulk)}.db"
+        api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+        api.init_db()
+        api.index(demo_dir, bulk=bulk)
+        extra = tmp_path / f"extra{int(bulk)}.txt"
+        extra.write_text("zeppelin hangar checklist", encoding="utf-8")
+        api.index(extra)
+        with temp_connection(db) as conn:
+            triggers = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name='chunks_ai'"
+            ).fetchone()[0]
+            assert triggers == 1
+            hits.append(
+                [
+                    [c.chunk_id for c in bm25(conn, text)]
+                    for text in ("backup schedule", "quick start", "zeppelin")
+                ]
+            )
+    assert hits[0] == hits[1]
+    assert hits[1][2]
+
+
+def test_ingest_never_reuses_chunk_or_embedding_ids(tmp_path: Path):
+    import os
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    (corpus / "b.txt").write_text("zeppelin hangar checklist", encoding="utf-8")
+    db = tmp_path / "ids.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    api.index(corpus)
+    with temp_connection(db) as conn:
+        last_chunk, path = conn.execute(
+            "SELECT c.id, d.path FROM chunks c JOIN documents d ON d.id = c.document_id"
+            " ORDER BY c.id DESC LIMIT 1"
+        ).fetchone()
+        last_embedding = conn.execute("SELECT MAX(id) FROM embeddings").fetchone()[0]
+
+    newest = Path(path)
+    newest.write_text("airship mooring procedure", encoding="utf-8")
+    stat = newest.stat()
+    os.utime(newest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    api.index(corpus, bulk=True)
+    with temp_connection(db) as conn:
+        chunk_ids = conn.execute(
+            "SELECT c.id FROM chunks c JOIN documents d ON d.id = c.document_id WHERE d.path = ?",
+            (str(newest.resolve()),),
+        ).fetchall()
+        embedding_ids = conn.execute(
+            "SELECT id FROM embeddings WHERE chunk_id IN (SELECT id FROM chunks WHERE id > ?)",
+            (last_chunk,),
+        ).fetchall()
+    assert chunk_ids and min(row[0] for row in chunk_ids) > last_chunk
+    assert embedding_ids and min(row[0] for row in embedding_ids) > last_embedding
+
+
+def test_symlinked_file_is_indexed_once(tmp_path: Path):
+    import os
+
+    import pytest
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.md").write_text("nightly backup schedule", encoding="utf-8")
+    try:
+        os.symlink(corpus / "a.md", corpus / "b.md")
+    except OSError:
+        pytest.skip("symlinks are not available here")
+    db = tmp_path / "symlink.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    assert api.index(corpus).documents == 1
+    assert api.index(corpus).skipped == 1
+    with temp_connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 1
+
+
+def test_reingest_skips_unchanged_and_replaces_changed(tmp_path: Path):
+    import os
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    (corpus / "b.txt").write_text("zeppelin hangar checklist", encoding="utf-8")
+    db = tmp_path / "incremental.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    first = api.index(corpus)
+    assert (first.documents, first.skipped) == (2, 0)
+
+    again = api.index(corpus)
+    assert (again.documents, again.skipped, again.replaced) == (0, 2, 0)
+
+    target = corpus / "b.txt"
+    with temp_connection(db) as conn:
+        doc_id = conn.execute(
+            "SELECT id FROM documents WHERE path = ?", (str(target.resolve()),)
+        ).fetchone()[0]
+    target.write_text("airship mooring procedure", encoding="utf-8")
+    stat = target.stat()
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    touched = corpus / "a.txt"
+    stat = touched.stat()
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    changed = api.index(corpus)
+    assert (changed.documents, changed.skipped, changed.replaced) == (1, 1, 1)
+    with temp_connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 2
+        rows = conn.execute(
+            "SELECT c.id, COUNT(e.id) FROM chunks c LEFT JOIN embeddings e ON e.chunk_id = c.id "
+            "WHERE c.document_id = ? GROUP BY c.id",
+            (doc_id,),
+        ).fetchall()
+        assert rows and all(count == 1 for _, count in rows)
+        assert not bm25(conn, "zeppelin")
+        assert {hit.chunk_id for hit in bm25(conn, "airship")} == {chunk_id for chunk_id, _ in rows}
+
+    target.write_text("   \n", encoding="utf-8")
+    stat = target.stat()
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    emptied = api.index(corpus)
+    assert (emptied.documents, emptied.skipped, emptied.replaced) == (0, 1, 1)
+    with temp_connection(db) as conn:
+        assert not bm25(conn, "airship")
+        remaining = conn.execute("SELECT COUNT(*) FROM chunks WHERE document_id = ?", (doc_id,))
+        assert remaining.fetchone()[0] == 0
+    assert api.index(corpus).skipped == 2
+
+
+def test_replacing_newest_document_keeps_vector_backends_exact(tmp_path: Path):
+    import os
+
+    import pytest
+
+    pytest.importorskip("numpy")
+    from raglite.embed import DebugEmbeddingStore, embedding_from_bytes
+    from raglite.vector.hnsw import HNSWBackend
+    from raglite.vector.ivf import IVFBackend
+    from raglite.vector.python_fallback import PythonFallbackBackend
+    from raglite.vector.sidecar import sidecar_matrix
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for idx, text in enumerate(["nightly backup", "sync replication", "quick start", "tags"]):
+        (corpus / f"{idx}.txt").write_text(text, encoding="utf-8")
+    db = tmp_path / "replace.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", vector_sidecar=True))
+    api.init_db()
+    api.index(corpus)
+    api.build_index(kind="ivf", nlist=2)
+    api.build_index(kind="hnsw", m=4, ef_construction=32)
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["zeppelin hangar"])[0])
+    backends = {
+        "resident": PythonFallbackBackend(resident=True),
+        "hnsw": HNSWBackend(ef_search=64),
+        "ivf": IVFBackend(nprobe=2),
+    }
+
+    def ranked(conn):
+        exact = [c.chunk_id for c in PythonFallbackBackend().search(conn, query, top_n=10)]
+        found = {
+            name: [c.chunk_id for c in b.search(conn, query, top_n=10)]
+            for name, b in backends.items()
+        }
+        matrix = sidecar_matrix(conn, len(query))
+        assert matrix is not None
+        found["sidecar"] = [c.chunk_id for c in matrix.search(query, top_n=10)]
+        return exact, found
+
+    with temp_connection(db) as conn:
+        ranked(conn)
+        path = conn.execute(
+            "SELECT d.path FROM chunks c JOIN documents d ON d.id = c.document_id"
+            " ORDER BY c.id DESC LIMIT 1"
+        ).fetchone()[0]
+    newest = Path(path)
+    newest.write_text("zeppelin hangar", encoding="utf-8")
+    stat = newest.stat()
+    os.utime(newest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert api.index(corpus).replaced == 1
+
+    with temp_connection(db) as conn:
+        exact, found = ranked(conn)
+        assert len(exact) == 4
+        assert found == {name: exact for name in found}
+
+
+def test_duplicate_chunks_are_embedded_once(monkeypatch, tmp_path: Path):
+    import os
+
+    import raglite.ingest as ingest_module
+    from raglite.embed import DebugEmbeddingStore
+
+    embedded = []
+
+    class CountingStore(DebugEmbeddingStore):
+        def embed_many(self, texts):
+            embedded.extend(texts)
+            return super().embed_many(texts)
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for idx in range(6):
+        (corpus / f"{idx}.txt").write_text("standard legal disclaimer", encoding="utf-8")
+    (corpus / "unique.txt").write_text("zeppelin hangar checklist", encoding="utf-8")
+    db = tmp_path / "dedupe.db"
+    config = RagliteConfig(db_path=db, embed_model="debug", embed_batch_size=4)
+    api = RagliteAPI(config)
+    api.init_db()
+    monkeypatch.setattr(ingest_module, "get_embedding_store", lambda name: CountingStore())
+    result = api.index(corpus)
+    assert sorted(embedded) == ["standard legal disclaimer", "zeppelin hangar checklist"]
+    assert (result.embeddings, result.reused) == (7, 5)
+
+    extra = tmp_path / "extra.txt"
+    extra.write_text("standard legal disclaimer", encoding="utf-8")
+    again = api.index(extra)
+    assert again.reused == 1 and len(embedded) == 2
+    with temp_connection(db) as conn:
+        blobs = conn.execute(
+            "SELECT DISTINCT e.embedding FROM embeddings e JOIN chunks c ON c.id = e.chunk_id "
+            "WHERE c.text = 'standard legal disclaimer'"
+        ).fetchall()
+        assert len(blobs) == 1
+        assert conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] == 2
+
+    unique = corpus / "unique.txt"
+    unique.write_text("airship mooring procedure", encoding="utf-8")
+    stat = unique.stat()
+    os.utime(unique, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert api.index(corpus).replaced == 1
+    with temp_connection(db) as conn:
+        dangling = conn.execute(
+            "SELECT COUNT(*) FROM embedding_cache"
+            " WHERE embedding_id NOT IN (SELECT id FROM embeddings)"
+        ).fetchone()[0]
+        assert dangling == 0
+        assert conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] == 2
+
+
+def test_migration_collapses_duplicate_document_paths(tmp_path: Path):
+    from raglite.db import apply_migrations
+
+    (tmp_path / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    db = tmp_path / "legacy.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    api.index(tmp_path / "a.txt")
+    with temp_connection(db) as conn:
+        with conn:
+            conn.execute("DROP INDEX idx_documents_path_unique")
+            path = conn.execute("SELECT path FROM documents").fetchone()[0]
+            doc_id = conn.execute(
+                "INSERT INTO documents(path, mime) VALUES (?, 'text/plain')", (path,)
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO chunks(document_id, chunk_idx, text) VALUES (?, 0, ?)",
+                (doc_id, "zeppelin hangar checklist"),
+            )
+        apply_migrations(conn)
+        rows = conn.execute("SELECT id FROM documents").fetchall()
+        assert [row[0] for row in rows] == [doc_id]
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 0
+        assert not bm25(conn, "backup")
+        assert bm25(conn, "zeppelin")
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_documents_path_unique'"
+        ).fetchone()
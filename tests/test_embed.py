@@ -1,4 +1,11 @@
-from raglite.embed import DebugEmbeddingStore, embedding_from_bytes, get_embedding_store
+from pathlib import Path
+
+from raglite.embed import (
+    DebugEmbeddingStore,
+    QueryEmbeddingCache,
+    embedding_from_bytes,
+    get_embedding_store,
+)
 
 
 def test_debug_embedding_repeatable():
@@ -12,3 +19,18 @@ def test_debug_embedding_repeatable():
 def test_get_embedding_store_debug():
     store = get_embedding_store("debug")
     assert isinstance(store, DebugEmbeddingStore)
+
+
+def test_query_embedding_cache_tiers(tmp_path: Path):
+    store = DebugEmbeddingStore(dimension=16)
+    path = tmp_path / "query_embeddings.sqlite"
+    cache = QueryEmbeddingCache(maxsize=4, path=path)
+    first = cache.embed_many(store, ["backup  schedule", "sync", "sync"])
+    assert first == store.embed_many(["backup schedule", "sync", "sync"])
+    assert cache.embed_many(store, ["backup schedule"]) == first[:1]
+    assert cache.stats() == {"size": 2, "memory_hits": 1, "disk_hits": 0, "misses": 2}
+    cache.close()
+
+    warm = QueryEmbeddingCache(maxsize=4, path=path)
+    assert warm.embed_many(store, ["sync"]) == first[1:2]
+    assert warm.stats()["disk_hits"] == 1 and warm.stats()["misses"] == 0
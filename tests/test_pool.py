@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from raglite.api import RagliteAPI, RagliteConfig
+from raglite.pool import ConnectionPool
+
+
+def test_pool_reuses_readers_and_replaces_broken_ones(tmp_path: Path) -> None:
+    db = tmp_path / "pool.db"
+    pool = ConnectionPool(db, size=2)
+    with pool.writer() as conn, conn:
+        conn.execute("CREATE TABLE t(x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.reader() as first:
+        assert first.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            first.execute("INSERT INTO t VALUES (2)")
+    with pool.reader() as again:
+        assert again is first
+    first.close()
+    with pool.reader() as replacement:
+        assert replacement is not first
+        assert replacement.execute("SELECT x FROM t").fetchone()[0] == 1
+    assert pool.stats()["replaced"] == 1
+    pool.close()
+    with pytest.raises(RuntimeError):
+        with pool.reader():
+            pass
+
+
+def test_api_queries_share_bounded_pool_across_threads(tmp_path: Path) -> None:
+    db = tmp_path / "api.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", pool_size=2))
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    api.index(corpus)
+    expected = api.query("backup", top_k=3)
+
+    results = []
+
+    def worker() -> None:
+        for _ in range(5):
+            results.append(api.query("backup", top_k=3))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 30
+    assert all([r.chunk_id for r in res] == [r.chunk_id for r in expected] for res in results)
+    assert api.stats()["connection_pool"]["open_readers"] <= 2
+    api.close()
+
+
+def test_async_api_serves_concurrent_queries(tmp_path: Path) -> None:
+    import asyncio
+
+    from raglite.api import AsyncRagliteAPI
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    (corpus / "b.txt").write_text("sync replication service", encoding="utf-8")
+
+    async def scenario():
+        config = RagliteConfig(db_path=tmp_path / "async.db", embed_model="debug", pool_size=2)
+        async with AsyncRagliteAPI(config) as api:
+            await api.init_db()
+            indexed = await api.index(corpus)
+            answers = await asyncio.gather(
+                *(api.query(text, top_k=1) for text in ["backup", "sync"] * 8)
+            )
+            batch = await api.query_many(["backup", "sync"], top_k=1)
+            stats = await api.stats()
+        return indexed, answers, batch, stats
+
+    indexed, answers, batch, stats = asyncio.run(scenario())
+    assert indexed.documents == 2
+    assert [a[0].chunk_id for a in answers[:2]] == [r[0].chunk_id for r in batch]
+    assert len({a[0].chunk_id for a in answers}) == 2
+    assert stats["connection_pool"]["open_readers"] <= 2
+
+
+def _two_file_corpus(tmp_path: Path) -> Path:
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    (corpus / "b.txt").write_text("sync replication service", encoding="utf-8")
+    return corpus
+
+
+def test_pooled_readers_select_binary_backend(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    corpus = _two_file_corpus(tmp_path)
+    binary = RagliteAPI(
+        RagliteConfig(db_path=tmp_path / "binary.db", embed_model="debug", vector_backend="binary")
+    )
+    assert binary.config.pool_size > 0
+    binary.init_db()
+    binary.index(corpus)
+    assert binary.query("backup", top_k=1)
+    assert binary.stats()["vector_backend"] == "binary"
+    binary.close()
+
+
+def test_pooled_readers_select_extension_backend(tmp_path: Path) -> None:
+    from raglite.db import load_vector_extension
+
+    if load_vector_extension(sqlite3.connect(":memory:")) is None:
+        pytest.skip("sqlite-vec cannot be loaded here")
+    corpus = _two_file_corpus(tmp_path)
+    vec = RagliteAPI(RagliteConfig(db_path=tmp_path / "vec.db", embed_model="debug"))
+    vec.init_db()
+    vec.index(corpus)
+    assert vec.query("backup", top_k=1)
+    assert vec.stats()["vector_backend"] == "sqlite-extension"
+    assert vec.stats()["vector_extension"]["served"] > 0
+    vec.close()
+
+
+def test_async_api_leaves_caller_config_untouched(tmp_path: Path) -> None:
+    from raglite.api import AsyncRagliteAPI
+
+    config = RagliteConfig(db_path=tmp_path / "shared.db", embed_model="debug", pool_size=2)
+    api = AsyncRagliteAPI(config, max_workers=6)
+    assert api.config.pool_size == 6
+    assert config.pool_size == 2
+    assert RagliteAPI(config).config.pool_size == 2
+    api.sync.close()
+    api._executor.shutdown()
+
+
+def test_server_shutdown_closes_async_api(monkeypatch, tmp_path: Path) -> None:
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    # Importing the module builds its default app against ./raglite.db.
+    monkeypatch.chdir(tmp_path)
+    from fastapi.testclient import TestClient
+
+    from raglite.api import AsyncRagliteAPI
+    from raglite.server.app import create_app
+
+    closed = []
+    real_aclose = AsyncRagliteAPI.aclose
+
+    async def counting_aclose(self):
+        closed.append(self)
+        await real_aclose(self)
+
+    monkeypatch.setattr(AsyncRagliteAPI, "aclose", counting_aclose)
+    app = create_app(tmp_path / "server.db")
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+        assert not closed
+    assert len(closed) == 1
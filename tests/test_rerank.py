@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import raglite.rerank as rerank_module
+from raglite.api import RagliteAPI, RagliteConfig
+from raglite.rerank import DebugReranker
+
+
+def test_cross_encoder_rerank_batches_and_caches(monkeypatch, tmp_path: Path) -> None:
+    calls = []
+
+    class CountingReranker(DebugReranker):
+        def score_pairs(self, pairs):
+            calls.append(len(pairs))
+            return super().score_pairs(pairs)
+
+    monkeypatch.setattr(rerank_module, "get_reranker", lambda name: CountingReranker())
+    db = tmp_path / "rerank.db"
+    config = RagliteConfig(db_path=db, embed_model="debug", rerank_model="debug", rerank_limit=3)
+    api = RagliteAPI(config)
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for name, text in {
+        "a.txt": "backup",
+        "b.txt": "nightly backup schedule for the archive",
+        "c.txt": "sync replication service",
+        "d.txt": "backup archive rotation",
+    }.items():
+        (corpus / name).write_text(text, encoding="utf-8")
+    api.index(corpus)
+
+    batches = api.query_many(["backup archive", "sync service"], top_k=2, rerank=True)
+    assert len(calls) == 1 and calls[0] <= 6
+    assert [len(results) for results in batches] == [2, 2]
+    top = batches[0][0]
+    assert "archive" in top.text and "backup" in top.text
+    assert batches[0][0].score >= batches[0][1].score
+
+    api.query("backup archive", top_k=2, rerank=True)
+    assert len(calls) == 1
+    cache = api.stats()["rerank_cache"]
+    assert cache["misses"] == calls[0] and cache["hits"] >= 2
@@ -1,3 +1,5 @@
+import pytest
+
 from raglite.search import RankedChunk, normalize_scores
 
 
@@ -12,3 +14,78 @@ def test_normalize_scores_scales_range():
     normalized = normalize_scores(data)
     assert normalized[2] == 0.0
     assert normalized[1] == 1.0
+
+
+def _brute_force(candidates, vectors, alpha, method):
+    from raglite.search import RRF_K, VECTOR_ONLY_BONUS
+
+    norm = normalize_scores(candidates)
+    vec = {c.chunk_id: c.score for c in vectors}
+    lex_rank = {c.chunk_id: r for r, c in enumerate(candidates, 1)}
+    ordered = sorted(vectors, key=lambda c: c.score, reverse=True)
+    vec_rank = {c.chunk_id: r for r, c in enumerate(ordered, 1)}
+    ids = list(dict.fromkeys([c.chunk_id for c in candidates] + [c.chunk_id for c in vectors]))
+    scored = []
+    for chunk_id in ids:
+        if method == "rrf":
+            score = 0.0
+            if chunk_id in lex_rank:
+                score += alpha / (RRF_K + lex_rank[chunk_id])
+            if chunk_id in vec_rank:
+                score += (1 - alpha) / (RRF_K + vec_rank[chunk_id])
+        else:
+            score = alpha * norm.get(chunk_id, 0.0) + (1 - alpha) * vec.get(chunk_id, 0.0)
+            if norm.get(chunk_id, 0.0) == 0.0 and vec.get(chunk_id, 0.0) > 0.0:
+                score += VECTOR_ONLY_BONUS
+        scored.append((chunk_id, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+def test_fuse_matches_full_sort_for_both_methods():
+    import random
+
+    from raglite.search import fuse
+    from raglite.vector.types import Candidate
+
+    rng = random.Random(7)
+    for trial in range(50):
+        pool = rng.sample(range(500), 120)
+        candidates = sorted(
+            (RankedChunk(i, -rng.random() * 10) for i in pool[:80]), key=lambda c: c.score
+        )
+        vectors = [Candidate(i, rng.uniform(-0.2, 1.0)) for i in pool[40:]]
+        method = "rrf" if trial % 2 else "weighted"
+        expected = _brute_force(candidates, vectors, 0.6, method)
+        ranked, complete = fuse(candidates, vectors, alpha=0.6, limit=10, method=method)
+        assert [i for i, _ in ranked] == [i for i, _ in expected[:10]]
+        assert not complete
+        everything, complete = fuse(candidates, vectors, alpha=0.6, limit=500, method=method)
+        assert complete and len(everything) == len(expected)
+
+
+def test_iter_search_pages_match_hybrid_search(tmp_path):
+    from pathlib import Path
+
+    from raglite.api import RagliteAPI, RagliteConfig
+
+    demo = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+    api = RagliteAPI(RagliteConfig(db_path=tmp_path / "pages.db", embed_model="debug"))
+    api.init_db()
+    api.index(demo, strategy="fixed")
+
+    expected = [r.chunk_id for r in api.query("backup schedule", top_k=12)]
+    streamed = [r.chunk_id for r in api.iter_query("backup schedule", limit=12, page_size=5)]
+    assert streamed == expected
+
+    paged, cursor, pages = [], None, 0
+    while True:
+        page, cursor = api.query_page("backup schedule", page_size=5, cursor=cursor, limit=12)
+        paged.extend(r.chunk_id for r in page)
+        pages += 1
+        if cursor is None:
+            break
+    assert paged == expected and pages == 3
+    _, cursor = api.query_page("backup schedule", page_size=5, limit=12)
+    with pytest.raises(ValueError):
+        api.query_page("other query", cursor=cursor, limit=12)
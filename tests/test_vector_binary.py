@@ -0,0 +1,69 @@
+from array import array
+from pathlib import Path
+
+import pytest
+
+from raglite.api import RagliteAPI, RagliteConfig
+from raglite.db import connect
+from raglite.embed import DebugEmbeddingStore, embedding_from_bytes
+from raglite.vector.backend import detect_backend
+from raglite.vector.binary import sign_bits
+from raglite.vector.python_fallback import PythonFallbackBackend
+
+
+def test_sign_bits_packs_msb_first() -> None:
+    blob = array("f", [1.0, -1.0, 0.0, 2.0, -3.0, 0.5, 0.1, -0.1, 4.0]).tobytes()
+    assert sign_bits(blob) == bytes([0b10010110, 0b10000000])
+
+
+def test_binary_backend_matches_exact_search(tmp_path: Path) -> None:
+    np = pytest.importorskip("numpy")
+    db = tmp_path / "binary.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", vector_backend="binary"))
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for name, text in {
+        "a.txt": "nightly backup schedule",
+        "b.txt": "sync service replication",
+        "c.txt": "quick start guide",
+    }.items():
+        (corpus / name).write_text(text, encoding="utf-8")
+    api.index(corpus)
+    assert api.stats()["vector_backend"] == "binary"
+
+    conn = connect(db)
+    blob = conn.execute("SELECT embedding, sig FROM embeddings LIMIT 1").fetchone()
+    vector = np.frombuffer(blob[0], dtype=np.float32)
+    assert blob[1] == np.packbits(vector > 0).tobytes()
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["replication"])[0])
+    backend = detect_backend(conn, prefer="binary")
+    exact = PythonFallbackBackend().search(conn, query, top_n=3)
+    found = backend.search(conn, query, top_n=3)
+    assert [c.chunk_id for c in found] == [c.chunk_id for c in exact]
+    assert found[0].score == pytest.approx(exact[0].score, abs=1e-5)
+
+
+def test_binary_backend_requires_signatures(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    db = tmp_path / "plain.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    (tmp_path / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    api.index(tmp_path / "a.txt")
+
+    conn = connect(db, read_only=True)
+    with pytest.raises(RuntimeError, match="signatures"):
+        detect_backend(conn, prefer="binary")
+    assert conn.execute("SELECT COUNT(*) FROM embeddings WHERE sig IS NOT NULL").fetchone()[0] == 0
+
+    binary = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", vector_backend="binary"))
+    stats = binary.stats()
+    assert stats["vector_backend"] == "unavailable"
+    assert "signatures" in stats["vector_backend_error"]
+    with pytest.raises(RuntimeError, match="signatures"):
+        binary.query("backup")
+
+    binary.init_db()
+    assert binary.stats()["vector_backend_error"] is None
+    assert detect_backend(conn, prefer="binary").name == "binary"
@@ -1,6 +1,8 @@
 import sqlite3
 from pathlib import Path
 
+import pytest
+
 import raglite.vector.backend as backend_module
 from raglite.embed import DebugEmbeddingStore, embedding_from_bytes
 from raglite.vector.backend import detect_backend
@@ -57,3 +59,238 @@ def test_detect_backend_fallback(tmp_path: Path) -> None:
     conn.execute("CREATE TABLE embeddings(id INTEGER PRIMARY KEY)")
     backend = detect_backend(conn)
     assert backend.name in {"python-fallback", "none"}
+
+
+def test_resident_matrix_matches_scan_and_refreshes(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    conn = sqlite3.connect(tmp_path / "resident.db")
+    conn.execute("CREATE TABLE embeddings(chunk_id INTEGER PRIMARY KEY, embedding BLOB)")
+    store = DebugEmbeddingStore(16)
+    words = ["hello", "another", "backup", "sync"]
+    for idx, blob in enumerate(store.embed_many(words), start=1):
+        conn.execute("INSERT INTO embeddings VALUES (?, ?)", (idx, blob))
+    conn.commit()
+    query = embedding_from_bytes(store.embed_many(["backup"])[0])
+    scan = PythonFallbackBackend().search(conn, query, top_n=3)
+    resident = PythonFallbackBackend(resident=True)
+    results = resident.search(conn, query, top_n=3)
+    assert [c.chunk_id for c in results] == [c.chunk_id for c in scan]
+    assert results[0].score == pytest.approx(scan[0].score, abs=1e-5)
+    filtered = resident.search(conn, query, top_n=3, prefilter_ids=[1, 2])
+    assert {c.chunk_id for c in filtered} == {1, 2}
+
+    conn.execute("INSERT INTO embeddings VALUES (?, ?)", (5, store.embed_many(["backup"])[0]))
+    conn.commit()
+    assert {c.chunk_id for c in resident.search(conn, query, top_n=2)} == {3, 5}
+    conn.execute("DELETE FROM embeddings WHERE chunk_id IN (3, 5)")
+    conn.commit()
+    assert {c.chunk_id for c in resident.search(conn, query, top_n=4)} == {1, 2, 4}
+
+
+def test_resident_matrix_sees_commits_from_fresh_connections(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    db = tmp_path / "fresh.db"
+    store = DebugEmbeddingStore(16)
+    setup = sqlite3.connect(db)
+    setup.execute("CREATE TABLE embeddings(chunk_id INTEGER PRIMARY KEY, embedding BLOB)")
+    setup.execute("INSERT INTO embeddings VALUES (1, ?)", (store.embed_many(["hello"])[0],))
+    setup.commit()
+    setup.close()
+    resident = PythonFallbackBackend(resident=True)
+    query = embedding_from_bytes(store.embed_many(["backup"])[0])
+
+    def search_fresh(backend):
+        # A fresh reader starts at the same data_version and total_changes as
+        # the last one, and CPython usually hands it the closed one's id().
+        reader = sqlite3.connect(db)
+        try:
+            return [c.chunk_id for c in backend.search(reader, query, top_n=5)]
+        finally:
+            reader.close()
+
+    writer = sqlite3.connect(db)
+    for chunk_id, word in enumerate(["backup", "sync", "replication"], start=2):
+        search_fresh(resident)
+        writer.execute(
+            "INSERT INTO embeddings VALUES (?, ?)", (chunk_id, store.embed_many([word])[0])
+        )
+        writer.commit()
+        assert search_fresh(resident) == search_fresh(PythonFallbackBackend())
+    writer.close()
+
+
+def test_vector_sidecar_tracks_ingest(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    from raglite.api import RagliteAPI, RagliteConfig
+    from raglite.db import connect
+    from raglite.vector.sidecar import read_header, sidecar_matrix, sidecar_path
+
+    db = tmp_path / "sidecar.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", vector_sidecar=True))
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    api.index(corpus)
+    (corpus / "b.txt").write_text("sync service replication", encoding="utf-8")
+    api.index(corpus / "b.txt")
+
+    header = read_header(sidecar_path(db))
+    assert header is not None and header.rows_seen == 2
+    conn = connect(db)
+    store = DebugEmbeddingStore()
+    query = embedding_from_bytes(store.embed_many(["replication"])[0])
+    matrix = sidecar_matrix(conn, len(query))
+    assert matrix is not None and len(matrix) == 2
+    mapped = matrix.search(query, top_n=3)
+    scanned = PythonFallbackBackend().search(conn, query, top_n=3)
+    assert [c.chunk_id for c in mapped] == [c.chunk_id for c in scanned]
+
+    conn.execute("DELETE FROM embeddings WHERE chunk_id = ?", (mapped[0].chunk_id,))
+    conn.commit()
+    assert sidecar_matrix(conn, len(query)) is None
+
+
+def test_extension_backend_reports_fallback(tmp_path: Path) -> None:
+    from raglite.vector.sqlite_ext import SQLiteExtensionBackend, extension_stats
+
+    conn = sqlite3.connect(tmp_path / "ext.db")
+    conn.execute("CREATE TABLE embeddings(id INTEGER PRIMARY KEY, chunk_id INT, embedding BLOB)")
+    store = DebugEmbeddingStore(8)
+    conn.execute("INSERT INTO embeddings VALUES (1, 7, ?)", (store.embed_many(["hello"])[0],))
+    before = extension_stats()["fallback"]
+    query = embedding_from_bytes(store.embed_many(["hello"])[0])
+    results = SQLiteExtensionBackend().search(conn, query, top_n=1)
+    assert [c.chunk_id for c in results] == [7]
+    stats = extension_stats()
+    assert stats["fallback"] == before + 1
+    assert stats["last_error"]
+
+
+def test_norm_columns_backfilled_and_used(tmp_path: Path) -> None:
+    from raglite.db import apply_migrations
+
+    conn = sqlite3.connect(tmp_path / "norms.db")
+    conn.execute(
+        "CREATE TABLE embeddings(id INTEGER PRIMARY KEY, chunk_id INTEGER NOT NULL,"
+        " model TEXT NOT NULL, dim INTEGER NOT NULL, embedding BLOB NOT NULL)"
+    )
+    store = DebugEmbeddingStore(8)
+    conn.execute(
+        "INSERT INTO embeddings VALUES (1, 1, 'debug', 8, ?)", (store.embed_many(["hello"])[0],)
+    )
+    conn.commit()
+    apply_migrations(conn)
+    norm, normalized = conn.execute("SELECT norm, normalized FROM embeddings").fetchone()
+    assert norm == pytest.approx(1.0, abs=1e-5) and normalized == 1
+
+    query = embedding_from_bytes(store.embed_many(["hello"])[0])
+    assert PythonFallbackBackend().search(conn, query, top_n=1)[0].score == pytest.approx(1.0)
+    conn.execute("UPDATE embeddings SET norm = 2.0, normalized = 0")
+    assert PythonFallbackBackend().search(conn, query, top_n=1)[0].score == pytest.approx(0.5)
+
+
+def test_large_prefilter_bound_without_placeholders(tmp_path: Path) -> None:
+    conn = sqlite3.connect(tmp_path / "allow.db")
+    conn.execute("CREATE TABLE embeddings(chunk_id INTEGER PRIMARY KEY, embedding BLOB)")
+    store = DebugEmbeddingStore(8)
+    for idx, blob in enumerate(store.embed_many(["hello", "backup", "sync"]), start=1):
+        conn.execute("INSERT INTO embeddings VALUES (?, ?)", (idx, blob))
+    conn.commit()
+    query = embedding_from_bytes(store.embed_many(["backup"])[0])
+    allow = list(range(2, 100_000))
+    results = PythonFallbackBackend().search(conn, query, top_n=3, prefilter_ids=allow)
+    assert [c.chunk_id for c in results][:1] == [2] and {c.chunk_id for c in results} == {2, 3}
+
+    pytest.importorskip("numpy")
+    resident = PythonFallbackBackend(resident=True)
+    mapped = resident.search(conn, query, top_n=3, prefilter_ids=allow)
+    assert [c.chunk_id for c in mapped] == [c.chunk_id for c in results]
+    assert resident.search(conn, query, top_n=3, prefilter_ids=[7, 8]) == []
+
+
+def test_detect_backend_cached_until_schema_changes(monkeypatch, tmp_path: Path) -> None:
+    conn = sqlite3.connect(tmp_path / "registry.db")
+    conn.execute("CREATE TABLE embeddings(id INTEGER PRIMARY KEY)")
+    calls = []
+    real_detect = backend_module._detect
+
+    def counting_detect(*args, **kwargs):
+        calls.append(1)
+        return real_detect(*args, **kwargs)
+
+    monkeypatch.setattr(backend_module, "_detect", counting_detect)
+    first = detect_backend(conn)
+    assert detect_backend(conn) is first
+    assert len(calls) == 1
+    conn.execute("CREATE TABLE unrelated(id INTEGER)")
+    detect_backend(conn)
+    assert len(calls) == 2
+    backend_module.forget_backends()
+    detect_backend(conn)
+    assert len(calls) == 3
+
+
+def test_extension_backend_detection_never_writes(monkeypatch, tmp_path: Path) -> None:
+    import raglite.vector.sqlite_ext as sqlite_ext
+
+    db = tmp_path / "ro.db"
+    setup = sqlite3.connect(db)
+    setup.execute("CREATE TABLE embeddings(id INTEGER PRIMARY KEY, chunk_id INT, embedding BLOB)")
+    setup.execute(
+        "INSERT INTO embeddings VALUES (1, 7, ?)", (DebugEmbeddingStore(8).embed_many(["hi"])[0],)
+    )
+    setup.commit()
+    setup.close()
+    monkeypatch.setattr(sqlite_ext, "load_vector_extension", lambda _conn: "vec0")
+
+    reader = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    assert sqlite_ext.SQLiteExtensionBackend.create(reader) is None
+    assert not sqlite_ext.has_vec_index(reader)
+    reader.close()
+
+
+def test_vec_index_built_on_ingest(tmp_path: Path) -> None:
+    from raglite.api import RagliteAPI, RagliteConfig
+    from raglite.db import connect, load_vector_extension
+    from raglite.vector.sqlite_ext import has_vec_index
+
+    db = tmp_path / "vec0.db"
+    probe = sqlite3.connect(":memory:")
+    if load_vector_extension(probe) is None:
+        pytest.skip("sqlite-vec cannot be loaded here")
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", pool_size=2))
+    api.init_db()
+    (tmp_path / "a.txt").write_text("nightly backup schedule", encoding="utf-8")
+    api.index(tmp_path / "a.txt")
+    conn = connect(db, read_only=True)
+    assert has_vec_index(conn)
+    assert api.stats()["vector_backend"] == "sqlite-extension"
+
+
+def test_search_many_scans_table_once(monkeypatch, tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    import raglite.vector.python_fallback as fallback_module
+
+    monkeypatch.setattr(fallback_module, "_SCAN_ROWS", 2)
+    conn = sqlite3.connect(tmp_path / "many.db")
+    conn.execute("CREATE TABLE embeddings(chunk_id INTEGER PRIMARY KEY, embedding BLOB)")
+    store = DebugEmbeddingStore(16)
+    words = ["hello", "another", "backup", "sync", "replication"]
+    for idx, blob in enumerate(store.embed_many(words), start=1):
+        conn.execute("INSERT INTO embeddings VALUES (?, ?)", (idx, blob))
+    conn.commit()
+    queries = [embedding_from_bytes(b) for b in store.embed_many(["backup", "sync", "hello"])]
+    backend = PythonFallbackBackend()
+    single = [backend.search(conn, q, top_n=3) for q in queries]
+    statements: list = []
+    conn.set_trace_callback(statements.append)
+    batched = backend.search_many(conn, queries, top_n=3, prefilter_ids=[None, None, [1, 2]])
+    conn.set_trace_callback(None)
+
+    assert [[c.chunk_id for c in r] for r in batched[:2]] == [
+        [c.chunk_id for c in r] for r in single[:2]
+    ]
+    assert batched[0][0].score == pytest.approx(single[0][0].score, abs=1e-5)
+    assert {c.chunk_id for c in batched[2]} == {1, 2}
+    assert sum("FROM embeddings" in sql and "json_each" not in sql for sql in statements) == 1
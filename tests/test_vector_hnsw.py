@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from raglite.api import RagliteAPI, RagliteConfig  # noqa: E402
+from raglite.db import connect  # noqa: E402
+from raglite.embed import DebugEmbeddingStore, embedding_from_bytes  # noqa: E402
+from raglite.vector.backend import detect_backend  # noqa: E402
+from raglite.vector.hnsw import HNSWBackend  # noqa: E402
+from raglite.vector.python_fallback import PythonFallbackBackend  # noqa: E402
+
+DEMO_DIR = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+
+
+def test_hnsw_graph_search_inserts_and_tombstones(tmp_path: Path) -> None:
+    db = tmp_path / "hnsw.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    api.index(DEMO_DIR, strategy="fixed")
+    stats = api.build_index(kind="hnsw", m=4, ef_construction=32)
+    assert stats.nodes > 0
+
+    conn = connect(db)
+    assert detect_backend(conn).name == "hnsw"
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["backup schedule"])[0])
+    exact = PythonFallbackBackend().search(conn, query, top_n=5)
+    approx = HNSWBackend().search(conn, query, top_n=5)
+    assert [c.chunk_id for c in approx] == [c.chunk_id for c in exact]
+
+    extra = tmp_path / "extra.txt"
+    extra.write_text("backup schedule backup schedule", encoding="utf-8")
+    api.index(extra)
+    nodes = conn.execute("SELECT COUNT(*) FROM hnsw_nodes").fetchone()[0]
+    assert nodes == conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    newest = HNSWBackend().search(conn, query, top_n=1)[0].chunk_id
+    assert newest == conn.execute("SELECT MAX(chunk_id) FROM embeddings").fetchone()[0]
+
+    conn.execute("DELETE FROM embeddings WHERE chunk_id = ?", (newest,))
+    conn.commit()
+    assert newest not in {c.chunk_id for c in HNSWBackend().search(conn, query, top_n=5)}
+
+
+def test_hnsw_revives_tombstoned_node_for_reused_id(tmp_path: Path) -> None:
+    import raglite.vector.hnsw as hnsw_module
+    from raglite.vector.hnsw import add_embeddings
+
+    db = tmp_path / "revive.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    api.index(DEMO_DIR, strategy="fixed")
+    api.build_index(kind="hnsw", m=4, ef_construction=32)
+
+    conn = connect(db)
+    emb_id, chunk_id, model, dim = conn.execute(
+        "SELECT id, chunk_id, model, dim FROM embeddings ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    blob = DebugEmbeddingStore().embed_many(["zeppelin hangar checklist"])[0]
+    with conn:
+        conn.execute("DELETE FROM embeddings WHERE id = ?", (emb_id,))
+        conn.execute(
+            "INSERT INTO embeddings(id, chunk_id, model, dim, embedding) VALUES (?, ?, ?, ?, ?)",
+            (emb_id, chunk_id, model, dim, blob),
+        )
+        add_embeddings(conn, [(emb_id, chunk_id, blob)])
+    assert (
+        conn.execute("SELECT deleted FROM hnsw_nodes WHERE embedding_id = ?", (emb_id,)).fetchone()[
+            0
+        ]
+        == 0
+    )
+
+    query = embedding_from_bytes(blob)
+    found = HNSWBackend().search(conn, query, top_n=1)
+    assert [(c.chunk_id, round(c.score, 4)) for c in found] == [(chunk_id, 1.0)]
+    hnsw_module._GRAPHS.clear()
+    reloaded = HNSWBackend().search(conn, query, top_n=1)
+    assert [c.chunk_id for c in reloaded] == [chunk_id]
+
+
+def test_hnsw_ingest_extends_private_copy_and_publishes_after_commit(
+    monkeypatch, tmp_path: Path
+) -> None:
+    import raglite.vector.hnsw as hnsw_module
+
+    db = tmp_path / "publish.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    api.index(DEMO_DIR, strategy="fixed")
+    api.build_index(kind="hnsw", m=4, ef_construction=32)
+    conn = connect(db)
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["backup schedule"])[0])
+    HNSWBackend().search(conn, query, top_n=1)
+    published = hnsw_module._GRAPHS[str(db.resolve())]
+    size = len(published)
+
+    reads = []
+    real_read = hnsw_module._read_graph
+    monkeypatch.setattr(hnsw_module, "_read_graph", lambda c: reads.append(1) or real_read(c))
+    for idx in range(3):
+        extra = tmp_path / f"extra{idx}.txt"
+        extra.write_text(f"backup schedule {idx} " * 4, encoding="utf-8")
+        api.index(extra)
+        assert len(published) == size
+        assert HNSWBackend().search(conn, query, top_n=1)
+    assert reads == []
+    assert str(db.resolve()) not in hnsw_module._PENDING
+    current = hnsw_module._GRAPHS[str(db.resolve())]
+    assert len(current) == conn.execute("SELECT COUNT(*) FROM hnsw_nodes").fetchone()[0]
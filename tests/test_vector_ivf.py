@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from raglite.api import RagliteAPI, RagliteConfig  # noqa: E402
+from raglite.db import connect  # noqa: E402
+from raglite.embed import DebugEmbeddingStore, embedding_from_bytes  # noqa: E402
+from raglite.vector.backend import detect_backend  # noqa: E402
+from raglite.vector.ivf import IVFBackend  # noqa: E402
+from raglite.vector.python_fallback import PythonFallbackBackend  # noqa: E402
+
+DEMO_DIR = Path(__file__).resolve().parents[1] / "demo" / "mini_corpus"
+
+
+def test_ivf_index_full_probe_matches_exact_and_tracks_inserts(tmp_path: Path) -> None:
+    db = tmp_path / "ivf.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug"))
+    api.init_db()
+    api.index(DEMO_DIR, strategy="fixed")
+    stats = api.build_index(nlist=4)
+    assert stats.lists == 4
+
+    conn = connect(db)
+    assert detect_backend(conn).name == "ivf"
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["backup schedule"])[0])
+    exact = PythonFallbackBackend().search(conn, query, top_n=5)
+    probed = IVFBackend(nprobe=4).search(conn, query, top_n=5)
+    assert [c.chunk_id for c in probed] == [c.chunk_id for c in exact]
+
+    extra = tmp_path / "extra.txt"
+    extra.write_text("offsite backup rotation schedule", encoding="utf-8")
+    api.index(extra)
+    postings = conn.execute("SELECT COUNT(*) FROM ivf_postings").fetchone()[0]
+    embeddings = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert postings == embeddings
+    assert api.query("backup schedule", top_k=3, nprobe=1)
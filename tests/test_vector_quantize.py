@@ -0,0 +1,113 @@
+from array import array
+from pathlib import Path
+
+import pytest
+
+from raglite.api import RagliteAPI, RagliteConfig
+from raglite.db import connect
+from raglite.embed import DebugEmbeddingStore, embedding_from_bytes
+from raglite.vector.matrix import VectorMatrix
+from raglite.vector.python_fallback import PythonFallbackBackend
+from raglite.vector.quantize import float_only_indexes, quantization_mode, quantize_int8
+
+
+def _exact(conn, query, top_n: int):
+    rows = conn.execute("SELECT chunk_id, embedding FROM embeddings").fetchall()
+    return VectorMatrix.from_rows(len(query), rows).search(query, top_n=top_n)
+
+
+def test_quantize_int8_round_trip() -> None:
+    blob = array("f", [-1.0, -0.25, 0.0, 0.5, 1.0]).tobytes()
+    codes, scale, offset = quantize_int8(blob)
+    restored = [(c + 128) * scale + offset for c in array("b", codes)]
+    assert restored == pytest.approx([-1.0, -0.25, 0.0, 0.5, 1.0], abs=scale)
+
+
+def test_int8_resident_search_rescored_in_float(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    db = tmp_path / "int8.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", quantization="int8"))
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for name, text in {
+        "a.txt": "nightly backup schedule",
+        "b.txt": "sync service replication",
+        "c.txt": "quick start guide",
+    }.items():
+        (corpus / name).write_text(text, encoding="utf-8")
+    api.index(corpus)
+    assert api.stats()["quantization"] == "int8"
+
+    conn = connect(db)
+    assert quantization_mode(conn) == "int8"
+    assert conn.execute("SELECT COUNT(*) FROM embeddings WHERE qvec IS NULL").fetchone()[0] == 0
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["replication"])[0])
+    exact = _exact(conn, query, 3)
+    for backend in (PythonFallbackBackend(resident=True), PythonFallbackBackend()):
+        statements: list = []
+        conn.set_trace_callback(statements.append)
+        quantized = backend.search(conn, query, top_n=3)
+        batched = backend.search_many(conn, [query], top_n=3)[0]
+        conn.set_trace_callback(None)
+        assert [c.chunk_id for c in quantized] == [c.chunk_id for c in exact]
+        assert [c.chunk_id for c in batched] == [c.chunk_id for c in exact]
+        assert quantized[0].score == pytest.approx(exact[0].score, abs=1e-5)
+        if not backend.resident:
+            # The scan reads the codes; float32 blobs only for the shortlist.
+            assert any("qvec" in sql for sql in statements)
+            assert not any("embedding, norm" in sql for sql in statements)
+    filtered = PythonFallbackBackend().search(
+        conn, query, top_n=3, prefilter_ids=[exact[-1].chunk_id]
+    )
+    assert [c.chunk_id for c in filtered] == [exact[-1].chunk_id]
+
+
+def test_int8_used_by_ivf_and_refused_by_float_only_indexes(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    from raglite.vector.ivf import IVFBackend
+    from raglite.vector.quantize import set_quantization
+
+    db = tmp_path / "ivf8.db"
+    api = RagliteAPI(RagliteConfig(db_path=db, embed_model="debug", quantization="int8"))
+    api.init_db()
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for idx, text in enumerate(["backup schedule", "sync replication", "quick start", "tags"]):
+        (corpus / f"{idx}.txt").write_text(text, encoding="utf-8")
+    api.index(corpus)
+    api.build_index(kind="ivf", nlist=2)
+    conn = connect(db)
+    query = embedding_from_bytes(DebugEmbeddingStore().embed_many(["replication"])[0])
+    exact = _exact(conn, query, 4)
+    statements: list = []
+    conn.set_trace_callback(statements.append)
+    probed = IVFBackend(nprobe=2).search(conn, query, top_n=4)
+    conn.set_trace_callback(None)
+    assert any("e.qvec" in sql for sql in statements)
+    assert [c.chunk_id for c in probed] == [c.chunk_id for c in exact]
+
+    with pytest.raises(ValueError, match="int8"):
+        api.build_index(kind="hnsw")
+    set_quantization(conn, "none")
+    api.build_index(kind="hnsw")
+    with pytest.raises(ValueError, match="hnsw"):
+        set_quantization(conn, "int8")
+    with pytest.raises(ValueError, match="sidecar"):
+        api.config.vector_sidecar = True
+        api.config.quantization = "int8"
+        api.index(corpus)
+
+
+def test_int8_refused_with_sqlite_vec_table(tmp_path: Path) -> None:
+    from raglite.vector.quantize import set_quantization
+
+    db = tmp_path / "vec8.db"
+    RagliteAPI(RagliteConfig(db_path=db, embed_model="debug")).init_db()
+    conn = connect(db)
+    # Stand-in for the vec0 mirror; only its presence matters here.
+    conn.execute("CREATE TABLE vec_embeddings (rowid INTEGER PRIMARY KEY)")
+    assert float_only_indexes(conn) == ["sqlite-vec table"]
+    with pytest.raises(ValueError, match="sqlite-vec"):
+        set_quantization(conn, "int8")
+    assert quantization_mode(conn) == "none"